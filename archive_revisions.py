@@ -0,0 +1,247 @@
+#!/proj/sot/ska3/flight/bin/python
+
+"""
+**archive_revisions.py**: Pack old <obsid>.<rev#> revision files into monthly zip archives
+
+Files older than the cutoff are moved into <ocat_dir>/updates/archive/<yyyy-mm>.zip by
+the month of their mtime, and recorded in <ocat_dir>/updates/archive/index.db, from
+which the application opens a single member (cus_app/supple/revision_store.py).
+A file is removed only after its archive has been replaced, indexed and read back,
+so this can be run while the application is live.
+
+:Last Updated: Oct 18, 2026
+
+"""
+
+import os
+import time
+import shutil
+import zipfile
+import argparse
+import sqlite3 as sq
+from contextlib import closing
+
+from cus_app.supple import revision_store as rvs
+
+OCAT_DIR = "/data/mta4/CUS/www/Usint/ocat"
+#
+# --- About two observing cycles
+#
+DAYS = 730
+
+
+def find_old_files(updates_dir, cutoff):
+    """
+    List revision files in either layout which are older than the cutoff.
+    input:  updates_dir --- the updates directory
+            cutoff      --- mtime in seconds from epoch
+    output: a dict of <yyyy-mm> <--> a list of [<path>, <obsid>, <rev>, <mtime>, <size>]
+    """
+    m_dict = {}
+    d_list = [updates_dir]
+    while len(d_list) > 0:
+        with os.scandir(d_list.pop()) as it:
+            for ent in it:
+                if ent.is_dir(follow_symlinks=False):
+                    if ent.name.isdigit():
+                        d_list.append(ent.path)
+                    continue
+
+                if not ent.is_file(follow_symlinks=False):
+                    continue
+                mc = rvs.name_pattern.search(ent.name)
+                if not mc:
+                    continue
+
+                stat = ent.stat(follow_symlinks=False)
+                if stat.st_mtime >= cutoff:
+                    continue
+
+                month = time.strftime("%Y-%m", time.gmtime(stat.st_mtime))
+                m_dict.setdefault(month, []).append(
+                    [ent.path, int(mc.group(1)), int(mc.group(2)), stat.st_mtime, stat.st_size]
+                )
+    return m_dict
+
+
+def connect_index(archive_dir):
+    """Open archive/index.db, creating the table if needed."""
+    conn = sq.connect(os.path.join(archive_dir, rvs.archive_index), timeout=30)
+    conn.execute(rvs.archive_cmd)
+    return conn
+
+
+def archive_month(archive_dir, month, f_list):
+    """
+    Add revision files of one month to its archive, index them, and remove them.
+    input:  archive_dir --- the archive directory
+            month       --- <yyyy-mm>
+            f_list      --- a list of [<path>, <obsid>, <rev>, <mtime>, <size>]
+    output: the number of files archived
+    """
+    zname = f"{month}.zip"
+    zfile = os.path.join(archive_dir, zname)
+    tmp = zfile + ".tmp"
+    #
+    # --- Add to a copy of the current archive, then replace it in one step
+    #
+    if os.path.exists(zfile):
+        shutil.copy2(zfile, tmp)
+    with zipfile.ZipFile(tmp, "a", compression=zipfile.ZIP_DEFLATED) as zf:
+        names = set(zf.namelist())
+        for path, obsid, rev, mtime, size in f_list:
+            name = rvs.revision_name(obsid, rev)
+            if name in names:
+                continue
+            info = zipfile.ZipInfo(name, date_time=time.localtime(mtime)[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with open(path, "rb") as f:
+                zf.writestr(info, f.read())
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, zfile)
+
+    with closing(connect_index(archive_dir)) as conn:
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO archived (obsid, rev, archive, mtime, size) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [[obsid, rev, zname, mtime, size] for _, obsid, rev, mtime, size in f_list],
+            )
+    #
+    # --- Remove a file only if the archived copy reads back the same
+    #
+    count = 0
+    with zipfile.ZipFile(zfile) as zf:
+        for path, obsid, rev, mtime, size in f_list:
+            with open(path, "rb") as f:
+                data = f.read()
+            if zf.read(rvs.revision_name(obsid, rev)) != data:
+                print(f"Kept {path}: the archived copy in {zname} differs")
+                continue
+            os.unlink(path)
+            count += 1
+    return count
+
+
+def verify_archives(updates_dir):
+    """
+    Check that every indexed revision can be read from its archive.
+    input:  updates_dir --- the updates directory
+    output: the number of problems found
+    """
+    archive_dir = rvs.get_archive_dir(updates_dir)
+    if not os.path.isfile(os.path.join(archive_dir, rvs.archive_index)):
+        print(f"No archive index in {archive_dir}")
+        return 0
+
+    with closing(connect_index(archive_dir)) as conn:
+        rows = conn.execute(
+            "SELECT obsid, rev, archive, size FROM archived ORDER BY archive"
+        ).fetchall()
+
+    nbad = 0
+    zname = ""
+    zf = None
+    for obsid, rev, archive, size in rows:
+        if archive != zname:
+            if zf is not None:
+                zf.close()
+            zname = archive
+            try:
+                zf = zipfile.ZipFile(os.path.join(archive_dir, archive))
+                bad = zf.testzip()
+                if bad is not None:
+                    print(f"{archive}: bad CRC in {bad}")
+                    nbad += 1
+            except (OSError, zipfile.BadZipFile) as err:
+                print(f"{archive}: {err}")
+                zf = None
+
+        name = rvs.revision_name(obsid, rev)
+        if zf is None:
+            nbad += 1
+            continue
+        try:
+            info = zf.getinfo(name)
+        except KeyError:
+            print(f"{name}: indexed in {archive} but not in it")
+            nbad += 1
+            continue
+        if size is not None and info.file_size != size:
+            print(f"{name}: size {info.file_size} in {archive}, {size} in the index")
+            nbad += 1
+    if zf is not None:
+        zf.close()
+
+    print(f"Checked {len(rows)} archived revisions: {nbad} problems")
+    return nbad
+
+
+def main(updates_dir, days, dry_run=False):
+    """Archive revision files older than days."""
+    cutoff = time.time() - days * 86400
+    m_dict = find_old_files(updates_dir, cutoff)
+    archive_dir = rvs.get_archive_dir(updates_dir)
+    if not dry_run:
+        os.makedirs(archive_dir, exist_ok=True)
+
+    total = 0
+    for month in sorted(m_dict):
+        if dry_run:
+            print(f"{month}.zip: {len(m_dict[month])} files")
+            total += len(m_dict[month])
+        else:
+            total += archive_month(archive_dir, month, m_dict[month])
+
+    if dry_run:
+        print(f"{total} files would be archived")
+    else:
+        print(f"Archived {total} files into {archive_dir}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-m",
+        "--mode",
+        choices=["flight", "test"],
+        required=True,
+        help="Determine running mode.",
+    )
+    parser.add_argument(
+        "-d",
+        "--dir",
+        required=False,
+        help="Determine path to the ocat directory holding updates/.",
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=DAYS,
+        help="Archive revision files older than this many days.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only list how many files would be archived per month.",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Check the archives against the index instead of archiving.",
+    )
+    args = parser.parse_args()
+    #
+    # --- Determine if running in test mode and change pathing if so
+    #
+    if args.mode == "test":
+        if args.dir:
+            OCAT_DIR = args.dir
+        else:
+            OCAT_DIR = "/proj/web-cxc/cgi-gen/mta/Obscat/ocat"
+
+    updates_dir = os.path.join(OCAT_DIR, "updates")
+    if args.verify:
+        nbad = verify_archives(updates_dir)
+        raise SystemExit(1 if nbad > 0 else 0)
+    main(updates_dir, args.days, dry_run=args.dry_run)
@@ -0,0 +1,105 @@
+#!/proj/sot/ska3/flight/bin/python
+
+"""
+**backfill_note_flags.py**: Fill the orupdate note flags of revisions written before they were kept
+
+The new_comment and coord_shift columns of the revisions table in <ocat_dir>/updates_table.db
+are set when a revision is written. For older rows they are NULL; the orupdate page then
+finds them from the revision files and cdo_warning_list on every view, without saving them.
+This fills them once. A flag whose revision file is not found is left NULL.
+
+Rows are updated in short write transactions, so this can be run while the application is live.
+
+:Last Updated: Oct 18, 2026
+
+"""
+
+import argparse
+
+from flask import Flask
+
+from config import _CONFIG_DICT
+from cus_app.supple import revision_store as rvs
+from cus_app.supple import updates_db as udb
+
+#
+# --- Rows updated per write transaction
+#
+CHUNK = 500
+
+
+def find_missing():
+    """
+    List the rows of the revisions table with a NULL note flag.
+    input:  none
+    output: a list of [<rowid>, <obsidrev>, <new_comment>, <coord_shift>]
+    """
+    cmd = "SELECT rowid, obsidrev, new_comment, coord_shift FROM revisions "
+    cmd += "WHERE new_comment IS NULL OR coord_shift IS NULL ORDER BY rowid"
+    return [list(ent) for ent in udb.fetch_all(cmd)]
+
+
+def main(dry_run=False):
+    """Fill the NULL note flags of the revisions table."""
+    m_list = find_missing()
+    nfill = 0
+    nmiss = 0
+    for k in range(0, len(m_list), CHUNK):
+        chunk = m_list[k : k + CHUNK]
+        f_list = rvs.find_note_flags([ent[1:] for ent in chunk])
+        u_list = []
+        for ent, [comment, shift] in zip(chunk, f_list):
+            if comment is None:
+                nmiss += 1
+            u_list.append([comment, shift, ent[0]])
+
+        nfill += len(u_list)
+        if not dry_run:
+            with udb.transaction() as cur:
+                cur.executemany(
+                    "UPDATE revisions SET new_comment = IFNULL(new_comment, ?), "
+                    + "coord_shift = IFNULL(coord_shift, ?) WHERE rowid = ?",
+                    u_list,
+                )
+
+    if dry_run:
+        print(f"{nfill} rows would be filled ({nmiss} revision files not found)")
+    else:
+        print(f"Filled {nfill} rows ({nmiss} revision files not found)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-m",
+        "--mode",
+        choices=["flight", "test"],
+        required=True,
+        help="Determine running mode.",
+    )
+    parser.add_argument(
+        "-d",
+        "--dir",
+        required=False,
+        help="Determine path to the ocat directory holding updates_table.db.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only count the rows which would be filled.",
+    )
+    args = parser.parse_args()
+    #
+    # --- Determine if running in test mode and change pathing if so
+    #
+    app = Flask(__name__)
+    if args.mode == "test":
+        app.config.from_object(_CONFIG_DICT["cxctest"])
+        if args.dir:
+            app.config["OCAT_DIR"] = args.dir
+    else:
+        app.config.from_object(_CONFIG_DICT["cxcweb"])
+
+    with app.app_context():
+        main(dry_run=args.dry_run)
+        udb.close_connections()
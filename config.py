@@ -22,6 +22,7 @@ class BaseConfig(object):
     #
     PERMANENT_SESSION_LIFETIME = timedelta(minutes=60)
     SESSION_REFRESH_EACH_REQUEST = True
+    SESSION_TOUCH_INTERVAL = 60  # sec between session_start updates
     #
     # --- Directory Pathing
     #
@@ -31,6 +32,65 @@ class BaseConfig(object):
     REV_VERSION = "test_database"
     OCAT_DIR = "/proj/web-cxc/cgi-gen/mta/Obscat/ocat/"
     INFO_DIR = "/proj/web-cxc/cgi-gen/mta/Obscat/ocat/Info_save/too_contact_info/"
+    #
+    # --- Revision files are written to OCAT_DIR/updates/<obsid>.<rev>, or, when sharded, to
+    # --- OCAT_DIR/updates/<obsid // 1000>/<obsid>.<rev>. Both are read; see migrate_updates_layout.py.
+    #
+    UPDATES_SHARDED = False
+    #
+    # --- updates_table.db: busy timeout (sec) and retries while it stays locked. WAL lets the
+    # --- pages read while a signoff is written; turn it off if OCAT_DIR is on a network file system.
+    #
+    UPDATES_DB_WAL = True
+    UPDATES_DB_TIMEOUT = 10
+    UPDATES_DB_RETRIES = 5
+    #
+    # --- Open revisions shown per page of the Target Parameter Status Page (orupdate)
+    #
+    ORUPDATE_PAGE_SIZE = 50
+    #
+    # --- Ocat Data Page edit sessions (LOG_DIR/edit_sessions.db) expire after this long unused (sec)
+    #
+    EDIT_SESSION_TTL = 7200
+    #
+    # --- Sybase connection pool (per process)
+    #
+    SYBASE_POOL_SIZE = 4
+    SYBASE_POOL_TIMEOUT = 30
+    SYBASE_PING_INTERVAL = 60
+    #
+    # --- Database driver: sybpydb, or fake (cus_app/supple/fake_sybpydb.py on a seeded SQLite
+    # --- file, sleeping FAKE_SYBASE_LATENCY sec per round trip) for load tests without Sybase.
+    #
+    SYBASE_DRIVER = "sybpydb"
+    FAKE_SYBASE_FILE = os.path.join(os.path.dirname(__file__), "logs", "fake_ocat.db")
+    FAKE_SYBASE_LATENCY = 0.0
+    #
+    # --- How read_ocat_data reads an observation: batched, section or concurrent.
+    # --- In concurrent mode, keep OCAT_READ_MAX_WORKERS <= SYBASE_POOL_SIZE.
+    #
+    OCAT_READ_MODE = "batched"
+    OCAT_READ_MAX_WORKERS = 4
+    #
+    # --- Cache of read_ocat_data results shared by all workers (LOG_DIR/ocat_cache.db).
+    # --- OCAT_CACHE_BYPASS forces fresh reads; admins can also add ?fresh=1 to a page.
+    # --- Only read-only pages take values from it; approvals and submissions read Sybase.
+    #
+    OCAT_CACHE_ENABLED = False
+    OCAT_CACHE_BYPASS = False
+    OCAT_CACHE_TTL = 300
+    OCAT_CACHE_MAX_ENTRIES = 500
+    #
+    # --- Monitor chains and group members are kept in memory and read again after this (sec).
+    #
+    OCAT_MONITOR_INDEX_TTL = 600
+    #
+    # --- Read-only pages can read a local SQLite copy of axafocat: sybase or replica.
+    # --- The copy is made by sync_ocat_replica.py; an older one (sec) is not used.
+    #
+    OCAT_READ_BACKEND = "sybase"
+    OCAT_REPLICA_FILE = "/data/mta4/CUS/Data/Ocat/ocat_replica.db"
+    OCAT_REPLICA_MAX_AGE = 93600
 
 
 class LocalHostConfig(BaseConfig):
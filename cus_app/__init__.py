@@ -39,6 +39,24 @@ def create_app(_configuration_name):
     mail.init_app(app)
     bootstrap.init_app(app)
     #
+    # --- sybase connection pool
+    #
+    import cus_app.supple.get_value_from_sybase as gvfs
+
+    gvfs.init_app(app)
+    #
+    # --- log the hit/miss counts of the per-request ocat data cache
+    #
+    import cus_app.supple.ocat_data_cache as odc
+
+    app.teardown_request(odc.log_request_stats)
+    #
+    # --- one session/login hook for all pages (static files are skipped)
+    #
+    from cus_app.models import refresh_session
+
+    app.before_request(refresh_session)
+    #
     # --- connect all apps with blueprint
     #
     # --- error handling
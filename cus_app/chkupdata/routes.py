@@ -15,20 +15,19 @@ import re
 import string
 import time
 from datetime import datetime
-import Chandra.Time
 import copy
 
-from flask          import render_template, flash, redirect, url_for, session
+from flask          import render_template, flash, redirect, url_for
 from flask          import request, g, jsonify, current_app
-from flask_login    import current_user
 
 from cus_app            import db
-from cus_app.models     import User, register_user
+from cus_app.models     import User
 from cus_app.chkupdata  import bp
 from cus_app.chkupdata.forms import SubmitForm
 
 import cus_app.supple.ocat_common_functions     as ocf
 import cus_app.supple.read_ocat_data            as rod
+import cus_app.supple.revision_store            as rvs
 #
 #--- directory
 #
@@ -65,19 +64,6 @@ awin_list  = ['chip', 'start_row', 'start_column', 'height',\
 
 ordr_list  = time_list + roll_list + awin_list
 
-#--------------------------------------------------------------------------
-#-- before_request: this will be run before every time index is called   --
-#--------------------------------------------------------------------------
-
-@bp.before_app_request
-def before_request():
-    if current_user.is_authenticated:
-        session['session_start'] = int(Chandra.Time.DateTime().secs)
-        session.permanent        = True
-        session.modified         = True
-    else:
-        register_user()
-
 #--------------------------------------------------------------------------
 #-- index: this is the main function to display chkupdata page           --
 #--------------------------------------------------------------------------
@@ -164,19 +150,21 @@ def get_data(name):
             other_rev   --- other revisions available 
     """
 #
-#--- check whether the data file exists
+#--- separate obsid and rev #
 #
-    name      = os.path.join(current_app.config['OCAT_DIR'],'updates',name)
-
-    if not os.path.isfile(name):
+    try:
+        [obsid, rev] = rvs.split_obsidrev(name)
+    except ValueError:
         return False
 #
-#--- separate obsid and rev #
+#--- check whether the data file exists; old ones may be in the archive
 #
-    atemp     = re.split('\/', name)
-    btemp     = re.split('\.', atemp[-1])
-    obsid     = btemp[0]
-    rev       = btemp[1]
+    if not rvs.revision_exists(obsid, rev):
+        return False
+
+    name      = rvs.revision_name(obsid, rev)
+    obsid     = str(obsid)
+    rev       = ocf.add_leading_zero(rev, 3)
 #
 #--- check whether other revisions available 
 #
@@ -184,7 +172,7 @@ def get_data(name):
 #
 #--- read the current database values
 #
-    ct_dict  = rod.read_ocat_data(obsid)
+    ct_dict  = rod.read_ocat_data(obsid, readonly=True)
 #
 #--- initialize dict etc
 #
@@ -202,7 +190,7 @@ def get_data(name):
 #
 #--- read the data file and go through each line to find information needed
 #
-    data = ocf.read_data_file(name)
+    data = rvs.read_revision(name)
     for ent in data:
         if ent.strip() == '':
             continue
@@ -385,7 +373,7 @@ def get_data(name):
 #
 #-- find the file creation date
 #
-    out   = time.ctime(os.path.getmtime(name))
+    out   = time.ctime(rvs.revision_mtime(name))
     atemp = re.split('\s+', out)
     cdate = atemp[1] + ' ' + ocf.add_leading_zero(atemp[2], 2) + ' ' + atemp[-1]
     d_dict['CDATE'] = [cdate, cdate, cdate, 0]
@@ -15,19 +15,18 @@ import Chandra.Time
 import time
 import numpy
 from datetime       import datetime
-import sqlite3 as sq
-from contextlib import closing
 
-from flask          import render_template, flash, redirect, url_for, session
+from flask          import render_template, flash, redirect, url_for
 from flask          import request, g, jsonify, current_app
 from flask_login    import current_user
 
 from cus_app            import db
-from cus_app.models     import User, register_user 
+from cus_app.models     import User
 from cus_app.express    import bp
 
 import cus_app.supple.ocat_common_functions         as ocf
 import cus_app.supple.read_ocat_data                as rod
+import cus_app.supple.updates_db                    as udb
 import cus_app.ocatdatapage.create_selection_dict   as csd
 import cus_app.ocatdatapage.update_data_record_file as udrf
 #
@@ -42,19 +41,6 @@ today  = ocf.convert_chandra_time_to_display2(now, tformat='%m/%d/%y')
 
 null_list  = [None, 'NA', 'NULL', 'None', 'null', 'none', '', '<Blank>']
 
-#----------------------------------------------------------------------------------
-#-- before_request: this will be run before every time index is called          ---
-#----------------------------------------------------------------------------------
-
-@bp.before_app_request
-def before_request():
-    if current_user.is_authenticated:
-        session['session_start'] = int(Chandra.Time.DateTime().secs)
-        session.permanent        = True
-        session.modified         = True
-    else:
-        register_user()
-
 #----------------------------------------------------------------------------------
 #-- index: this is the main function to dispaly express submission page          --
 #----------------------------------------------------------------------------------
@@ -191,6 +177,7 @@ def check_obsid_status(obsid_list):
                         2       --- obsid is not in the database
                         <status>--- status of the observation (e.g., observed, canceled, archived etc)
                         3       --- No assigned SI Mode so it cannot be approved
+                        4       --- the database could not be read for the obsid
             o_list          --- a list of obsids which can be approved
     """
     user     = current_user.username
@@ -205,20 +192,20 @@ def check_obsid_status(obsid_list):
         approved.append(atemp[0])
     approved.reverse()
 #
-#--- read obsids in updates_table.db; create <obsid> <---> <poc> dict
+#--- read submitters of the given obsids in updates_table.db; create <obsid> <---> <poc> dict
+#--- (in the order of rev_time; the earliest submitter of each obsid is kept)
 #
-    ufile    = os.path.join(current_app.config['OCAT_DIR'], 'updates_table.db')
+    updates  = {}
+    for c_list in ocf.chunk_list(obsid_list, 250):
+        marks = ','.join(['?'] * len(c_list))
+        cmd   = f"SELECT obsid, submitter from revisions WHERE obsid IN ({marks}) ORDER BY rev_time DESC"
+        for ent in udb.fetch_all(cmd, [int(x) for x in c_list]):
+            updates[str(ent[0])] = ent[1]
+
 #
-#--- SQL query to database
+#--- read status, si mode and proposal information of all obsids at once
 #
-    with closing(sq.connect(ufile)) as conn: # auto-closes
-        with conn: # auto-commits
-            with closing(conn.cursor()) as cur: # auto-closes
-                fetch_result = cur.execute(f"SELECT obsidrev, submitter from revisions ORDER BY rev_time DESC").fetchall()
-    updates  = {}
-    for ent in fetch_result:
-        obsid = str(ent[0]).split('.')[0]
-        updates[obsid] = ent[1]
+    s_dict       = rod.get_status_many(obsid_list, with_proposal=True)
 
     checked_list = []
     o_list       = []
@@ -226,11 +213,16 @@ def check_obsid_status(obsid_list):
 #
 #--- get information about the obsid
 #
-        info, status, si_mode = get_obsid_info(obsid)
+        info, status, si_mode = get_obsid_info(obsid, s_dict)
+#
+#--- If the database could not be read for the obsid, mark with 4, and it cannot be approved.
+#
+        if status is None:
+            info.append(4)
 #
 #--- If the obsid does not have an assigned SI mode, then mark with 3, and it cannot be approved.
 #
-        if si_mode in null_list:
+        elif si_mode in null_list:
             info.append(3)
 #
 #--- if observation status is not unobserved or scheduled, mark it
@@ -266,19 +258,24 @@ def check_obsid_status(obsid_list):
 #-- get_obsid_info: extract infornation about a given obsid                      --
 #----------------------------------------------------------------------------------
 
-def get_obsid_info(obsid):
+def get_obsid_info(obsid, s_dict):
     """
     extract infornation about a given obsid
     input:  obsid   --- obsid
+            s_dict  --- a dict of <obsid> <--> <information>; see rod.get_status_many
     output: info_list   --- a list of:
             [<obsid>, <proposal ID>, <sequence #>, <title>, <target name>, <PI name>]
-            status of the observation (e.g., unobserved, archived, canceled, etc)
+            status of the observation (e.g., unobserved, archived, canceled, etc);
+            None if the database could not be read
     """
     try:
-        p_dict = rod.read_ocat_data(obsid)
+        p_dict = s_dict[int(obsid)]
     except:
         return [obsid, '', '', '', '', ''], 'na', 'na'
 
+    if p_dict is None:
+        return [obsid, '', '', '', '', ''], None, None
+
     info_list   = []
     info_list.append(obsid)
     info_list.append(p_dict['proposal_number'])
@@ -8,11 +8,29 @@
 #                                                                                   #
 #####################################################################################
 import os
-import Chandra.Time
+import time
+import threading
 from flask              import current_app, session, request
-from flask_login        import UserMixin, login_user
+from flask_login        import UserMixin, login_user, current_user
 
 from cus_app                import db, login
+#
+#--- unix time of the Chandra time epoch (1998-01-01T00:00:00 TT); session_start is kept in
+#--- Chandra time. leap seconds after 1998 are ignored; a few seconds do not matter here.
+#
+CXC_EPOCH = 883612736.816
+
+def chandra_now():
+    """
+    return the current time in Chandra time (sec from 1998.1.1) without Chandra.Time
+    """
+    return int(time.time() - CXC_EPOCH)
+#
+#--- per-process cache of users keyed by id and username. the user table changes only when
+#--- update_user_database.py rewrites app.db, so the cache is cleared when app.db mtime changes.
+#
+_user_cache = {'mtime': None, 'id': {}, 'username': {}}
+_user_lock  = threading.Lock()
 
 #----------------------------------------------------------------------------------------
 #----------------------------------------------------------------------------------------
@@ -33,7 +51,7 @@ class User(UserMixin, db.Model):
 
 def register_user():
     session.clear()
-    session['session_start'] = int(Chandra.Time.DateTime().sec)
+    session['session_start'] = chandra_now()
     session.permanent = True
     session.modified = True
     #assign username, pulls from LDAP authentication login popup which is defined only in the apache server env scope
@@ -43,14 +61,95 @@ def register_user():
     else:
         username = request.environ.get("REMOTE_USER") #Defined by Apache Web Server Context
     
-    user = User.query.filter_by(username=username).first()
+    user = get_cached_user('username', username)
     login_user(user)
     current_app.logger.info(f"Login User: {username}")
 
+#----------------------------------------------------------------------------------------
+#-- refresh_session: refresh the session of the user before each request              --
+#----------------------------------------------------------------------------------------
+
+def refresh_session():
+    """
+    refresh the session of the user before each request; registered with
+    app.before_request in create_app. static files are skipped, and
+    session_start is updated at most once per SESSION_TOUCH_INTERVAL seconds.
+    a user who is not logged in yet is registered.
+    """
+    endpoint = request.endpoint
+    if endpoint is not None and (endpoint == 'static' or endpoint.endswith('.static')):
+        return
+
+    if current_user.is_authenticated:
+        now = chandra_now()
+        if now - session.get('session_start', 0) >= current_app.config.get('SESSION_TOUCH_INTERVAL', 60):
+            session['session_start'] = now
+            session.permanent        = True
+            session.modified         = True
+    else:
+        register_user()
+
 #----------------------------------------------------------------------------------------
 #----------------------------------------------------------------------------------------
 #----------------------------------------------------------------------------------------
 
 @login.user_loader
 def load_user(id):
-    return User.query.get(int(id))
+    return get_cached_user('id', int(id))
+
+#----------------------------------------------------------------------------------------
+#-- get_cached_user: find a user from the per-process cache or the user database       --
+#----------------------------------------------------------------------------------------
+
+def get_cached_user(key, value):
+    """
+    find a user from the per-process cache, or from the user database if it is not cached
+    input:  key     --- 'id' or 'username'
+            value   --- user id (int) or username
+    output: user    --- User detached from the db session; None if not found
+    """
+    mtime = find_user_db_mtime()
+    with _user_lock:
+        if mtime is None or mtime != _user_cache['mtime']:
+            _user_cache['id'].clear()
+            _user_cache['username'].clear()
+            _user_cache['mtime'] = mtime
+
+        user = _user_cache[key].get(value)
+
+    if user is not None:
+        return user
+
+    if key == 'id':
+        user = User.query.get(value)
+    else:
+        user = User.query.filter_by(username=value).first()
+#
+#--- a detached user can be handed to other requests (and threads) of this process
+#
+    if user is not None and mtime is not None:
+        db.session.expunge(user)
+        with _user_lock:
+            if _user_cache['mtime'] == mtime:
+                _user_cache['id'][user.id]             = user
+                _user_cache['username'][user.username] = user
+
+    return user
+
+#----------------------------------------------------------------------------------------
+#-- find_user_db_mtime: find the last modified time of the user database               --
+#----------------------------------------------------------------------------------------
+
+def find_user_db_mtime():
+    """
+    find the last modified time of the user database (sqlite file of SQLALCHEMY_DATABASE_URI)
+    input:  none
+    output: mtime   --- modified time; None if it cannot be found (users are not cached)
+    """
+    uri = current_app.config['SQLALCHEMY_DATABASE_URI']
+    if not uri.startswith('sqlite:///'):
+        return None
+    try:
+        return os.stat(uri[len('sqlite:///'):]).st_mtime
+    except OSError:
+        return None
@@ -4,7 +4,7 @@
 #                                                                                               #
 #               author: t. isobe (tisobe@cfa.harvard.edu)                                       #
 #                                                                                               #
-#               last update Sep 13, 2021                                                        #
+#               last update Oct 18, 2026                                                        #
 #                                                                                               #
 #################################################################################################
 
@@ -12,14 +12,93 @@ import sys
 import os
 import re
 import math
+import traceback
+import numpy
+from flask import current_app
 #
 #--- read ocat parameter list
 #
 basedir = os.path.abspath(os.path.dirname(__file__))
 
 import cus_app.supple.ocat_common_functions     as ocf
+import cus_app.ocatdatapage.ranked_table        as rtb
 
 null_list = ['','N', 'NO', 'NULL', 'NA', 'NONE', 'n', 'No', 'Null', 'null', 'Na', 'None', None]
+#
+#--- value checking rule files; the rules are compiled when this module is loaded, and
+#--- again when one of the files is modified
+#
+rule_files = (os.path.join(basedir, '../static/ocatdatapage/value_ranges'),
+              os.path.join(basedir, '../static/ocatdatapage/grouped_params'))
+rule_set   = None
+
+#-----------------------------------------------------------------------------------------------
+#-- ValueWarning: a warning of a parameter value                                              --
+#-----------------------------------------------------------------------------------------------
+
+class ValueWarning(object):
+    """
+    a warning of a parameter value
+    input:  param   --- the parameter name; a tuple of names if the warning is on several
+            rank    --- the rank (1 - 10) of a ranked entry; None if it is not ranked
+            code    --- the kind of the warning, e.g. out_of_range, missing_value
+            text    --- the warning text shown on the page; '' if the warning is a part
+                        of another warning which carries the text
+    """
+    __slots__ = ('param', 'rank', 'code', 'text')
+
+    def __init__(self, param, rank, code, text):
+        self.param = param
+        self.rank  = rank
+        self.code  = code
+        self.text  = text
+
+    def __repr__(self):
+        return 'ValueWarning(%r, %r, %r)' % (self.param, self.rank, self.code)
+
+#-----------------------------------------------------------------------------------------------
+#-- RuleSet: value checking rules compiled from the rule files                               --
+#-----------------------------------------------------------------------------------------------
+
+class RuleSet(object):
+    """
+    value checking rules compiled from the rule files; read only
+    input:  value_dict  --- a dict of parameter <--> [min, max]
+            rank_dict   --- a dict of parameter <--> [min, max] but for rank entries
+            group_list  --- a list of lists of grouped parameters
+            rgroup_list --- a list of lists of grouped parameters for ranked entries
+            mtime       --- the modification times of the rule files
+    """
+    __slots__ = ('value_params', 'value_bound', 'rank_params', 'rank_bound',\
+                 'group_list', 'rgroup_list', 'mtime')
+
+    def __init__(self, value_dict, rank_dict, group_list, rgroup_list, mtime):
+        init = object.__setattr__
+        init(self, 'value_params', tuple(value_dict.keys()))
+        init(self, 'value_bound',  read_only_bound(value_dict))
+        init(self, 'rank_params',  tuple(rank_dict.keys()))
+        init(self, 'rank_bound',   read_only_bound(rank_dict))
+        init(self, 'group_list',   tuple(tuple(a_list) for a_list in group_list))
+        init(self, 'rgroup_list',  tuple(tuple(a_list) for a_list in rgroup_list))
+        init(self, 'mtime',        mtime)
+
+    def __setattr__(self, name, val):
+        raise AttributeError('RuleSet is read only')
+
+#-----------------------------------------------------------------------------------------------
+#-- read_only_bound: make a read only (<# of params>, 2) array of [min, max]                  --
+#-----------------------------------------------------------------------------------------------
+
+def read_only_bound(r_dict):
+    """
+    make a read only (<# of params>, 2) array of [min, max]
+    input:  r_dict  --- a dict of parameter <--> [min, max]
+    output: bound   --- numpy array
+    """
+    bound = numpy.array(list(r_dict.values()), dtype=float).reshape(-1, 2)
+    bound.flags.writeable = False
+
+    return bound
 
 #-----------------------------------------------------------------------------------------------
 #-- check_value_range: check whether the values are in the expected range                     --
@@ -31,15 +110,31 @@ def check_value_range(ct_dict):
     input:  ct_dict         --- a dict of <param> <---> <information>
     output: warning_list    --- a list of warning texts
     """
-#
-#---    read value checking conditions
-#---    value_idct  --- a dict of parameter <--> [min, max]
-#---    rank_dict   --- a dict of parameter <--> [min, max] but for rank entries
-#---    group_list  --- a list of lists of grouped parameters
-#---    rgroup_list --- a list of lists of grouped parameters for ranked entries
-#---    exclude_list--- a list of two parameters which are exclusive
-#
-    value_dict, rank_dict, group_list, rgroup_list, exclude_list = read_condition_table()
+    return warning_texts(find_value_warnings(ct_dict))
+
+#-----------------------------------------------------------------------------------------------
+#-- warning_texts: make a list of the warning texts shown on the page                         --
+#-----------------------------------------------------------------------------------------------
+
+def warning_texts(warning_list):
+    """
+    make a list of the warning texts shown on the page
+    input:  warning_list    --- a list of ValueWarning
+    output: a list of warning texts; the empty texts are removed
+    """
+    return [ent.text for ent in warning_list if ent.text.strip() != '']
+
+#-----------------------------------------------------------------------------------------------
+#-- find_value_warnings: check the parameter values and return the warnings                   --
+#-----------------------------------------------------------------------------------------------
+
+def find_value_warnings(ct_dict):
+    """
+    check parameter values are in the expected range, and if not, create warnings
+    input:  ct_dict         --- a dict of <param> <---> <information>
+    output: warning_list    --- a list of ValueWarning
+    """
+    rules = get_rules()
 
     warning_list = []
 
@@ -49,99 +144,102 @@ def check_value_range(ct_dict):
 #
 #--- neumeric value range check
 #
-    for param in value_dict.keys():
-        if not param in ct_dict.keys():
-            continue
-
-        val = ct_dict[param][-1]
-        if val in null_list:
-            continue
-        else:
-            val = float(val)
-
-        if val < value_dict[param][0] or val > value_dict[param][1]:
-            name = ct_dict[param][0]
-            note = param + ' (=' + str(val) + ') should be between '
-            note = note  + str(value_dict[param][0]) + ' and ' + str(value_dict[param][1])  + '\n'
-            warning_list.append(note)
+    warning_list = value_bound_check(ct_dict, rules, warning_list)
 #
-#--- rank value check; mainly neumeric values
+#--- rank value check; mainly neumeric values. all ranks of the parameters at once
 #
-    for param in rank_dict.keys():
-        for k in range(0, 10):
-            name = ct_dict[param][0] + ' (rank: ' + str(k+1) + ')'
-            val  = ct_dict[param][-1][k]
-            if val in null_list:
-                continue
-            else:
-                if ocf.is_neumeric(val):
-                    val = float(val)
-                else:
-                    continue
-
-            if val < rank_dict[param][0] or val > rank_dict[param][1]:
-                note = name  + ' (=' + str(val) + ') should be between '
-                note = note  + str(rank_dict[param][0]) + ' and ' 
-                note = note  + str(rank_dict[param][1])  + '\n'
-                warning_list.append(note)
+    table = rtb.RankedTable(ct_dict, rules.rank_params)
+    for param, k, val in table.out_of_range(rules.rank_bound):
+        i    = rules.rank_params.index(param)
+        name = ct_dict[param][0] + ' (rank: ' + str(k+1) + ')'
+        note = name  + ' (=' + str(val) + ') should be between '
+        note = note  + str(float(rules.rank_bound[i, 0])) + ' and '
+        note = note  + str(float(rules.rank_bound[i, 1]))  + '\n'
+        warning_list.append(ValueWarning(param, k+1, 'out_of_range', note))
 #
 #--- check all parameters in the group have values (or all na)
 #
-    for a_list in group_list:
+    for a_list in rules.group_list:
         missing_list = check_param_value(a_list, ct_dict)
         mlen = len(missing_list)
         if mlen> 0:
             if mlen == 1:
-                note = 'Please supply a value to: ' 
+                note = 'Please supply a value to: '
             else:
-                note = 'Please supply values to: ' 
+                note = 'Please supply values to: '
             for param in missing_list:
                 note = note + '\n\t' + ct_dict[param][0]
             note = note + '\n'
 
-            warning_list.append(note)
+            warning_list.append(ValueWarning(tuple(missing_list), None, 'missing_value', note))
 #
 #--- ranked entry cases
 #
-    for a_list in rgroup_list:
-        for k in range(0, 10):
-            missing_list = check_param_value(a_list, ct_dict, k)
-            if len(missing_list) > 0:
-                for param in missing_list:
-                    note = 'Please supply a value to: ' + ct_dict[param][0] 
-                    note = note + ' (rank: ' + str(k+1) + ').\n';
-                    warning_list.append(note)
-#
-#--- check mutually-exclusive parameters values
-#
-    for a_list in exclude_list:
-        note = check_exclusitity(a_list, ct_dict)
-        if note != '':
-            warning_list.append(note)
-     
-    warning_list = frame_time_check(ct_dict,   warning_list)
-    warning_list = targname_check(ct_dict,     warning_list)
-    warning_list = grating_check(ct_dict,      warning_list)
-    warning_list = hrc_si_check(ct_dict,       warning_list)
+    for a_list in rules.rgroup_list:
+        for param, k in check_rank_values(a_list, ct_dict):
+            note = 'Please supply a value to: ' + ct_dict[param][0]
+            note = note + ' (rank: ' + str(k+1) + ').\n';
+            warning_list.append(ValueWarning(param, k+1, 'missing_value', note))
+
+    warning_list = frame_time_check(ct_dict,     warning_list)
+    warning_list = targname_check(ct_dict,       warning_list)
+    warning_list = grating_check(ct_dict,        warning_list)
+    warning_list = hrc_si_check(ct_dict,         warning_list)
 #
 #--- time constraint tstart and tstop check
 #
-    note = compare_tstart_tstop(ct_dict)
-    if not note == '':
-        warning_list.append(note)
+    warning_list = compare_tstart_tstop(ct_dict, warning_list)
+
+    return warning_list
+
+#-----------------------------------------------------------------------------------------------
+#-- value_bound_check: check the single neumeric values are in the expected range             --
+#-----------------------------------------------------------------------------------------------
+
+def value_bound_check(ct_dict, rules, warning_list):
+    """
+    check the single neumeric values are in the expected range; all parameters at once
+    input:  ct_dict         --- a dict of <param> <---> <information>
+            rules           --- RuleSet
+            warning_list    --- a list of warnings
+    output: warning_list    --- an updated warning_list
+    """
+    index  = [i for i, param in enumerate(rules.value_params) if param in ct_dict.keys()]
+    if len(index) == 0:
+        return warning_list
+
+    p_list = [rules.value_params[i] for i in index]
+    bound  = rules.value_bound[index]
+    v_list = numpy.empty(len(p_list), dtype=object)
+    for i, param in enumerate(p_list):
+        v_list[i] = ct_dict[param][-1]
+
+    vals   = numpy.frompyfunc(rtb.to_float, 1, 1)(v_list).astype(float)
+    nulls  = numpy.frompyfunc(lambda val: val in null_list, 1, 1)(v_list).astype(bool)
+    with numpy.errstate(invalid='ignore'):
+        out = (vals < bound[:, 0]) | (vals > bound[:, 1])
 #
-#--- remove empty lines
+#--- a value which is neither null nor neumeric cannot be checked
 #
-    cleaned = []
-    for ent in warning_list:
-        if ent.strip() == '':
-            continue
-        cleaned.append(ent)
-        
-    return cleaned
+    wrong  = numpy.isnan(vals) & ~nulls
+
+    for i in numpy.nonzero(out | wrong)[0]:
+        param = p_list[i]
+        vmin  = str(float(bound[i, 0]))
+        vmax  = str(float(bound[i, 1]))
+        if wrong[i]:
+            note = param + ' (=' + str(v_list[i]) + ') should be a numeric value between '
+            code = 'not_numeric'
+        else:
+            note = param + ' (=' + str(float(vals[i])) + ') should be between '
+            code = 'out_of_range'
+        note  = note  + vmin + ' and ' + vmax  + '\n'
+        warning_list.append(ValueWarning(param, None, code, note))
+
+    return warning_list
 
 #-----------------------------------------------------------------------------------------------
-#-- check_param_value: check if the first parameter has none-null value, whether 
+#-- check_param_value: check if the first parameter has none-null value, whether
 #-- the rest have none-null data values
 #-----------------------------------------------------------------------------------------------
 
@@ -173,30 +271,27 @@ def check_param_value(a_list, ct_dict, k=''):
     return c_list
 
 #-----------------------------------------------------------------------------------------------
-#-- check_exclusitity: check two exclusive parameters have the values at the same time        --
+#-- check_rank_values: check_param_value for all ranks of a ranked group                      --
 #-----------------------------------------------------------------------------------------------
 
-def check_exclusitity(a_list, ct_dict):
+def check_rank_values(a_list, ct_dict):
     """
-    check two exclusive parameters have the values at the same time.
-    input:  ct_dict         --- a dict of <param> <---> <information>
-            warning_list    --- a list of warning text
-    output: warning_list    --- an updated warning_list
+    check if the first parameter has none-null value in a rank, whether the rest have
+    none-null data values in the rank; all ranks are checked at once
+    input:  a_list          --- a list of grouped ranked parameters
+            ct_dict         --- a dict of <param> <---> <information>
+    output: m_list          --- a list of [<param>, <rank (0 - 9)>] with null entries,
+                                in the order of the ranks, then the parameters
     """
-    note  = ''
-    if len(a_list) > 1:
-        val0  = ct_dict[a_list[0]][-1]
-        val1  = ct_dict[a_list[1]][-1]
-        name0 = ct_dict[a_list[0]][0]
-        name1 = ct_dict[a_list[1]][0]
-        if val0 in null_list:
-            if val1 in null_list:
-                note = name0 + ' or '  + name1 + ' should have a value (but not both).'
-        else:
-            if not val1 in null_list:
-                note = name0 + ' and ' + name1 + ' cannot have values at the same time.'
+    p_list = [a_list[0]] + [param for param in a_list[1:] if param in ct_dict.keys()]
+    table  = rtb.RankedTable(ct_dict, p_list)
 
-    return note
+    opened = ~table.null_mask(null_list)[0]
+    mask   = table.null_mask(['', 'NA', None])[1:] & opened
+#
+#--- transpose to list them by rank
+#
+    return [[p_list[i+1], int(k)] for k, i in zip(*numpy.nonzero(mask.T))]
 
 #-----------------------------------------------------------------------------------------------
 #-- ra_dec_range_check: check ra/dec parameter value ranges are in the expected range         --
@@ -204,10 +299,10 @@ def check_exclusitity(a_list, ct_dict):
 
 def ra_dec_range_check(ct_dict, warning_list):
     """
-    check ra/dec parameter value ranges are in the expected range and also check 
+    check ra/dec parameter value ranges are in the expected range and also check
     the large coordindate shift.
     input:  ct_dict         --- a dict of <param> <---> <information>
-            warning_list    --- a list of warning text
+            warning_list    --- a list of warnings
     output: warning_list    --- an updated warning_list
     """
     ora       = ct_dict['dra'][-2]
@@ -223,22 +318,25 @@ def ra_dec_range_check(ct_dict, warning_list):
 #
 #--- checking ra and dec values are in expected ranges
 #
-    note    = ''
-    if ra < 0 or ra > 360:
-        note = 'The value of RA is out of range. Please check the value.\n'
-
+    warning = None
     if dec < -90 or dec > 90:
-        note = 'The value of Dec is out of range. Please check the value.\n'
+        note    = 'The value of Dec is out of range. Please check the value.\n'
+        warning = ValueWarning('ddec', None, 'out_of_range', note)
+
+    elif ra < 0 or ra > 360:
+        note    = 'The value of RA is out of range. Please check the value.\n'
+        warning = ValueWarning('dra', None, 'out_of_range', note)
 #
 #--- check whether there is a large coordindate shift
 #
-    if note == '':
+    else:
         diff      = math.sqrt((ora -ra)**2 + (odec - dec)**2)
         if diff > 0.1333:
-            note = 'The coordinates were shifted by more than 8 arcmin.  You need CDO approval.\n'
+            note    = 'The coordinates were shifted by more than 8 arcmin.  You need CDO approval.\n'
+            warning = ValueWarning(('dra', 'ddec'), None, 'coordinate_shift', note)
 
-    if note != '':
-        warning_list.append(note)
+    if warning is not None:
+        warning_list.append(warning)
 
     return warning_list
 
@@ -253,13 +351,27 @@ def frame_time_check(ct_dict, warning_list):
     but one must have a value when the instrument is acis
 
     input:  ct_dict         --- a dict of <param> <---> <information>
-            warning_list    --- a list of warning text
+            warning_list    --- a list of warnings
     output: warning_list    --- an updated warning_list
     """
     inst = ct_dict['instrument'][-1]
-    if inst in ['ACIS-I', 'ACIS-S']: 
-        note = check_exclusitity(['frame_time', 'most_efficient'], ct_dict)
-        warning_list.append(note)
+    if inst not in ['ACIS-I', 'ACIS-S']:
+        return warning_list
+
+    val0  = ct_dict['frame_time'][-1]
+    val1  = ct_dict['most_efficient'][-1]
+    name0 = ct_dict['frame_time'][0]
+    name1 = ct_dict['most_efficient'][0]
+    if val0 in null_list:
+        if val1 in null_list:
+            note = name0 + ' or '  + name1 + ' should have a value (but not both).'
+            warning_list.append(ValueWarning(('frame_time', 'most_efficient'), None,\
+                                             'exclusive_none', note))
+    else:
+        if not val1 in null_list:
+            note = name0 + ' and ' + name1 + ' cannot have values at the same time.'
+            warning_list.append(ValueWarning(('frame_time', 'most_efficient'), None,\
+                                             'exclusive_both', note))
 
     return warning_list
 
@@ -271,12 +383,12 @@ def targname_check(ct_dict, warning_list):
     """
     check whether the target name is modified and create a warning text
     input:  ct_dict         --- a dict of <param> <---> <information>
-            warning_list    --- a list of warning text
+            warning_list    --- a list of warnings
     output: warning_list    --- an updated warning_list
     """
     if ct_dict['targname'][-2]  != ct_dict['targname'][-1]:
         note = 'The target name was updated. MP will be notified this change.\n'
-        warning_list.append(note)
+        warning_list.append(ValueWarning('targname', None, 'changed', note))
 
     return warning_list
 
@@ -288,12 +400,12 @@ def grating_check(ct_dict, warning_list):
     """
     check whether the grating is updated and create a warning text
     input:  ct_dict         --- a dict of <param> <---> <information>
-            warning_list    --- a list of warning text
+            warning_list    --- a list of warnings
     output: warning_list    --- an updated warning_list
     """
     if ct_dict['grating'][-2] != ct_dict['grating'][-1]:
         note = 'The grating was updated. This Change requires CDO approval.\n'
-        warning_list.append(note)
+        warning_list.append(ValueWarning('grating', None, 'changed', note))
 
     return warning_list
 
@@ -305,7 +417,7 @@ def hrc_si_check(ct_dict, warning_list):
     """
     check whether hrc si mode is set if the inst is hrc
     input:  ct_dict         --- a dict of <param> <---> <information>
-            warning_list    --- a list of warning text
+            warning_list    --- a list of warnings
     output: warning_list    --- an updated warning_list
     """
     inst = ct_dict['instrument'][-1]
@@ -313,7 +425,7 @@ def hrc_si_check(ct_dict, warning_list):
         si_mode = ct_dict['hrc_si_mode'][-1]
         if si_mode in null_list:
             note = 'HRC SI Mode Is Not Provided.'
-            warning_list.append(note)
+            warning_list.append(ValueWarning('hrc_si_mode', None, 'missing_value', note))
 
     return warning_list
 
@@ -325,11 +437,11 @@ def flag_change_check(ct_dict, warning_list):
     """
     check whether the section flags are changed, and create a warning text
     input:  ct_dict         --- a dict of <param> <---> <information>
-            warning_list    --- a list of warning text
+            warning_list    --- a list of warnings
     output: warning_list    --- an updated warning_list
     """
     for flag in ['window_flag', 'roll_flag', 'dither_flag', 'spwindow_flag']:
-        val0 =  ct_dict[flag][-2] 
+        val0 =  ct_dict[flag][-2]
         val1 =  ct_dict[flag][-1]
 
         if val0 in null_list and val1 in null_list:
@@ -339,7 +451,7 @@ def flag_change_check(ct_dict, warning_list):
             note = ct_dict[flag][0] + ' was updated; this changes impacts constraints, and '
             note = note + 'you need a CDO approval for this change. If you already have '
             note = note + 'the permission, please indicate so in the comment section.\n'
-            warning_list.append(note)
+            warning_list.append(ValueWarning(flag, None, 'changed', note))
 
     return warning_list
 
@@ -351,7 +463,7 @@ def instrument_check(ct_dict, warning_list):
     """
     check whether the instrument is changed and create a warning text
     input:  ct_dict     --- a dict of <parameter> <---> <information>
-            waring_list --- a list of warning text
+            waring_list --- a list of warnings
     output: waring_list --- an updated warning_list
     """
     if ct_dict['instrument'][-2] != ct_dict['instrument'][-1]:
@@ -370,10 +482,53 @@ def instrument_check(ct_dict, warning_list):
             if ct_dict['instrument'][-1] in ['ACIS-I', 'ACIS-S']:
                 note = note + ' ALL HRC PARAMETERS WERE NULLIFIED.'
 
-        warning_list.append(note)
+        warning_list.append(ValueWarning('instrument', None, 'changed', note))
 
     return warning_list
 
+#-----------------------------------------------------------------------------------------------
+#-- get_rules: return the compiled value checking rules                                       --
+#-----------------------------------------------------------------------------------------------
+
+def get_rules():
+    """
+    return the compiled value checking rules; if a rule file was modified after the
+    rules were compiled, compile them again. if the new files cannot be read, the
+    last rules are kept.
+    input:  none, but check the rule files
+    output: rule_set    --- RuleSet
+    """
+    global rule_set
+
+    try:
+        mtime = tuple(os.stat(ifile).st_mtime for ifile in rule_files)
+        if rule_set is None or rule_set.mtime != mtime:
+            rule_set = compile_rules(mtime)
+
+    except Exception:
+        if rule_set is None:
+            raise
+        current_app.logger.error(traceback.format_exc())
+
+    return rule_set
+
+#-----------------------------------------------------------------------------------------------
+#-- compile_rules: read the rule files and make a RuleSet                                     --
+#-----------------------------------------------------------------------------------------------
+
+def compile_rules(mtime=None):
+    """
+    read the rule files and make a RuleSet
+    input:  mtime       --- the modification times of the rule files; if None, read them
+    output: RuleSet
+    """
+    if mtime is None:
+        mtime = tuple(os.stat(ifile).st_mtime for ifile in rule_files)
+
+    value_dict, rank_dict, group_list, rgroup_list = read_condition_table()
+
+    return RuleSet(value_dict, rank_dict, group_list, rgroup_list, mtime)
+
 #-----------------------------------------------------------------------------------------------
 #-- read_condition_table: read value checking conditions                                      --
 #-----------------------------------------------------------------------------------------------
@@ -386,14 +541,11 @@ def read_condition_table():
             rank_dict   --- a dict of parameter <--> [min, max] but for rank entries
             group_list  --- a list of lists ofgrouped parameters
             rgroup_list --- a list of lists ofgrouped parameters for ranked entries
-            exclude_list    --- a list of two parameters which are exclusive
-                                (currently exclude_list is not used)
     """
 #
 #--- a range of a param with a neumeric values
 #
-    ifile  = os.path.join(basedir, '../static/ocatdatapage/value_ranges')
-    data  = ocf.read_data_file(ifile)
+    data  = ocf.read_data_file(rule_files[0])
 
     value_dict = {}
     rank_dict  = {}
@@ -403,8 +555,8 @@ def read_condition_table():
 
         atemp = re.split(':', ent)
         param = atemp[0].strip()
-        vmin  = float(atemp[1].strip()) 
-        vmax  = float(atemp[2].strip()) 
+        vmin  = float(atemp[1].strip())
+        vmax  = float(atemp[2].strip())
         chk   = atemp[3].strip()
         if chk == 'v':
             value_dict[param] = [vmin, vmax]
@@ -413,8 +565,7 @@ def read_condition_table():
 #
 #--- a list of parameters that all must have values if at least one has a value
 #
-    ifile  = os.path.join(basedir, '../static/ocatdatapage/grouped_params')
-    data  = ocf.read_data_file(ifile)
+    data  = ocf.read_data_file(rule_files[1])
 
     group_list  = []
     rgroup_list = []
@@ -423,42 +574,57 @@ def read_condition_table():
         btemp = re.split('\s+', atemp[1])
         if atemp[0] == 's':
             group_list.append(btemp)
-        else:   
+        else:
             rgroup_list.append(btemp)
-#
-#--- a list of parameters if one has a value, other cannot has a value
-#
-    exclude_list = [[],]
 
-    return value_dict, rank_dict, group_list, rgroup_list, exclude_list
+    return value_dict, rank_dict, group_list, rgroup_list
 
 #-----------------------------------------------------------------------------------------------
 #-- compare_tstart_tstop: check whether tstart and tstop are properly set                     --
 #-----------------------------------------------------------------------------------------------
 
-def compare_tstart_tstop(ct_dict):
+def compare_tstart_tstop(ct_dict, warning_list):
     """
-    check whether tstart and tstop are properly set
-    input:  ct_dict --- a dict of <param> <--> <information>
-    output: note    --- a warning note
+    check whether tstart and tstop are properly set; all ranks at once. the notes of
+    all ranks make one warning text, followed by a ValueWarning of each rank without text
+    input:  ct_dict         --- a dict of <param> <--> <information>
+            warning_list    --- a list of warnings
+    output: warning_list    --- an updated warning_list
     """
-    note = ''
-    for k in range(0, 10):
-        if ct_dict['tstart'][-1][k] in null_list:
-            if ct_dict['tstop'][-1][k] in null_list:
-                continue
+    table = rtb.RankedTable(ct_dict, ['tstart', 'tstop'])
+    nulls = table.null_mask(null_list)
+    start = nulls[0]
+    stop  = nulls[1]
+
+    order = numpy.zeros(rtb.nrank, dtype=bool)
+    both  = ~start & ~stop
+    if both.any():
+        later = numpy.frompyfunc(lambda a, b: a > b, 2, 1)
+        order[both] = later(table.new[0, both], table.new[1, both]).astype(bool)
+
+    note   = ''
+    r_list = []
+    for k in range(0, rtb.nrank):
+        if start[k] and not stop[k]:
+            note = note + 'Tstart is not defined (rank=' + str(k+1) + ')\n'
+            r_list.append(ValueWarning('tstart', k+1, 'missing_value', ''))
+
+        elif stop[k] and not start[k]:
+            note = note + 'Tstop is not defined (rank=' + str(k+1) + ')\n'
+            r_list.append(ValueWarning('tstop', k+1, 'missing_value', ''))
+
+        elif order[k]:
+            note = note + 'Tstart and Tstop on rank ' + str(k+1)
+            note = note + ' are not properly set.\n'
+            r_list.append(ValueWarning(('tstart', 'tstop'), k+1, 'tstart_after_tstop', ''))
 
-            else:
-                note = note + 'Tstart is not defined (rank=' + str(k+1) + ')\n'
-
-        else:
-            if ct_dict['tstop'][-1][k] in null_list:
-                note = note + 'Tstop is not defined (rank=' + str(k+1) + ')\n'
-
-            else:
-                if ct_dict['tstart'][-1][k] > ct_dict['tstop'][-1][k]:
-                    note = note + 'Tstart and Tstop on rank ' + str(k+1) 
-                    note = note + ' are not properly set.\n'                
+    if note != '':
+        warning_list.append(ValueWarning(('tstart', 'tstop'), None, 'time_constraint', note))
+        warning_list.extend(r_list)
 
-    return note
+    return warning_list
 
+#
+#--- compile the rules when the module is loaded (at the app start)
+#
+rule_set = compile_rules()
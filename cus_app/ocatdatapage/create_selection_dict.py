@@ -4,7 +4,7 @@
 #                                                                                               #
 #               author: t. isobe (tisobe@cfa.harvard.edu)                                       #
 #                                                                                               #
-#               last update Sep 13, 2021                                                        #
+#               last update Oct 18, 2026                                                        #
 #                                                                                               #
 #################################################################################################
 
@@ -18,6 +18,9 @@ from flask import current_app
 
 import cus_app.supple.ocat_common_functions     as ocf
 import cus_app.supple.read_ocat_data            as rod
+import cus_app.supple.ocat_data_cache           as odc
+import cus_app.ocatdatapage.param_table         as ptb
+import cus_app.ocatdatapage.ranked_table        as rtb
 #
 #--- reading directory list
 #
@@ -51,6 +54,43 @@ awin_list = ['chip',  'start_row', 'start_column',\
               'height', 'width', 'lower_threshold', 'pha_range', 'sample',] 
 
 rank_list = time_list + roll_list + awin_list
+#
+#--- parameter registry: p_id, label, choices, type, group and value of each parameter
+#
+spec_file   = os.path.join(basedir, '../static/ocatdatapage/param_spec')
+param_spec  = []
+#
+#--- named choice sets used in param_spec; 'year' changes with the current year
+#
+month       = ('NA',  'Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun','Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+date        = ['NA'] + [ocf.add_leading_zero(i, 2) for i in range(1, 32)]
+chip        = ('NA', 'I0', 'I1', 'I2', 'I3', 'S0', 'S1', 'S2', 'S3', 'S4', 'S5')
+
+choice_sets = {'npy'          : choice_npy,
+               'ny'           : choice_ny,
+               'nny'          : choice_nny,
+               'nncp'         : choice_nncp,
+               'ccd'          : (('NA', 'NA'), ('N','NO'), ('Y','YES'), ('O1','OPT1'),('O2','OPT2'),\
+                                 ('O3', 'OPT3'), ('O4','OPT4'), ('O5','OPT5'),),
+               'subarray'     : (('NONE', 'NONE'), ('N', 'NO'), ('CUSTOM', 'YES'),),
+               'window_chip'  : [(x, x) for x in chip],
+               'month'        : [(x, x) for x in month],
+               'date'         : [(x, x) for x in date],
+               'hrc_si_select': [('n', 'NO'), ('y', 'YES')],
+               'year'         : 'year',
+              }
+#
+#--- entries which are not database parameters: image links, section open indicators, approved
+#--- (these were 5-element lists [<label>, '', 'n', <org>, <value>]; they now read as 6 items
+#--- with the group '' at [3], like all the other entries. [0], [-2] and [-1] are unchanged)
+#
+extra_specs = {'rass'     : ptb.ParamSpec('rass',      'RASS'),
+               'rosat'    : ptb.ParamSpec('rosat',     'ROSAT'),
+               'dss'      : ptb.ParamSpec('dss',       'DSS'),
+               'hrc_open' : ptb.ParamSpec('hrc_open',  'HRC'),
+               'acis_open': ptb.ParamSpec('acis_open', 'ACIS'),
+               'approved' : ptb.ParamSpec('approved',  'Approved'),
+              }
 
 #-----------------------------------------------------------------------------------------------
 #-- create_selection_dict: create a dict of p_id <--> [<label>, <selection>, <selectiontye>...]
@@ -59,8 +99,8 @@ rank_list = time_list + roll_list + awin_list
 def create_selection_dict(obsid):
     """
     input:  obsid
-    output: p_dict --- a dictionary of <p_id> 
-                            <--> [<label>, <selection>, <selection type>,<group>, <org value>, <value>]
+    output: p_dict --- a ParamTable of <p_id> <--> ParamEntry, which reads as
+                            [<label>, <selection>, <selection type>,<group>, <org value>, <value>]
                         label           a discriptive name of the parameter
                         selection:      blank space, or a list of [(param, display name),...]
                         selection type: n       --- non-editable/not to display
@@ -80,1392 +120,30 @@ def create_selection_dict(obsid):
                                         nu      --- Not Used
                         org value       the value of parameter extracted from the database
                         value           the updated value 
+    note: the dict is built only once for an obsid during one http request
     """
+    p_dict  = odc.request_get('create_selection_dict', obsid)
+    if p_dict is not None:
+        return p_dict
 #
 #--- get the values from the database
 #
     ct_dict = rod.read_ocat_data(obsid)
-    p_dict  = {}
-#
-#---  general parameters; non editable entries
-#
-    p_id         = 'seq_nbr'
-    label        = 'Sequence Number'
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'targid' 
-    label        = 'Target ID'
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'status'
-    label        = 'Status'
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'obsid'
-    label        = 'Obsid'
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'proposal_number'
-    label        = 'Proposal Number'
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'proposal_title'
-    label        = 'Proposal Title'
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'obs_ao_str'
-    label        = 'Obs AO Status' 
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'si_mode'
-    label        = 'SI Mode'
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'aca_mode'
-    label        = 'ACA Mode'
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'pi_name'
-    label        = 'PI Name'
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'observer'
-    label        = 'Observer'
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'approved_exposure_time'
-    label        = 'Exposure Time'
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    vals         = adjust_dicimal(vals, dic=1)
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'rem_exp_time'
-    label        = 'Remaining Exposure Time'
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = float(ct_dict[p_id])
-    if vals < 0:
-        vals     = '0.0'
-    else:
-        vals     = adjust_dicimal(vals, dic=1)
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'proposal_joint'
-    label        = 'Joint Proposal'
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'proposal_hst'
-    label        = 'HST Approved Time'
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'proposal_noao'
-    label        = 'NOAO Approved Time'
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'proposal_xmm'
-    label        = 'XMM Approved Time'
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'proposal_rxte'
-    label        = 'RXTE Approved Time'
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'proposal_vla'
-    label        = 'VLA Approved Time'
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'proposal_vlba'
-    label        = 'VLBA Approved Time'
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'soe_st_sched_date'
-    label        = 'Scheduled Date'
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    vals         = time_format_convert_lts(vals)
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'lts_lt_plan'
-    label        = 'LTS Date'
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    vals         = time_format_convert_lts(vals)
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'soe_roll'
-    label        = 'Roll Observed'
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    if ocf.is_neumeric(vals):
-        vals         = '%3.2f' % float(ct_dict[p_id])
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'planned_roll'
-    label        = 'Planned Roll'
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = find_planned_roll(obsid)
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-#
-#--- general parameter; editable entries
-#
-    p_id         = 'instrument'
-    label        = 'Instrument'
-    choice       = ('ACIS-I', 'ACIS-S', 'HRC-I', 'HRC-S')
-    choices      = [(x, x) for x in choice]
-    lind         = 'l'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'grating'
-    label        = 'Grating'
-    choice       = ('NONE', 'LETG', 'HETG')
-    choices      = [(x, x) for x in choice]
-    lind         = 'l'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'type'
-    label        = 'Type'
-    choice       = ('GO', 'TOO', 'GTO', 'CAL', 'DDT', 'CAL_ER', 'ARCHIVE', 'CDFS', 'CLP')
-    choices      = [(x, x) for x in choice]
-    lind         = 'l'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'targname'
-    label        = 'Target Name'
-    choices      = ''
-    lind         = 'v'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'ra'
-    label        = 'RA'
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    try:
-        vals     = '%3.6f' % float(round(vals,6))
-    except:
-        vals     = '0.0'
-    ra           = vals
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'dec'
-    label        = 'Dec'
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    try:
-        vals     = '%3.6f' % float(round(vals, 6))
-    except:
-        vals     = '0.0'
-    dec          = vals
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-#
-#--- converting ra/dec display format
-#
-    tra, tdec    = ocf.convert_ra_dec_format(ra, dec)
-
-    p_id         = 'dra'
-    label        = 'RA (HMS)'
-    choices      = ''
-    lind         = 'v'
-    group        = 'gen'
-    vals         = tra
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'ddec'
-    label        = 'Dec (DMS)'
-    choices      = ''
-    lind         = 'v'
-    group        = 'gen'
-    vals         = tdec
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'y_det_offset'
-    label        = 'Offset: Y'
-    choices      = ''
-    lind         = 'v'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'z_det_offset'
-    label        = 'Offset: Z'
-    choices      = ''
-    lind         = 'v'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'trans_offset'
-    label        = 'Z-Sim'
-    choices      = ''
-    lind         = 'v'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'focus_offset'
-    label        = 'Sim-Focus'
-    choices      = ''
-    lind         = 'v'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'raster_scan'
-    label        = 'Raster Scan'
-    choices      = ''
-    lind         = 'n'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'defocus'
-    label        = 'Focus'
-    choices      = ''
-    lind         = 'v'
-    group        = 'gen'
-    vals         = ''
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'uninterrupt'
-    label        = 'Uninterrupted Obs'
-    choices      = choice_npy
-    lind         = 'l'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'extended_src'
-    label        = 'Extended SRC'
-    choices      = choice_ny
-    lind         = 'l'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'obj_flag'
-    label        = 'Solar System Object'
-    choice       = ('NO', 'MT', 'SS')
-    choices      = [(x, x) for x in choice]
-    lind         = 'l'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'object'
-    label        = 'Object'
-    group        = 'gen'
-    choice       = ('NONE', 'NEW', 'COMET', 'EARTH', 'JUPITER', 'MARS',\
-                    'MOON', 'NEPTUNE', 'PLUTO', 'SATURN', 'URANUS', 'VENUS')
-    choices      = [(x, x) for x in choice]
-    lind         = 'l'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'photometry_flag'
-    label        = 'Photometry'
-    choices      = choice_nny
-    lind         = 'l'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'vmagnitude'
-    label        = 'V Mag'
-    choices      = ''
-    lind         = 'v'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'est_cnt_rate'
-    label        = 'Count Rate'
-    choices      = ''
-    lind         = 'v'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'forder_cnt_rate'
-    label        = '1st Order Rate'
-    choices      = ''
-    lind         = 'v'
-    group        = 'gen'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-#
-#---  Dither Parameters
-#
-    p_id         = 'dither_flag'
-    label        = 'Dither'
-    choices      = choice_nny
-    lind         = 'l'
-    group        = 'dt'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'y_amp'
-    label        = 'Y_Amp (in degrees)'
-    choices      = ''
-    lind         = 'n'
-    group        = 'dt'
-    y_amp        = ct_dict[p_id]
-    vals         = adjust_dicimal(y_amp)
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'y_amp_asec'
-    label        = 'Y_Amp (in arcsec)'
-    choices      = ''
-    lind         = 'v'
-    group        = 'dt'
-    vals         = convert_to_arcsec(y_amp)
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'y_freq'
-    label        = 'Y_Freq (in degrees/sec)'
-    choices      = ''
-    lind         = 'n'
-    group        = 'dt'
-    y_freq       = ct_dict[p_id]
-    vals         = adjust_dicimal(y_freq)
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'y_freq_asec'
-    label        = 'Y_Freq (in arcsec/sec)'
-    choices      = ''
-    lind         = 'v'
-    group        = 'dt'
-    vals         = convert_to_arcsec(y_freq)
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'y_phase'
-    label        = 'Y_Phase'
-    choices      = ''
-    lind         = 'v'
-    group        = 'dt'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'z_amp'
-    label        = 'Z_Amp (in degrees)'
-    choices      = ''
-    lind         = 'n'
-    group        = 'dt'
-    z_amp        = ct_dict[p_id]
-    vals         = adjust_dicimal(z_amp)
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'z_amp_asec'
-    label        = 'Z_Amp (in arcsec)'
-    choices      = ''
-    lind         = 'v'
-    group        = 'dt'
-    vals         = convert_to_arcsec(z_amp)
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'z_freq'
-    label        = 'Z_Freq (in degrees/sec)'
-    choices      = ''
-    lind         = 'n'
-    group        = 'dt'
-    z_freq       = ct_dict[p_id]
-    vals         = adjust_dicimal(z_freq)
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'z_freq_asec'
-    label        = 'Z_Freq (in arcsec/sec)'
-    choices      = ''
-    lind         = 'v'
-    group        = 'dt'
-    vals         = convert_to_arcsec(z_freq)
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'z_phase'
-    label        = 'Z_Phase'
-    choices      = ''
-    lind         = 'v'
-    group        = 'dt'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-#
-#--- Time Constraints
-
-    p_id         = 'window_flag'
-    label        = 'Window Flag'
-    choices      = choice_ny
-    lind         = 'l'
-    group        = 'tc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'time_ordr'
-    label        = 'Time Order' 
-    choices      = ''
-    lind         = 'v'
-    group        = 'tc'
-    vals         = ct_dict[p_id]
-    time_ordr    = vals
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-#
-#--- set lists of yeas, month, and date for pulldown menus
-#
-    year         = ['NA'] + ocf.set_year_list(chk=1)
-    month        = ('NA',  'Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',\
-                    'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
-    date         = ['NA']
-    for i in range(1, 32):
-        date.append(ocf.add_leading_zero(i, 2))
-
-    p_id         = 'window_constraint'
-    label        = 'Window Constraint'
-    choices      = choice_nncp
-    lind         = 'l'
-    group        = 'tc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'tstart'
-    label        = 'Tstart'
-    choices      = [(x, x) for x in month]
-    lind         = 'l'
-    group        = 'tc'
-    vals         = ct_dict[p_id]
-    tstart       = vals
-    p_dict[p_id] = [label, choices, lind, group, vals, copy.deepcopy(vals)]
-
-    start_list   = separate_time_to_rank(tstart)
-
-    p_id         = 'tstop'
-    label        = 'Tstop'
-    choices      = [(x, x) for x in date]
-    lind         = 'l'
-    group        = 'tc'
-    vals         = ct_dict[p_id]
-    tstop        = vals
-    p_dict[p_id] = [label, choices, lind, group, vals, copy.deepcopy(vals)]
-
-    stop_list    = separate_time_to_rank(tstop)
-
-    p_id         = 'tstart_month'
-    label        = 'Start Month'
-    choices      = [(x, x) for x in month]
-    lind         = 'l'
-    group        = 'tc'
-    vals         = start_list[1]
-    p_dict[p_id] = [label, choices, lind, group, vals, copy.deepcopy(vals)]
-
-    p_id         = 'tstart_date'
-    label        = 'Start Date'
-    choices      = [(x, x) for x in date]
-    lind         = 'l'
-    group        = 'tc'
-    vals         = start_list[2]
-    p_dict[p_id] = [label, choices, lind, group, vals, copy.deepcopy(vals)]
-
-    p_id         = 'tstart_year'
-    label        = 'Start Year'
-    choices      = [(x, x) for x in year]
-    lind         = 'l'
-    group        = 'tc'
-    vals         = start_list[0]
-    p_dict[p_id] = [label, choices, lind, group, vals, copy.deepcopy(vals)]
-
-    p_id         = 'tstart_time'
-    label        = 'Start Time'
-    choices      = ''
-    lind         = 'v'
-    group        = 'tc'
-    vals         = start_list[3]
-    p_dict[p_id] = [label, choices, lind, group, vals, copy.deepcopy(vals)]
-
-    p_id         = 'tstop_month'
-    label        = 'Stop Month'
-    choices      = [(x, x) for x in month]
-    lind         = 'l'
-    group        = 'tc'
-    vals         = stop_list[1] 
-    p_dict[p_id] = [label, choices, lind, group, vals, copy.deepcopy(vals)]
-
-    p_id         = 'tstop_date'
-    label        = 'Stop Date'
-    choices      = [(x, x) for x in date]
-    lind         = 'l'
-    group        = 'tc'
-    vals         = stop_list[2] 
-    p_dict[p_id] = [label, choices, lind, group, vals, copy.deepcopy(vals)]
-
-    p_id         = 'tstop_year'
-    label        = 'Stop Year'
-    choices      = [(x, x) for x in year]
-    lind         = 'l'
-    group        = 'tc'
-    vals         = stop_list[0]
-    p_dict[p_id] = [label, choices, lind, group, vals, copy.deepcopy(vals)]
-
-    p_id         = 'tstop_time'
-    label        = 'Stop Time'
-    choices      = ''
-    lind         = 'v'
-    group        = 'tc'
-    vals         = stop_list[3] 
-    p_dict[p_id] = [label, choices, lind, group, vals, copy.deepcopy(vals)]
-#
-#--- Roll Constraints
-#
-    p_id         = 'roll_flag'
-    label        = 'Roll Flag'
-    choices      = choice_ny
-    lind         = 'l'
-    group        = 'rc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'roll_ordr'
-    label        = 'Roll Order'
-    choices      = ''
-    lind         = 'v'
-    group        = 'rc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, copy.deepcopy(vals)]
-
-    p_id         = 'roll_constraint'
-    label        = 'Roll Angle Constraints'
-    choices      = choice_nncp
-    lind         = 'l'
-    group        = 'rc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, copy.deepcopy(vals)]
-    
-    p_id         = 'roll_180'
-    label        = 'Roll_180'
-    choices      = choice_nny
-    lind         = 'l'
-    group        = 'rc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, copy.deepcopy(vals)]
-
-    p_id         = 'roll'
-    label        = 'Roll'
-    choices      = ''
-    lind         = 'v'
-    group        = 'rc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, copy.deepcopy(vals)]
-
-    p_id         = 'roll_tolerance'
-    label        = 'Roll Tolerance'
-    choices      = ''
-    lind         = 'v'
-    group        = 'rc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, copy.deepcopy(vals)]
 #
-#--- Other Constraints
+#--- per-obsid work is one pass over param_spec
 #
-    p_id         = 'constr_in_remarks'
-    label        = 'Constraints in Remarks?'
-    choices      = choice_npy
-    lind         = 'l'
-    group        = 'oc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'phase_constraint_flag'
-    label        = 'Phase Constraint'
-    choices      = choice_nncp
-    lind         = 'n'
-    group        = 'oc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'phase_epoch'
-    label        = 'Phase Epoch'
-    choices      = ''
-    lind         = 'v'
-    group        = 'oc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'phase_period'
-    label        = 'Phase Period'
-    choices      = ''
-    lind         = 'v'
-    group        = 'oc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'phase_start'
-    label        = 'Phase Min'
-    choices      = ''
-    lind         = 'v'
-    group        = 'oc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'phase_start_margin'
-    label        = 'Phase Min Error'
-    choices      = ''
-    lind         = 'v'
-    group        = 'oc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'phase_end'
-    label        = 'Phase Max'
-    choices      = ''
-    lind         = 'v'
-    group        = 'oc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'phase_end_margin'
-    label        = 'Phase Max Error'
-    choices      = ''
-    lind         = 'v'
-    group        = 'oc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'monitor_flag'
-    label        = 'Monitoring Observation'
-    choices      = choice_ny
-    lind         = 'l'
-    group        = 'oc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-
-    p_id         = 'monitor_series'
-    label        = 'Monitoring Series'
-    choices      = ''
-    lind         = 'v'
-    group        = 'oc'
-    try:
-        vals     = ct_dict[p_id][0][0]
-    except:
-        vals     = []
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'pre_id'
-    label        = 'Follows ObsID#'
-    choices      = ''
-    lind         = 'v'
-    group        = 'oc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'pre_min_lead'
-    label        = 'Follows Obs Min Int'
-    choices      = ''
-    lind         = 'v'
-    group        = 'oc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'pre_max_lead'
-    label        = 'Follows Obs Max Int'
-    choices      = ''
-    lind         = 'v'
-    group        = 'oc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'multitelescope'
-    label        = 'Coordinated Observation'
-    choices      = choice_npy
-    lind         = 'l'
-    group        = 'oc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'observatories'
-    label        = 'Observatories'
-    choices      = ''
-    lind         = 'v'
-    group        = 'oc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'multitelescope_interval'
-    label        = 'Max Coordination Offset'
-    choices      = ''
-    lind         = 'v'
-    group        = 'oc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'pointing_constraint'
-    label        = 'Pointing Update'
-    choices      = choice_nny
-    lind         = 'l'
-    group        = 'oc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-#
-#--- HRC Parameters
-#
-    p_id         = 'hrc_timing_mode'
-    label        = 'HRC Timing Mode'
-    choices      = choice_ny
-    lind         = 'l'
-    group        = 'hrc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id            = 'hrc_zero_block'
-    label        = 'Zero Block'
-    choices      = choice_ny
-    lind         = 'l'
-    group        = 'hrc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'hrc_si_mode'
-    label        = 'SI Mode'
-    choices      = ''
-    lind         = 'v'
-    group        = 'hrc'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'hrc_si_select'
-    label        = 'HRC SI SELECT'
-    choices      = [('n', 'NO'), ('y', 'YES')]
-    lind         = 'l'
-    group        = 'hrc'
-    vals         = ''
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-#
-#--- ACIS Parameters
-#
-    p_id         = 'exp_mode'
-    label        = 'ACIS Exposure Mode'
-    choice       =  ('NA', 'TE', 'CC')
-    choices      = [(x, x) for x in choice]
-    lind         = 'l'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-#    p_id         = 'fep'
-#    label        = 'Fep'
-#    choice       =  ('NA', 'TE', 'CC')
-#    choices      = ''
-#    lind         = 'n'
-#    group        = 'acis'
-#    vals         = ct_dict[p_id]
-#    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'dropped_chip_count'
-    label        = 'Dropped Chip Count'
-    choice       =  ('NA', 'TE', 'CC')
-    choices      = ''
-    lind         = 'n'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'bep_pack'
-    label        = 'Event TM Format'
-    choice       =  ('NA', 'F', 'VF', 'F+B', 'G')
-    choices      = [(x, x) for x in choice]
-    lind         = 'l'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'frame_time'
-    label        = 'Frame Time'
-    choices      = ''
-    lind         = 'v'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'most_efficient'
-    label        = 'Most Efficient'
-    choices      = choice_nny
-    lind         = 'l'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-#
-#--- set chip selection list
-#
-    c_choices    =  (('NA', 'NA'), ('N','NO'), ('Y','YES'), ('O1','OPT1'),\
-                     ('O2','OPT2'), ('O3', 'OPT3'), ('O4','OPT4'), ('O5','OPT5'),)
-
-    p_id         = 'ccdi0_on'
-    label        = 'I0'
-    choices      = c_choices
-    lind         = 'l'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'ccdi1_on'
-    label        = 'I1'
-    choices      = c_choices
-    lind         = 'l'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'ccdi2_on'
-    label        = 'I2'
-    choices      = c_choices
-    lind         = 'l'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'ccdi3_on'
-    label        = 'I3'
-    choices      = c_choices
-    lind         = 'l'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'ccds0_on'
-    label        = 'S0'
-    choices      = c_choices
-    lind         = 'l'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'ccds1_on'
-    label        = 'S1'
-    choices      = c_choices
-    lind         = 'l'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'ccds2_on'
-    label        = 'S2'
-    choices      = c_choices
-    lind         = 'l'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'ccds3_on'
-    label        = 'S3'
-    choices      = c_choices
-    lind         = 'l'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'ccds4_on'
-    label        = 'S4'
-    choices      = c_choices
-    lind         = 'l'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'ccds5_on'
-    label        = 'S5'
-    choices      = c_choices
-    lind         = 'l'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'subarray'
-    label        = 'Use Subarray'
-    choices      = (('NONE', 'NONE'), ('N', 'NO'), ('CUSTOM', 'YES'),)
-    lind         = 'l'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'subarray_start_row'
-    label        = 'Start'
-    choices      = ''
-    lind         = 'v'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'subarray_row_count'
-    label        = 'Rows'  
-    choices      = ''
-    lind         = 'v'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'duty_cycle'
-    label        = 'Duty Cycle'
-    choices      = choice_nny
-    lind         = 'l'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'secondary_exp_count'
-    label        = 'Number'
-    choices      = ''
-    lind         = 'v'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'primary_exp_time'
-    label        = 'Tprimary'
-    choices      = ''
-    lind         = 'v'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'onchip_sum'
-    label        = 'Onchip Summing'
-    choices      = choice_nny
-    lind         = 'l'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'onchip_row_count'
-    label        = 'Onchip Rows'
-    choices      = ''
-    lind         = 'v'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'onchip_column_count'
-    label        = 'Onchip Columns'
-    choices      = ''
-    lind         = 'v'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'eventfilter'
-    label        = 'Energy Filter'
-    choices      = choice_nny
-    lind         = 'l'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'eventfilter_lower'
-    label        = 'Lowest Energy'
-    choices      = ''
-    lind         = 'v'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'eventfilter_higher'
-    label        = 'Energy Range'
-    choices      = ''
-    lind         = 'v'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'multiple_spectral_lines'
-    label        = 'Multi Spectral Lines'
-    choices      = choice_nny
-    lind         = 'l'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'spectra_max_count'
-    label        = 'Spectra Max Count'  
-    choices      = ''
-    lind         = 'v'
-    group        = 'acis'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-#
-#--- ACIS Window Constraints
-#
-    choice       =  ('NA','I0', 'I1',  'I2', 'I3', 'S0', 'S1', 'S2', 'S3', 'S4', 'S5')
-    a_choices    = [(x, x) for x in choice]
-
-    p_id         = 'aciswin_no'
-    label        = 'ACIS Window #'
-    choices      = ''
-    lind         = 'v'
-    group        = 'awin'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'ordr'
-    label        = 'Ordr'
-    choices      = ''
-    lind         = 'v'
-    group        = 'awin'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, copy.deepcopy(vals)]
-
-#    p_id         = 'aciswin_id'
-#    label        = 'ACIS Window ID'
-#    choices      = ''
-#    lind         = 'l'
-#    group        = 'awin'
-#    vals         = ct_dict[p_id]
-#    p_dict[p_id] = [label, choices, lind, group, vals, copy.deepcopy(vals)]
-
-#    p_id         = 'include_flag'
-#    label        = 'ACIS Window Flag'
-#    choices      = ''
-#    lind         = 'n'
-#    group        = 'awin'
-#    vals         = ct_dict[p_id]
-#    p_dict[p_id] = [label, choices, lind, group, vals, copy.deepcopy(vals)]
-
-    p_id         = 'chip'
-    label        = 'Chip'
-    choices      = a_choices
-    lind         = 'l'
-    group        = 'awin'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, copy.deepcopy(vals)]
-
-    p_id         = 'start_row'
-    label        = 'Start Row'
-    choices      = ''
-    lind         = 'v'
-    group        = 'awin'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, copy.deepcopy(vals)]
-
-    p_id         = 'start_column'
-    label        = 'Start Column'
-    choices      = ''
-    lind         = 'v'
-    group        = 'awin'
-    vals         = ct_dict[p_id]
-    group        = 'awin'
-    p_dict[p_id] = [label, choices, lind, group, vals, copy.deepcopy(vals)]
-
-    p_id         = 'height'
-    label        = 'Height'
-    choices      = ''
-    lind         = 'v'
-    group        = 'awin'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, copy.deepcopy(vals)]
-
-    p_id         = 'width'
-    label        = 'Width'
-    choices      = ''
-    lind         = 'v'
-    group        = 'awin'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, copy.deepcopy(vals)]
-
-    p_id         = 'lower_threshold'
-    label        = 'Lower Energy'
-    choices      = ''
-    lind         = 'v'
-    group        = 'awin'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, copy.deepcopy(vals)]
-
-
-    p_id         = 'pha_range'
-    label        = 'Energy Range'
-    choices      = ''
-    lind         = 'v'
-    group        = 'awin'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, copy.deepcopy(vals)]
-
-    p_id         = 'sample'
-    label        = 'Sample Rate'
-    choices      = ''
-    lind         = 'v'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, copy.deepcopy(vals)]
-#
-#--- TOO
-#
-    p_id         = 'tooid'
-    label        = 'TOO ID'
-    choices      = ''
-    lind         = 'n'
-    group        = 'too'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'too_trig'
-    label        = 'TOO Trigger'
-    choices      = ''
-    lind         = 'n'
-    group        = 'too'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'too_type'
-    label        = 'TOO Type'
-    choices      = ''
-    lind         = 'n'
-    group        = 'too'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'too_start'
-    label        = 'TOO Start'
-    choices      = ''
-    lind         = 'n'
-    group        = 'too'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'too_stop'
-    label        = 'TOO Stop'
-    choices      = ''
-    lind         = 'n'
-    group        = 'too'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'too_followup'
-    label        = '# of Follow-up Observations'
-    choices      = ''
-    lind         = 'n'
-    group        = 'too'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'too_remarks'
-    label        = 'Too Remarks'
-    choices      = ''
-    lind         = 'n'
-    group        = 'too'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'spwindow_flag'
-    label        = 'Window Filter'
-    group        = 'too'
-    choices      = choice_nny
-    lind         = 'l'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-#
-#--- Others 
-#
-    p_id         = 'description'
-    label        = 'Description'
-    choices      = ''
-    lind         = 'n'
-    group        = 'rest'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'total_fld_cnt_rate'
-    label        = 'Total Fld Cnt Rate'
-    choices      = ''
-    lind         = 'n'
-    group        = 'rest'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'group_id'
-    label        = 'Group ID'
-    choices      = ''
-    lind         = 'n'
-    group        = 'rest'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'group_obsid'
-    label        = 'Group Obsids'
-    choices      = ''
-    lind         = 'n'
-    group        = 'rest'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'remarks' 
-    label        = 'Remarks'
-    choices      = ''
-    lind         = 'v'
-    group        = 'remarks'
-    vals         = ct_dict[p_id].replace('\"', '\'')
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'comments'
-    label        = 'Comments'
-    choices      = ''
-    lind         = 'v'
-    group        = 'remarks'
-    vals         = ct_dict[p_id].replace('\"', '\'')
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'monitor_series'
-    label        = 'Monitor Series'
-    choices      = ''
-    lind         = 'n'
-    group        = 'rest'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-#
-#-- Not Used in Ocat Data Page
-#
-    p_id         = 'seg_max_num'
-    label        = 'Seg Max Number'
-    choices      = ''
-    lind         = 'n'
-    group        = 'nu'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'ocat_propid'
-    label        = 'Ocat Proposal ID'
-    choices      = ''
-    lind         = 'n'
-    group        = 'nu'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'acisid'
-    label        = 'ACIS ID'
-    choices      = ''
-    lind         = 'n'
-    group        = 'nu'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'hrcid'
-    label        = 'HRC ID'
-    choices      = ''
-    lind         = 'n'
-    group        = 'nu'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'mpcat_star_fidlight_file'
-    label        = 'Fid Light File'
-    choices      = ''
-    lind         = 'n'
-    group        = 'nu'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-
-    p_id         = 'data_rights'
-    label        = 'Data Rights'
-    choices      = ''
-    lind         = 'n'
-    group        = 'nu'
-    vals         = ct_dict[p_id]
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
-#
-#--- add obsids_list; keeps a list of obsids for the case of multi obsid submission
-#
-    p_id         = 'obsids_list'
-    label        = 'ObsIDs List'
-    choices      = ''
-    lind         = 'n'
-    vals         = ''
-    p_dict[p_id] = [label, choices, lind, group, vals, vals]
+    p_dict  = ptb.ParamTable()
+    memo    = {'obsid': obsid}
+    year    = year_choices()
+    for spec in read_param_spec():
+        if spec.choices == 'year':
+            spec = spec.with_choices(year)
+
+        vals = spec.fill(spec.p_id, spec.arg, ct_dict, p_dict, memo)
+        if spec.copy:
+            p_dict.add(spec, vals, copy.deepcopy(vals))
+        else:
+            p_dict.add(spec, vals, vals)
 #
 #--- creating image link data
 #
@@ -1493,19 +171,19 @@ def create_selection_dict(obsid):
         elif 'dss.gif' in test:
             dss   = part + 'dss.gif'
 
-    p_dict['rass']  = ['RASS',  '', 'n', rass,  rass]
-    p_dict['rosat'] = ['ROSAT', '', 'n', rosat, rosat]
-    p_dict['dss']   = ['DSS',   '', 'n', dss,   dss]
+    p_dict.add(extra_specs['rass'],  rass,  rass)
+    p_dict.add(extra_specs['rosat'], rosat, rosat)
+    p_dict.add(extra_specs['dss'],   dss,   dss)
 #
 #--- creating acis/hrc section open indicators
 #
     inst = ct_dict['instrument']
     if inst in ['HRC-I', 'HRC-S']:
-        p_dict['hrc_open']  = ['HRC',  '', 'n', 'open',  'open']
-        p_dict['acis_open'] = ['ACIS', '', 'n', 'close', 'close']
+        p_dict.add(extra_specs['hrc_open'],  'open',  'open')
+        p_dict.add(extra_specs['acis_open'], 'close', 'close')
     else:
-        p_dict['hrc_open']  = ['HRC',  '', 'n', 'close', 'close']
-        p_dict['acis_open'] = ['ACIS', '', 'n', 'open',  'open']
+        p_dict.add(extra_specs['hrc_open'],  'close', 'close')
+        p_dict.add(extra_specs['acis_open'], 'open',  'open')
 
 #
 #--- check whether obsid is in approved list
@@ -1523,11 +201,149 @@ def create_selection_dict(obsid):
             chk = 1
             break
 
-    p_dict['approved'] = ['Approved', '', 'n', chk, chk]
+    p_dict.add(extra_specs['approved'], chk, chk)
 
+    odc.request_set('create_selection_dict', obsid, p_dict)
 
     return p_dict  
 
+#-----------------------------------------------------------------------------------------------
+#-- read_param_spec: read the parameter registry param_spec once                              --
+#-----------------------------------------------------------------------------------------------
+
+def read_param_spec():
+    """
+    read the parameter registry param_spec once for the process
+    input:  none, but read from <basedir>/../static/ocatdatapage/param_spec
+    output: param_spec  --- a list of ParamSpec (p_id, label, choices, selection type, group,
+                            fill function, fill argument, copy)
+    """
+    if len(param_spec) > 0:
+        return param_spec
+
+    s_list = []
+    for ent in ocf.read_data_file(spec_file):
+        if ent.startswith('#') or ent.strip() == '':
+            continue
+
+        atemp = [x.strip() for x in re.split('\t+', ent.strip())]
+        if len(atemp) != 7:
+            raise ValueError(f'param_spec: {ent} does not have 7 fields')
+
+        p_id, label, choice, lind, group, value, dcopy = atemp
+        if choice == '-':
+            choices = ''
+        elif choice in choice_sets:
+            choices = choice_sets[choice]
+        elif ',' in choice:
+            choices = [(x, x) for x in choice.split(',')]
+        else:
+            raise ValueError(f'param_spec: unknown choice set {choice} for {p_id}')
+
+        btemp = value.split(':', 1)
+        if btemp[0] not in fill_funcs:
+            raise ValueError(f'param_spec: unknown value {value} for {p_id}')
+        arg   = btemp[1] if len(btemp) > 1 else ''
+
+        s_list.append(ptb.ParamSpec(p_id, label, choices, lind, group,\
+                                    fill_funcs[btemp[0]], arg, dcopy == 'Y'))
+    if len(s_list) == 0:
+        raise ValueError(f'param_spec: no parameter is found in {spec_file}')
+#
+#--- fill the shared list only when the whole file is read
+#
+    param_spec.extend(s_list)
+
+    return param_spec
+
+#-----------------------------------------------------------------------------------------------
+#-- year_choices: create the year choices of a pulldown menu                                  --
+#-----------------------------------------------------------------------------------------------
+
+def year_choices():
+    """
+    create the year choices of a pulldown menu
+    input:  none
+    output: a list of [(<year>, <year>),...] starting with ('NA', 'NA')
+    """
+    return [(x, x) for x in ['NA'] + ocf.set_year_list(chk=1)]
+
+#-----------------------------------------------------------------------------------------------
+#-- fill_*: make a parameter value from the database values; see the note of param_spec       --
+#-----------------------------------------------------------------------------------------------
+#
+#--- all take: p_id, the argument after ':' in param_spec, ct_dict, p_dict made so far, and
+#--- memo which keeps values shared by several parameters of one obsid
+#
+
+def fill_raw(p_id, arg, ct_dict, p_dict, memo):
+    return ct_dict[p_id]
+
+def fill_blank(p_id, arg, ct_dict, p_dict, memo):
+    return ''
+
+def fill_dec1(p_id, arg, ct_dict, p_dict, memo):
+    return adjust_dicimal(ct_dict[p_id], dic=1)
+
+def fill_dec4(p_id, arg, ct_dict, p_dict, memo):
+    return adjust_dicimal(ct_dict[p_id])
+
+def fill_rem_exp(p_id, arg, ct_dict, p_dict, memo):
+    vals = float(ct_dict[p_id])
+    if vals < 0:
+        return '0.0'
+    return adjust_dicimal(vals, dic=1)
+
+def fill_lts_time(p_id, arg, ct_dict, p_dict, memo):
+    return time_format_convert_lts(ct_dict[p_id])
+
+def fill_roll2(p_id, arg, ct_dict, p_dict, memo):
+    vals = ct_dict[p_id]
+    if ocf.is_neumeric(vals):
+        vals = '%3.2f' % float(vals)
+    return vals
+
+def fill_planned_roll(p_id, arg, ct_dict, p_dict, memo):
+    return find_planned_roll(memo['obsid'])
+
+def fill_coord(p_id, arg, ct_dict, p_dict, memo):
+    try:
+        return '%3.6f' % float(round(ct_dict[p_id], 6))
+    except:
+        return '0.0'
+
+def fill_radec(p_id, arg, ct_dict, p_dict, memo):
+    if 'radec' not in memo:
+        memo['radec'] = ocf.convert_ra_dec_format(p_dict['ra'][-1], p_dict['dec'][-1])
+    return memo['radec'][int(arg)]
+
+def fill_arcsec(p_id, arg, ct_dict, p_dict, memo):
+    return convert_to_arcsec(ct_dict[arg])
+
+def fill_rank_time(p_id, arg, ct_dict, p_dict, memo):
+    name, pos = arg.split(':')
+    if name not in memo:
+        memo[name] = separate_time_to_rank(ct_dict[name])
+    return memo[name][int(pos)]
+
+def fill_quotes(p_id, arg, ct_dict, p_dict, memo):
+    return ct_dict[p_id].replace('\"', '\'')
+
+fill_funcs = {'raw'         : fill_raw,
+              'blank'       : fill_blank,
+              'dec1'        : fill_dec1,
+              'dec4'        : fill_dec4,
+              'rem_exp'     : fill_rem_exp,
+              'lts_time'    : fill_lts_time,
+              'roll2'       : fill_roll2,
+              'planned_roll': fill_planned_roll,
+              'coord'       : fill_coord,
+              'radec'       : fill_radec,
+              'arcsec'      : fill_arcsec,
+              'rank_time'   : fill_rank_time,
+              'quotes'      : fill_quotes,
+             }
+
 #-----------------------------------------------------------------------------------------------
 #-- time_format_convert_lts: change time format                                               --
 #-----------------------------------------------------------------------------------------------
@@ -1707,7 +523,7 @@ def create_warning_line(obsid):
     output: line    --- if there is a possible porlem, a warning text. oterwise <blank>
     """
     line    = ''
-    ct_dict = rod.read_ocat_data(obsid)
+    ct_dict = rod.read_ocat_data(obsid, readonly=True)
 #
 #--- observation status; if not unobserved or schedule, a warning is flashed
 #
@@ -1856,13 +672,14 @@ def nullify_entries(ct_dict):
 def create_match_dict(ct_dict):
     """
     create a dictonary containing whether org and new values are same
-    input:  ct_dict     --- a dict of <param> <--> <information>
+    input:  ct_dict     --- a ParamTable of <param> <--> <information>
     output: ind_dict    --- a dictionary of <param> <---> <ind>
                             ind = 0 if org != new
                                 = 1 if org == new
     """
     ind_dict = {}
-    for param in ct_dict.keys():
+    dirty    = ct_dict.dirty
+    for param, entry in ct_dict.items():
         if param in ['monitor_series',]:
             continue
 #
@@ -1871,14 +688,12 @@ def create_match_dict(ct_dict):
         if param in rank_list:
             continue 
 #
-#--- single entry cases
+#--- single entry cases; only those given a new value can differ from the original
 # 
+        elif param in dirty:
+            ind_dict[param] = compare_values(entry.org, entry.new)
         else:
-            org = ct_dict[param][-2]
-            new = ct_dict[param][-1]
-            ind = compare_values(org, new)
-
-            ind_dict[param] = ind
+            ind_dict[param] = 1
 #
 #--- time window case
 #
@@ -1910,19 +725,15 @@ def rank_match_dict(ct_dict, ind_dict, r_list, r_param):
     nrank = ct_dict[r_param][-1]
     if nrank > rank:
         rank = nrank
+#
+#--- compare all ranks at once; the ranks beyond the both rank #s are taken as same
+#
+    table = rtb.RankedTable(ct_dict, r_list)
+    mask  = table.match_mask(adjust_value_for_test)
+    mask[:, rank:] = True
 
-    for param in r_list:
-        m_list = []
-        for k in range(0, rank):
-            org = ct_dict[param][-2][k]
-            new = ct_dict[param][-1][k]
-            ind = compare_values(org, new)
-            m_list.append(ind)
-
-        for k in range(rank, 10):
-            m_list.append(1)
-
-        ind_dict[param] = m_list
+    for i, param in enumerate(r_list):
+        ind_dict[param] = mask[i].astype(int).tolist()
 
     return ind_dict
 
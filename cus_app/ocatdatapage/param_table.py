@@ -0,0 +1,204 @@
+#####################################################################################
+#                                                                                   #
+#   param_table.py: parameter entries of the Ocat Data Page                         #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#   ParamSpec:  static information of a parameter (label, choices, type, group),   #
+#               read once from param_spec and shared by all obsids.                #
+#   ParamEntry: a parameter of one obsid; a reference to its ParamSpec, and the    #
+#               original and updated values.                                       #
+#   ParamTable: a dict of <p_id> <--> ParamEntry, which remembers which entries    #
+#               were given a new value.                                            #
+#                                                                                   #
+#   an entry still reads as the old list [<label>, <choices>, <selection type>,    #
+#   <group>, <org value>, <value>], so that entry[-1], entry[-2], entry[0] etc     #
+#   keep working in the scripts and the templates.                                 #
+#                                                                                   #
+#####################################################################################
+
+import copy
+
+#------------------------------------------------------------------------------------
+#-- ParamSpec: static information of a parameter                                  --
+#------------------------------------------------------------------------------------
+
+class ParamSpec(object):
+    """
+    static information of a parameter
+    input:  p_id    --- parameter name
+            label   --- a discriptive name of the parameter
+            choices --- blank space, or a list of [(param, display name),...]
+            lind    --- selection type: n (not editable), v (open value), l (list)
+            group   --- gen, dt, tc, ... ; '' if it is not a database parameter
+            fill    --- a function making the value from the database values
+            arg     --- an argument of fill
+            copy    --- if True, the updated value starts as a copy of the original
+    """
+    __slots__ = ('p_id', 'label', 'choices', 'lind', 'group', 'fill', 'arg', 'copy')
+
+    def __init__(self, p_id, label, choices='', lind='n', group='', fill=None, arg='', copy=False):
+        self.p_id    = p_id
+        self.label   = label
+        self.choices = choices
+        self.lind    = lind
+        self.group   = group
+        self.fill    = fill
+        self.arg     = arg
+        self.copy    = copy
+
+    def with_choices(self, choices):
+        """
+        return a copy of the spec with different choices (e.g. this year's year list)
+        """
+        return ParamSpec(self.p_id, self.label, choices, self.lind, self.group,\
+                         self.fill, self.arg, self.copy)
+
+    def __repr__(self):
+        return 'ParamSpec(%r, %r, %r, %r)' % (self.p_id, self.label, self.lind, self.group)
+
+#------------------------------------------------------------------------------------
+#-- ParamEntry: a parameter of one obsid                                          --
+#------------------------------------------------------------------------------------
+#
+#--- list positions of the old [label, choices, lind, group, org, new] entries
+#
+list_fields = ('label', 'choices', 'lind', 'group', 'org', 'new')
+
+class ParamEntry(object):
+    """
+    a parameter of one obsid
+    input:  spec    --- ParamSpec
+            org     --- the value extracted from the database
+            new     --- the updated value
+            dirty   --- the set of p_ids with a new value, shared by a ParamTable
+    """
+    __slots__ = ('spec', 'org', '_new', '_dirty')
+
+    def __init__(self, spec, org, new, dirty):
+        self.spec   = spec
+        self.org    = org
+        self._new   = new
+        self._dirty = dirty
+
+    @property
+    def label(self):
+        return self.spec.label
+
+    @property
+    def choices(self):
+        return self.spec.choices
+
+    @property
+    def lind(self):
+        return self.spec.lind
+
+    @property
+    def group(self):
+        return self.spec.group
+
+    @property
+    def new(self):
+        return self._new
+
+    @new.setter
+    def new(self, val):
+        self._new = val
+        self._dirty.add(self.spec.p_id)
+
+    #--------------------------------------------------------------------------------
+    #--- list access of the old entries
+    #--------------------------------------------------------------------------------
+
+    def __len__(self):
+        return 6
+
+    def __iter__(self):
+        spec = self.spec
+        return iter((spec.label, spec.choices, spec.lind, spec.group, self.org, self._new))
+
+    def __getitem__(self, pos):
+        if isinstance(pos, slice):
+            return list(self)[pos]
+
+        return getattr(self, list_fields[pos])
+
+    def __setitem__(self, pos, val):
+        name = list_fields[pos]
+        if name == 'new':
+            self.new = val
+        elif name == 'org':
+            self.org = val
+        else:
+            raise TypeError('%s of %s is shared with the registry' % (name, self.spec.p_id))
+
+    def __repr__(self):
+        return 'ParamEntry(%r, %r, %r)' % (self.spec.p_id, self.org, self._new)
+
+#------------------------------------------------------------------------------------
+#-- ParamTable: a dict of <p_id> <--> ParamEntry                                   --
+#------------------------------------------------------------------------------------
+
+class ParamTable(dict):
+    """
+    a dict of <p_id> <--> ParamEntry of one obsid
+    dirty keeps the p_ids which were given a new value after the table was made;
+    a ranked value changed in place (e.g. entry[-1][k] = val) is not recorded.
+    """
+    def __init__(self):
+        dict.__init__(self)
+        self.dirty = set()
+
+    def add(self, spec, org, new):
+        """
+        add an entry
+        input:  spec    --- ParamSpec
+                org     --- the original value
+                new     --- the updated value
+        output: entry   --- ParamEntry
+        """
+        entry = ParamEntry(spec, org, new, self.dirty)
+        dict.__setitem__(self, spec.p_id, entry)
+
+        return entry
+
+    def changed(self):
+        """
+        return the p_ids which were given a new value
+        """
+        return [p_id for p_id in self.dirty if p_id in self]
+
+    def __deepcopy__(self, memo):
+#
+#--- the specs are shared; only org/new values are copied
+#
+        table = ParamTable()
+        memo[id(self)] = table
+        table.dirty.update(self.dirty)
+        for p_id, entry in self.items():
+            org = copy.deepcopy(entry.org,  memo)
+            new = copy.deepcopy(entry._new, memo)
+            dict.__setitem__(table, p_id, ParamEntry(entry.spec, org, new, table.dirty))
+
+        return table
+
+    def __reduce__(self):
+        return (rebuild_table, ([(e.spec, e.org, e._new) for e in self.values()], list(self.dirty)))
+
+#------------------------------------------------------------------------------------
+#-- rebuild_table: make a ParamTable from pickled entries                          --
+#------------------------------------------------------------------------------------
+
+def rebuild_table(e_list, dirty):
+    """
+    make a ParamTable from pickled entries
+    input:  e_list  --- a list of [<ParamSpec>, <org>, <new>]
+            dirty   --- a list of p_ids with a new value
+    output: table   --- ParamTable
+    """
+    table = ParamTable()
+    for spec, org, new in e_list:
+        table.add(spec, org, new)
+    table.dirty.update(dirty)
+
+    return table
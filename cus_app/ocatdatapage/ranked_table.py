@@ -0,0 +1,180 @@
+#####################################################################################
+#                                                                                   #
+#   ranked_table.py: ranked entries (time, roll and acis window constraints)        #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#   a ranked parameter keeps its 10 ranks as a list in the org/new values of its   #
+#   entry. RankedTable reads the lists of a group of ranked parameters into        #
+#   (<# of params>, 10) object arrays, so that a rank (a column) is handled for    #
+#   all the parameters of the group at once, and writes the updated values back    #
+#   as lists (the templates, udrf and the edit sessions keep using the lists).     #
+#                                                                                   #
+#   the first parameter of a group tells whether a rank is open, e.g.              #
+#   window_constraint, roll_constraint or chip.                                    #
+#                                                                                   #
+#####################################################################################
+
+import numpy
+#
+#--- the number of ranks
+#
+nrank = 10
+
+#------------------------------------------------------------------------------------
+#-- RankedTable: ranked entries of a group of parameters of one obsid              --
+#------------------------------------------------------------------------------------
+
+class RankedTable(object):
+    """
+    ranked entries of a group of parameters of one obsid
+    input:  ct_dict --- a dict of <param> <--> <information>; [-2] is the original
+                        and [-1] is the updated list of the rank values
+            p_list  --- a list of the ranked parameters; the first one is the opener
+    """
+    def __init__(self, ct_dict, p_list):
+        self.ct_dict = ct_dict
+        self.p_list  = list(p_list)
+        self.org     = self.read_values(-2)
+        self.new     = self.read_values(-1)
+
+    def read_values(self, pos):
+        """
+        read the rank values of the group into an array
+        input:  pos     --- -2: original values, -1: updated values
+        output: arr     --- (<# of params>, 10) object array; missing ranks are 'NA'
+        """
+        arr = numpy.full((len(self.p_list), nrank), 'NA', dtype=object)
+        for i, param in enumerate(self.p_list):
+            vals = list(self.ct_dict[param][pos])[:nrank]
+            arr[i, :len(vals)] = vals
+
+        return arr
+
+    def save(self):
+        """
+        write the updated values back to ct_dict as lists
+        """
+        for i, param in enumerate(self.p_list):
+            self.ct_dict[param][-1] = self.new[i].tolist()
+
+    def read_form(self, form, missing=None):
+        """
+        read the rank values passed by a form as <param>_<rank> (e.g. tstart_3)
+        input:  form    --- form data
+                missing --- an array of the values used when a field is not in the form;
+                            if None, 'NA'
+        output: arr     --- (<# of params>, 10) object array of the form values
+        """
+        if missing is None:
+            arr = numpy.full(self.new.shape, 'NA', dtype=object)
+        else:
+            arr = missing.copy()
+
+        for i, param in enumerate(self.p_list):
+            for k in range(0, nrank):
+                name = param + '_' + str(k)
+                if name in form:
+                    arr[i, k] = form[name]
+
+        return arr
+
+    def null_mask(self, null_list):
+        """
+        find the null values in the updated values
+        input:  null_list   --- a list of the values taken as null
+        output: (<# of params>, 10) bool array; True where the value is null
+        """
+        return numpy.frompyfunc(lambda val: val in null_list, 1, 1)(self.new).astype(bool)
+
+    def count(self, null_list):
+        """
+        count the open ranks (those with a non-null opener)
+        input:  null_list   --- a list of the values taken as null
+        output: the number of the open ranks
+        """
+        return int(numpy.count_nonzero(~self.null_mask(null_list)[0]))
+
+    def compact(self, null_list):
+        """
+        remove the closed ranks (those with a null opener) and move the open ranks up;
+        the ranks freed at the end are set to 'NA'
+        input:  null_list   --- a list of the values taken as null
+        output: the number of the open ranks
+        """
+        keep     = ~self.null_mask(null_list)[0]
+        nopen    = int(numpy.count_nonzero(keep))
+        arr      = numpy.full(self.new.shape, 'NA', dtype=object)
+        arr[:, :nopen] = self.new[:, keep]
+        self.new = arr
+
+        return nopen
+
+    def insert_rank(self, k, o_val, null_list):
+        """
+        open a new rank at k; the ranks from k on move down by one
+        input:  k           --- the position of the new rank (0 - 9)
+                o_val       --- the opener value of the new rank (e.g. 'Y'); the other
+                                parameters of the rank are 'NA'
+                null_list   --- a list of the values taken as null
+        output: True if the rank was added; False if k is out of range or
+                the last rank is open (there is no room to move down)
+        """
+        if k < 0 or k >= nrank or not self.null_mask(null_list)[0, -1]:
+            return False
+
+        self.new[:, k+1:] = self.new[:, k:-1].copy()
+        self.new[:, k]    = 'NA'
+        self.new[0, k]    = o_val
+
+        return True
+
+    def match_mask(self, adjust, arr1=None, arr2=None):
+        """
+        compare two sets of rank values
+        input:  adjust  --- a function to normalize a value before comparing
+                            (e.g. create_selection_dict.adjust_value_for_test)
+                arr1    --- an array of values; if None, the original values
+                arr2    --- an array of values; if None, the updated values
+        output: (<# of params>, 10) bool array; True where the values are the same
+        """
+        if arr1 is None:
+            arr1 = self.org
+        if arr2 is None:
+            arr2 = self.new
+
+        vadjust = numpy.frompyfunc(adjust, 1, 1)
+        same    = numpy.frompyfunc(lambda a, b: a == b, 2, 1)
+
+        return same(vadjust(arr1), vadjust(arr2)).astype(bool)
+
+    def out_of_range(self, bound):
+        """
+        find the numeric rank values out of given ranges
+        input:  bound   --- (<# of params>, 2) array of [min, max] of the parameters
+        output: a list of [<param>, <rank (0 - 9)>, <value>] in the order of
+                the parameters, then the ranks
+        """
+        vals = numpy.frompyfunc(to_float, 1, 1)(self.new).astype(float)
+#
+#--- null and non-neumeric values are nan and never out of range
+#
+        with numpy.errstate(invalid='ignore'):
+            mask = (vals < bound[:, :1]) | (vals > bound[:, 1:2])
+
+        return [[self.p_list[i], int(k), float(vals[i, k])] for i, k in zip(*numpy.nonzero(mask))]
+
+#------------------------------------------------------------------------------------
+#-- to_float: convert a value to float                                             --
+#------------------------------------------------------------------------------------
+
+def to_float(val):
+    """
+    convert a value to float
+    input:  val --- a value
+    output: float value; nan if it is not a neumeric value
+    """
+    try:
+        return float(val)
+    except (TypeError, ValueError):
+        return numpy.nan
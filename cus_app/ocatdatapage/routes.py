@@ -4,24 +4,25 @@
 #                                                                               #
 #           author: t. isobe (tisobe@cfa.harvard.edu)                           #
 #                                                                               #
-#           last update: Oct 21, 2021                                           #
+#           last update: Oct 18, 2026                                           #
 #                                                                               #
 #################################################################################
 import os
 import re
-import Chandra.Time
+import copy
 import numpy
 
 from flask              import render_template, flash
 from flask              import session, request, current_app
 from flask_login        import current_user
 
-from cus_app.models         import register_user 
 from cus_app.ocatdatapage   import bp
 from cus_app.ocatdatapage.forms import OcatParamForm
 
 import cus_app.supple.ocat_common_functions         as ocf
+import cus_app.supple.edit_session                  as eds
 import cus_app.ocatdatapage.create_selection_dict   as csd
+import cus_app.ocatdatapage.ranked_table            as rtb
 import cus_app.ocatdatapage.check_value_range       as cvr
 import cus_app.ocatdatapage.update_data_record_file as udrf
 import cus_app.ocatdatapage.submit_other_obsids     as soo
@@ -58,19 +59,6 @@ rank_list = time_list + roll_list + awin_list
 nshw_list = ['monitor_series','remarks', 'comments', 'approved',\
              'group_obsid', 'dec', 'ra', 'acis_open', 'hrc_open']
 
-#--------------------------------------------------------------------------
-#-- before_request: this will be run before every time index is called   --
-#--------------------------------------------------------------------------
-
-@bp.before_app_request
-def before_request():
-    if current_user.is_authenticated:
-        session['session_start'] = int(Chandra.Time.DateTime().secs)
-        session.permanent        = True
-        session.modified         = True
-    else:
-        register_user()
-
 #--------------------------------------------------------------------------
 #-- index: this is the main function to display ocatdata page            --
 #--------------------------------------------------------------------------
@@ -86,19 +74,33 @@ def index(obsid=''):
 #
     if (not obsid in ['', None]) and ocf.is_integer(obsid):
 #
+#--- a POST continues the edit session kept when the page was opened; its ct_dict
+#--- holds the database values of that time, and the form is applied to it below
+#
+        token    = request.form.get('edit_token', '')
+        record   = None
+        if request.method == 'POST':
+            record = eds.load(obsid, token)
+
+        if record is not None:
+            ct_dict  = record['ct_dict']
+            warning  = record['warning']
+        else:
+#
 #--- read the current database values
 #
-        try:
-            ct_dict  = csd.create_selection_dict(obsid)
-        except Exception as create_selection_dict_exc: #use variable e for debugging purposes beyond failure to find Obsid in the database.
-            session.pop('_flashes', None)
-            flash('Obsid is not found in the database!')
+            try:
+                ct_dict  = csd.create_selection_dict(obsid)
+            except Exception as create_selection_dict_exc: #use variable e for debugging purposes beyond failure to find Obsid in the database.
+                session.pop('_flashes', None)
+                flash('Obsid is not found in the database!')
 
-            return render_template('ocatdatapage/provide_obsid.html', form=form)
+                return render_template('ocatdatapage/provide_obsid.html', form=form)
 #
 #--- check observation status and, if needed, create a warning header for the page
 #
-        warning  = csd.create_warning_line(obsid)
+            warning  = csd.create_warning_line(obsid)
+            token    = eds.start(obsid, ct_dict, warning)
 #
 #--- if data are submitted from the main page, update the data dictionary
 #
@@ -128,6 +130,7 @@ def index(obsid=''):
                                             wnote           = wnote,
                                             obsids_disp     = obsids_disp,
                                             or_dict         = or_dict,
+                                            token           = token,
                                             form            = form)
 #
 #--- returning to the main page from the parameter check page
@@ -135,12 +138,37 @@ def index(obsid=''):
         elif 'return'   in request.form:
             ct_dict     = restore_parameters(ct_dict, request.form)
 #
-#--- finalize
+#--- finalize; if the observation was changed by someone else during the session,
+#--- go back to the main page with the new database values and the submitted values
 #
         elif 'finalize' in request.form:
+            c_list = []
+            if record is not None:
+                c_list = eds.find_changes(obsid, record)
+
+            if len(c_list) > 0:
+                current_app.logger.info(f"Obsid {obsid} changed during the edit session: {c_list}")
+                eds.discard(obsid, token)
+
+                ct_dict = restore_parameters(ct_dict, request.form)
+                n_dict  = csd.create_selection_dict(obsid)
+                warning = csd.create_warning_line(obsid)
+                token   = eds.start(obsid, n_dict, warning)
+                ct_dict = carry_over_changes(ct_dict, n_dict)
+
+                flash(conflict_message(c_list))
+
+                return render_template('ocatdatapage/index.html',\
+                                    ct_dict = ct_dict,
+                                    warning = warning,
+                                    token   = token,
+                                    form    = form)
+
             asis, ct_dict, notes, ostatus, sobsids_list, not_processed, no_change\
                     = process_data_for_finalize(ct_dict, request.form)
 
+            eds.discard(obsid, token)
+
             return render_template('ocatdatapage/finalize.html',\
                             obsid       = ct_dict['obsid'][-1],
                             asis        = asis,
@@ -155,6 +183,7 @@ def index(obsid=''):
         return render_template('ocatdatapage/index.html',\
                             ct_dict = ct_dict,
                             warning = warning,
+                            token   = token,
                             form    = form)
 #
 #--- if the obsid is not provided, this page will open
@@ -163,6 +192,56 @@ def index(obsid=''):
         return render_template('ocatdatapage/provide_obsid.html',\
                                 form = form)
 
+#--------------------------------------------------------------------------
+#-- conflict_message: create a message about changes made during the edit session 
+#--------------------------------------------------------------------------
+
+def conflict_message(c_list):
+    """
+    create a message about changes made by someone else during the edit session
+    input:  c_list  --- a list of changed parameter names; 'revision' if a new
+                        revision was submitted
+    output: line    --- a message flashed on the main page
+    """
+    line = 'This observation was updated by someone else while you were editing it'
+    p_list = [param for param in c_list if param != 'revision']
+    if len(p_list) > 0:
+        line = line + ' (changed: ' + ', '.join(p_list) + ')'
+    if 'revision' in c_list:
+        line = line + '; a new revision was submitted'
+    line = line + '. The original values are now those of the database; '
+    line = line + 'please check your changes and submit them again.'
+
+    return line
+
+#--------------------------------------------------------------------------
+#-- carry_over_changes: put the user's changes on a newly read data dict --
+#--------------------------------------------------------------------------
+
+def carry_over_changes(o_dict, n_dict):
+    """
+    put the parameter values changed by the user on a newly read data dict
+    input:  o_dict  --- the data dict of the edit session with the submitted values
+            n_dict  --- a data dict newly read from the database
+    output: n_dict  --- the new data dict with the changed values
+    """
+    ind_dict = csd.create_match_dict(o_dict)
+    for param, ind in ind_dict.items():
+        if not param in n_dict:
+            continue
+#
+#--- a ranked parameter is carried over as a whole if any of its ranks was changed
+#
+        if isinstance(ind, list):
+            if not 0 in ind:
+                continue
+        elif ind != 0:
+            continue
+
+        n_dict[param][-1] = copy.deepcopy(o_dict[param][-1])
+
+    return n_dict
+
 #--------------------------------------------------------------------------
 #-- update_ct_dict: update data disctionry with submitted values         --
 #--------------------------------------------------------------------------
@@ -283,7 +362,10 @@ def process_submit_data(ct_dict, f_data):
 #--- check whether the parameter values are in the expected range, if not,
 #--- create warning texts for display on the parameter value display page
 #
-        wnote       = cvr.check_value_range(ct_dict)
+        w_list      = cvr.find_value_warnings(ct_dict)
+        wnote       = cvr.warning_texts(w_list)
+        if len(w_list) > 0:
+            current_app.logger.info(f"Value warnings of {ct_dict['obsid'][-1]}: {w_list}")
 #
 #--- if multiple obsids are submitted, pass the list of the obsids
 #
@@ -437,24 +519,16 @@ def rank_val_loop(form, ct_dict, d_list):
             d_list  --- a list of parameters in the group
     output: ct_dict --- an updated data dict
     """
-    for param in d_list:
-        save = []
-        for k in range(0, 10):
-            name = param +  '_' + str(k)
-            if name in form:
-                val  = form[name]
-                if val == '':
-                    chk = ct_dict[param][-1][k]
-                    if chk in null_list:
-                        val = chk
-                save.append(val)
-            else:
-                save.append('NA')
+    table = rtb.RankedTable(ct_dict, d_list)
+    vals  = table.read_form(form)
+#
+#--- a blank field keeps the null value it had (e.g. 'NA')
+#
+    keep  = (vals == '') & table.null_mask(null_list)
+    vals[keep] = table.new[keep]
 
-        if len(save) > 0:
-            out            = ct_dict[param]
-            out[-1]        = save
-            ct_dict[param] = out
+    table.new  = vals
+    table.save()
                 
     return ct_dict
 
@@ -469,12 +543,7 @@ def rank_null_cnt(ct_dict, nparam):
             nparam  --- parameter name
     ouput:  chk     --- the numbers of the non_null entries
     """
-    chk = 0
-    for ent in ct_dict[nparam][-1]:
-        if not ent in null_list:
-            chk += 1
-
-    return chk
+    return rtb.RankedTable(ct_dict, [nparam]).count(null_list)
 
 #--------------------------------------------------------------------------
 #-- update_values: update rank related entries                           --
@@ -507,35 +576,32 @@ def update_values(form, ct_dict):
 #--- time rank case
 #
     elif chk == 'Add Time Rank':
-        ct_dict = add_rank('time_ordr', ct_dict, 'window_constraint', 'Y')
+        ct_dict = add_rank('time_ordr', ct_dict, time_list, 'Y')
 
     elif chk == 'Remove NA Time Entry':
-        p_param = 'window_constraint'
         r_param = 'time_ordr'
         flag    = 'window_flag'
-        ct_dict = remove_null_rank(p_param, r_param, flag, time_list, ct_dict)
+        ct_dict = remove_null_rank(r_param, flag, time_list, ct_dict)
 #
 #--- roll rank case
 #
     elif chk == 'Add Roll Rank':
-        ct_dict = add_rank('roll_ordr', ct_dict, 'roll_constraint', 'Y')
+        ct_dict = add_rank('roll_ordr', ct_dict, roll_list, 'Y')
 
     elif chk == 'Remove NA Roll Entry':
-        p_param = 'roll_constraint'
         r_param = 'roll_ordr'
         flag    = 'roll_flag'
-        ct_dict = remove_null_rank(p_param, r_param, flag, roll_list, ct_dict)
+        ct_dict = remove_null_rank(r_param, flag, roll_list, ct_dict)
 #
 #--- acis window rank case
 #
     elif chk == 'Add Window Rank':
-        ct_dict = add_rank('aciswin_no', ct_dict, 'chip', 'I0')
+        ct_dict = add_rank('aciswin_no', ct_dict, awin_list, 'I0')
 
     elif chk == 'Remove NA Window Rank':
-        p_param = 'chip'
         r_param = 'aciswin_no'
         flag    = 'spwindow_flag'
-        ct_dict = remove_null_rank(p_param, r_param, flag, awin_list, ct_dict)
+        ct_dict = remove_null_rank(r_param, flag, awin_list, ct_dict)
 
     return ct_dict
 
@@ -590,26 +656,20 @@ def restore_rank_parameters(a_list, ct_dict, form, chk=0):
     output: ct_dict --- an updated data dict
     """
 #
-#--- ranked data are passed from form in the form of <parameter name><rank>
-#--- for example, tstart3 for tstart[3]
+#--- ranked data are passed from form in the form of <parameter name>_<rank>
+#--- for example, tstart_3 for tstart[3]; a rank not in the form takes the original value
 #
-    for param in a_list:
-        vlist = []
-        for k in range(0, 10):
-            pname = param + '_' + str(k)
-            if pname in form:
-                val = form[pname]
-            else:
-                val = ct_dict[param][-2][k]
+    table = rtb.RankedTable(ct_dict, a_list)
+    vals  = table.read_form(form, table.org)
 #
 #--- usually all nuemric values are changed into either integer or float, but
 #--- some case, we want to keep in string
 #
-            if chk == 0:
-                val = ocf.is_integer(val)
-            
-            vlist.append(val)
-        ct_dict[param][-1] = vlist
+    if chk == 0:
+        vals = numpy.frompyfunc(ocf.is_integer, 1, 1)(vals)
+
+    table.new = vals
+    table.save()
 
     return ct_dict
 
@@ -617,12 +677,13 @@ def restore_rank_parameters(a_list, ct_dict, form, chk=0):
 #-- add_rank: increase a rank by one                                     --
 #--------------------------------------------------------------------------
 
-def add_rank(param, ct_dict, pname, i_val):
+def add_rank(param, ct_dict, p_list, i_val):
     """
     increase a rank by one
     input:  param   --- a name of rank parameter
             ct_dict --- a dict of <param> <--> <information>
-            pname   --- a name of parameter which indicates whether the row is open
+            p_list  --- a list of ranked parameters; the first one indicates 
+                        whether the row is open
             i_val   --- a value which the row is open (e.g. 'Y' for window_constraint)
     outpu;  ct_dict --- an updated dict 
     """
@@ -634,13 +695,13 @@ def add_rank(param, ct_dict, pname, i_val):
     else:
         val  = 1
 #
-#--- change the rank of the ordered entiries
+#--- open the new row; the rows below it move down. if all rows are used,
+#--- nothing is changed
 #
-    ct_dict[param][-1]        = val
-#
-#--- indicate that the new row is open
-#
-    ct_dict[pname][-1][val-1] = i_val
+    table = rtb.RankedTable(ct_dict, p_list)
+    if table.insert_rank(val-1, i_val, null_list):
+        table.save()
+        ct_dict[param][-1] = val
 
     return ct_dict
 
@@ -648,40 +709,29 @@ def add_rank(param, ct_dict, pname, i_val):
 #-- remove_null_rank: remove a null rank entry                          ---
 #--------------------------------------------------------------------------
 
-def remove_null_rank(c_param, r_param, flag, p_list, ct_dict):
+def remove_null_rank(r_param, flag, p_list, ct_dict):
     """
-    remove a null rank entry
-    input:  c_param --- a parameter name which inidicates wheter the row is open
-            r_param --- a rank  parameter name
+    remove null rank entries
+    input:  r_param --- a rank  parameter name
             flag    --- a flag whether there is any ranks
-            p_list  --- a list of ranked parameters
+            p_list  --- a list of ranked parameters; the first one inidicates 
+                        wheter the row is open
             ct_dict --- a dict of <param> <---> <information>
     output: ct_dict --- an updated dict
     """
 #
-#--- check all ranks and if the indicator says the row is closed
-#--- change all other parameter values to 'NA'
-#
-    for k in range(0, 9):
-        val1 = ct_dict[c_param][-1][k]
-        if val1 in null_list:
-            for name in p_list:
-                ct_dict[name][-1][k] = 'NA'
+#--- remove the rows which the indicator says closed, move the rest up,
+#--- and set the freed rows to 'NA'
 #
-#--- check how many ranks still have values
-#
-    pval = 0
-    for k in range(0, 10):
-        val = ct_dict[p_list[0]][-1][k]
-        if val != 'NA':
-            pval += 1
+    table = rtb.RankedTable(ct_dict, p_list)
+    pval  = table.compact(null_list)
+    table.save()
 
     ct_dict[r_param][-1] = pval
 #
 #--- if the all ranks are closed, change the flags to indicate that
 #
     if pval == 0:
-        ct_dict[r_param][-1] = 0 
         ct_dict[flag][-1]    = 'N'
 
     return ct_dict
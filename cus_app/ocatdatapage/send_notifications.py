@@ -12,8 +12,8 @@ import re
 from flask_login        import current_user
 from flask              import current_app
 import cus_app.emailing                             as email
-import sqlite3 as sq
-from contextlib import closing
+import cus_app.supple.updates_db                    as udb
+import cus_app.supple.ocat_common_functions         as ocf
 
 sender       = 'cus@cfa.harvard.edu'
 #
@@ -251,23 +251,24 @@ def find_rev_no(o_list):
     input:  o_list      --- a list of obsids
     output: rev_dict    --- a dict of <obsid> <--> <updated revision #>
     """
-    ufile = os.path.join(current_app.config['OCAT_DIR'], 'updates_table.db')
-    search_pattern = " OR obsidrev LIKE ".join([f"'{obsid}%'" for obsid in o_list])
 #
-#--- SQL query to database5
+#--- SQL query to database; the highest rev # of each obsid
+#
+    r_dict = {}
+    for c_list in ocf.chunk_list(o_list, 250):
+        marks = ','.join(['?'] * len(c_list))
+        cmd   = f"SELECT obsid, MAX(rev) from revisions WHERE obsid IN ({marks}) GROUP BY obsid"
+        for obsid, rev in udb.fetch_all(cmd, [int(x) for x in c_list]):
+            r_dict[obsid] = rev
+#
+#--- keys are the obsids as given in o_list
 #
-    with closing(sq.connect(ufile)) as conn: # auto-closes
-        with conn: # auto-commits
-            with closing(conn.cursor()) as cur: # auto-closes
-                fetch_result = cur.execute(f"SELECT obsidrev from revisions WHERE obsidrev LIKE {search_pattern} ORDER BY rev_time DESC").fetchall()
     rev_dict = {}
-    for entry in fetch_result:
-        obsid, rev = str(entry[0]).split('.')
-        if rev_dict.get(obsid) == None or rev_dict.get(obsid) < rev:
-            rev_dict[obsid] = rev
-    
     for obsid in o_list:
-        if rev_dict.get(obsid) == None:
+        rev = r_dict.get(int(obsid))
+        if rev is None:
             rev_dict[obsid] = '001'
+        else:
+            rev_dict[obsid] = f"{rev:>03}"
     return rev_dict
 
@@ -4,7 +4,7 @@
 #                                                                                               #
 #               author: t. isobe (tisobe@cfa.harvard.edu)                                       #
 #                                                                                               #
-#               last update Oct 22, 2021                                                        #
+#               last update Oct 18, 2026                                                        #
 #                                                                                               #
 #################################################################################################
 
@@ -17,7 +17,9 @@ import random
 import Chandra.Time
 
 import cus_app.supple.ocat_common_functions         as ocf
+import cus_app.supple.read_ocat_data                as rod
 import cus_app.ocatdatapage.create_selection_dict   as csd
+import cus_app.ocatdatapage.ranked_table            as rtb
 import cus_app.ocatdatapage.update_data_record_file as udrf
 #
 #--- directory
@@ -72,16 +74,32 @@ def submit_other_obsids(obsids_list, oct_dict, oind_dict,  asis, user):
             if param in skip_list:
                 continue
 #
-#--- 4th position of ct_dict is a group name such as gen, acis, hrc
+#--- keep the new value and the group name such as gen, acis, hrc
 #
             if oind_dict[param] == 0:
-                diff_dict[param] = [oct_dict[param][-1], oct_dict[param][4]]
+                diff_dict[param] = [oct_dict[param].new, oct_dict[param].group]
 
     note       = {}
     no_change = []
     status     = []
+#
+#--- read the status of all obsids at once; an obsid not in the database is 'NA'
+#
+    s_dict     = rod.get_status_many(obsids_list)
     for obsid in obsids_list:
 #
+#--- skip obsids which are already observed etc before reading all of their data;
+#--- if the status query failed (None), the status is read with all the data below
+#
+        try:
+            s_ent = s_dict.get(int(obsid), {'status': 'NA'})
+        except:
+            s_ent = {'status': 'NA'}
+
+        if s_ent is not None and not (s_ent['status'] in ['unobserved', 'scheduled', 'untriggered']):
+            status.append(s_ent['status'])
+            continue
+#
 #--- create <param> <---> <information> dict for the new obsid
 #
         ct_dict  = csd.create_selection_dict(obsid)
@@ -171,19 +189,16 @@ def check_ranked_entries(gparam, r_list,  oct_dict, ct_dict):
 #--- obsid before the updated: ALL PARAMETERS OF ALL RANKS MUST BE SAME in both data sets
 #--- to update the ranked values of the new obsid based on the changes in the original obsid
 #
-        rchk = 0
-        for param in r_list:
-            for k in range(0, 10):
-                same = csd.compare_values(ct_dict[param][-2][k], oct_dict[param][-2][k])
-                if same == 0:
-                    rchk += 1
+        table  = rtb.RankedTable(ct_dict,  r_list)
+        otable = rtb.RankedTable(oct_dict, r_list)
+        mask   = table.match_mask(csd.adjust_value_for_test, table.org, otable.org)
 #
 #--- if all the conditions are met, update the ranked values in the new obsid
 #
-        if rchk == 0:
+        if mask.all():
             ct_dict[gparam][-1] = oct_dict[gparam][-1]
-            for param in r_list:
-                ct_dict[param][-1] = oct_dict[param][-1]
+            table.new = otable.new
+            table.save()
 #
 #--- the original rank is not same, make sure that the original rank is intact in the
 #--- 'updated' value
@@ -15,7 +15,6 @@ import math
 import time
 import Chandra.Time
 import sqlite3 as sq
-from contextlib import closing
 import traceback
 import threading
 from flask          import flash, current_app, abort
@@ -24,6 +23,9 @@ from flask_login    import current_user
 import cus_app.supple.ocat_common_functions         as ocf
 import cus_app.emailing                             as email
 import cus_app.ocatdatapage.create_selection_dict   as csd
+import cus_app.supple.ocat_data_cache               as odc
+import cus_app.supple.revision_store                as rvs
+import cus_app.supple.updates_db                    as udb
 #
 #--- directory
 #
@@ -66,6 +68,10 @@ def update_data_record_file(ct_dict, ind_dict, asis, user):
 #--- create data record file: <ocat_dir>/updates/<obsid>.<rev#>
 #
     e_text, ch_line   = create_data_record_file(ct_dict, ind_dict, user, asis, data, obsidrev)
+#
+#--- the cached observation data of this obsid are no longer trusted
+#
+    odc.invalidate(ct_dict['obsid'][-1])
     
 #
 #--- only when the observation is still 'scheduled', 'unobserved'
@@ -78,9 +84,14 @@ def update_data_record_file(ct_dict, ind_dict, asis, user):
         elif asis in ['remove', 'clone']:
             send_clone_remove_notification(ct_dict, obsidrev, asis)
 #
+#--- note flags shown on the orupdate page: a new comment and a large coordinate shift
+#
+        note1 = check_coordinate_shift(ct_dict)
+        flags = [1 if ind_dict['comments'] == 0 else 0, 1 if note1 != [] else 0]
+#
 #--- update signoff status data in <ocat_dir>/updates_table.db
 #
-        update_status_data_file(ct_dict, user, asis, data[1], obsidrev)
+        update_status_data_file(ct_dict, user, asis, data[1], obsidrev, flags)
 #
 #--- update approved list
 #
@@ -90,7 +101,6 @@ def update_data_record_file(ct_dict, ind_dict, asis, user):
 #--- check potential notification
 #
         note = {}
-        note1 = check_coordinate_shift(ct_dict)
         if note1 != []:
             note['coordinate_shift'] = note1
         note2 = check_obs_time(ct_dict)
@@ -379,7 +389,7 @@ def create_data_record_file(ct_dict, ind_dict, user, asis, data, obsidrev):
 #
     if  ct_dict['status'][-1]  in ['scheduled', 'unobserved', 'untriggered']:
 
-        ofile  = os.path.join(current_app.config['OCAT_DIR'], 'updates', obsidrev)
+        ofile  = rvs.write_path(obsidrev)
         #
         # --- If revision file write fail's remove ofile then raise error
         # --- This prevents empty revision files from being created
@@ -397,7 +407,7 @@ def create_data_record_file(ct_dict, ind_dict, user, asis, data, obsidrev):
 #-- update_status_data_file: status table update: <ocat_dir>/updates_table.db                ---
 #-----------------------------------------------------------------------------------------------
 
-def update_status_data_file(ct_dict, user, asis, data, obsidrev):
+def update_status_data_file(ct_dict, user, asis, data, obsidrev, flags):
     """
     status table update: <ocat_dir>/updates_table.db
     input:  ct_dict     --- a dict of <param> <--> <information>
@@ -405,6 +415,7 @@ def update_status_data_file(ct_dict, user, asis, data, obsidrev):
             asis        --- asis status
             data        --- a list of lists of parameter names with updated values
             obsidrev    --- <obsid>.<rev#>
+            flags       --- [<new comment?>, <a large coordinate shift?>] (1/0)
     output: updated: <ocat_dir>/updates_table.db
     """
 #
@@ -494,20 +505,18 @@ def update_status_data_file(ct_dict, user, asis, data, obsidrev):
         signoff = 'NA'
 
     ufile  = os.path.join(current_app.config['OCAT_DIR'], 'updates_table.db')
-    rev_file = os.path.join(current_app.config['OCAT_DIR'], 'updates', obsidrev)
+    rev_file = rvs.revision_path(obsidrev)
     rev_time = int(os.stat(rev_file).st_mtime)
-    add_statement = f'INSERT INTO revisions (obsidrev, general_signoff, acis_signoff, acis_si_mode_signoff, hrc_si_mode_signoff, usint_verification, usint_date, sequence, submitter, rev_time)'
-    add_statement += f'VALUES ({obsidrev}, "{general}", "{acis}", "{acis_si}", "{hrc_si}", "{signoff}", {signoff_date},{ct_dict["seq_nbr"][-1]}, "{user}", {rev_time})'.replace('"NULL"','NULL')
+    add_statement = f'INSERT INTO revisions (obsidrev, general_signoff, acis_signoff, acis_si_mode_signoff, hrc_si_mode_signoff, usint_verification, usint_date, sequence, submitter, rev_time, new_comment, coord_shift)'
+    add_statement += f'VALUES ({obsidrev}, "{general}", "{acis}", "{acis_si}", "{hrc_si}", "{signoff}", {signoff_date},{ct_dict["seq_nbr"][-1]}, "{user}", {rev_time}, {flags[0]}, {flags[1]})'.replace('"NULL"','NULL')
     if current_app.config['CONFIGURATION_NAME'] == 'localhost':
         print(add_statement)
 #
 #--- SQL query to database
 #
     try:
-        with closing(sq.connect(ufile)) as conn: # auto-closes
-            with conn: # auto-commits
-                with closing(conn.cursor()) as cur: # auto-closes
-                    cur.execute(add_statement)
+        with udb.transaction() as cur:
+            cur.execute(add_statement)
         
     except sq.IntegrityError:
         current_app.logger.error(traceback.format_exc())
@@ -782,15 +791,13 @@ def set_obsidrev(ct_dict):
     output: obsidrev    --- <obsid>.<rev#> with the latest revision #
     """
     obsid = ct_dict['obsid'][-1]
-    data = [each for each in os.listdir(f"{current_app.config['OCAT_DIR']}/updates/") if each.startswith(str(obsid)+".")]
-    data.sort()
-    if len(data) > 0:
-        atemp = re.split('\.', data[-1])
-        rev   = int(atemp[1]) + 1
-    else:
-        rev   = 1
+#
+#--- the new rev # is allocated in updates_table.db, so that two submissions
+#--- of the same obsid at the same time do not get the same rev #
+#
+    rev   = rvs.allocate_revision(obsid)
 
-    obsidrev = str(obsid) + '.' + ocf.add_leading_zero(rev, 3)
+    obsidrev = rvs.revision_name(obsid, rev)
     return obsidrev
 
 #-----------------------------------------------------------------------------------------------
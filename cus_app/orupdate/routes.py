@@ -11,25 +11,24 @@ import os
 import sys
 import re
 import string
-import Chandra.Time
 import time
-from datetime           import datetime
-import pathlib
+from datetime           import datetime, timedelta
 import threading
 import sqlite3 as sq
 import traceback
-from contextlib import closing
 
-from flask              import render_template, flash, redirect, url_for, session
+from flask              import render_template, flash, redirect, url_for
 from flask              import request, g, jsonify, current_app
 from flask_login        import current_user
 
 from cus_app                import db
-from cus_app.models         import User, register_user 
+from cus_app.models         import User
 from cus_app.orupdate       import bp
 
 import cus_app.supple.ocat_common_functions         as ocf
 import cus_app.supple.get_value_from_sybase         as gvfs
+import cus_app.supple.revision_store                as rvs
+import cus_app.supple.updates_db                    as udb
 import cus_app.ocatdatapage.create_selection_dict   as csd
 import cus_app.ocatdatapage.update_data_record_file as udrf
 import cus_app.emailing                             as email
@@ -41,22 +40,30 @@ s_dir    = os.path.join(basedir, '../static/')
 #
 #--- Define Globals
 #
-TODAY = datetime.now()
-TODAY_STRING = TODAY.strftime('%m/%d/%y')
-FETCH_SIZE = 400
-
-#----------------------------------------------------------------------------------
-#-- before_request: this will be run before every time index is called          ---
-#----------------------------------------------------------------------------------
-
-@bp.before_app_request
-def before_request():
-    if current_user.is_authenticated:
-        session['session_start'] = int(Chandra.Time.DateTime().secs)
-        session.permanent        = True
-        session.modified         = True
-    else:
-        register_user()
+#
+#--- sort orders of open entries: a list of [<sql expression>, <descending?>]; the last
+#--- key (rowid) makes the order unique so that a page can start after a given row
+#
+SORT_KEYS = {
+    'date':  [['rev_time', True], ['revisions.rowid', True]],
+    'obsid': [['obsid', False], ['rev', True], ['revisions.rowid', True]],
+    'user':  [['submitter IS NOT :user', False], ['CASE WHEN submitter = :user THEN obsid ELSE 0 END', False],
+              ['CASE WHEN submitter = :user THEN rev ELSE 0 END', True], ['rev_time', True], ['revisions.rowid', True]],
+}
+SORT_NAMES = {'date': 'Date of Submission', 'obsid': 'Obsid', 'user': 'User ID'}
+#
+#--- note flags of an open entry: new comment?, a large coordinate shift?, # of open revisions,
+#--- the highest signed-off rev # and the highest rev # of the obsid
+#
+NOTE_COLUMNS = 'new_comment, coord_shift, '\
+               + f"(SELECT COUNT(*) FROM revisions AS o WHERE o.obsid = revisions.obsid AND {udb.open_expr}), "\
+               + f"(SELECT MAX(rev) FROM revisions AS o WHERE o.obsid = revisions.obsid AND NOT IFNULL({udb.open_expr}, 0)), "\
+               + "(SELECT MAX(rev) FROM revisions AS o WHERE o.obsid = revisions.obsid)"
+#
+#--- columns which can be selected as still open
+#
+OPEN_COLUMNS = {'gen': 'general_signoff', 'acis': 'acis_signoff', 'si': 'acis_si_mode_signoff',
+                'hrc': 'hrc_si_mode_signoff', 'verify': 'usint_verification'}
 
 #----------------------------------------------------------------------------------
 #-- index: this is the main function to display orupdate page                    --
@@ -68,145 +75,269 @@ def index():
     current_app.logger.info(f"Opening Orupdate")
     user         = current_user.username
 #
-#--- odata --- a list of open data
+#--- view  --- sort order, filters and the page to display, given in the url
+#--- odata --- a list of open data on the page
 #--- cdata --- a list of signed-off data within the past one day
-#--- mtime --- a time stamp of the last database updated 
+#--- stamp --- [<# of changes>, <time of the last change>] of the database
+#--- page  --- cursors of the next/previous pages
 #--- warning will be True if someone just updated database files
 #
-    odata, cdata, mtime, poc_dict = read_status_data()
-    warning                       = False
+    view                                = read_view_args(request.args, user)
+    odata, cdata, stamp, poc_dict, page = read_status_data(view)
+    warning                             = False
 
     if 'submit_test' in request.form:
 #
-#--- display order change request is submitted
-#
-        if 'ordered_by' in  request.form.keys():
-            odata = check_order_request(request.form, odata)
-#
 #--- sign-off reqeust is submitted
-#
-        else:
-#
 #--- check whether someone updated the database while the user was checking 
 #--- the entries if it happened, display the warning without the updates.
 #
-            ctime = float(request.form['mtime'])
-            if mtime > ctime:
+        try:
+            changes = int(request.form['stamp'])
+        except (KeyError, ValueError):
+            changes = -1
+
+        if stamp[0] > changes:
 #
 #--- after 10 mins, don't display the message, even if someone modified the
 #--- the database before submitting the data.
 #
-                if Chandra.Time.DateTime().secs - mtime < 700.0:
-                    warning = True
-            else:
-                warning = check_signoff(request.form, poc_dict, odata)
+            if time.time() - stamp[1] < 700.0:
+                warning = True
+        else:
+            warning = check_signoff(request.form, poc_dict, odata)
 
-            odata, cdata, mtime, poc_dict = read_status_data()
+        odata, cdata, stamp, poc_dict, page = read_status_data(view)
 
     return render_template('orupdate/index.html',
                             user  = user,
                             odata = odata,
                             cdata = cdata,
-                            mtime = mtime,
+                            stamp = stamp[0],
+                            view  = view,
+                            page  = page,
+                            sort_names   = SORT_NAMES,
                             warning = warning,
                             current_user = current_user
                             )
 
+#----------------------------------------------------------------------------------
+#-- read_view_args: read the sort order, filters and page from the url           --
+#----------------------------------------------------------------------------------
+
+def read_view_args(args, user):
+    """
+    read the sort order, filters and page from the url
+    input:  args    --- request arguments
+                        sort:       date/obsid/user
+                        sort_user:  user id whose entries come to top when sort=user
+                        submitter:  show only the entries submitted by this user
+                        column:     show only the entries whose column is open (see OPEN_COLUMNS)
+                        obsid_min/obsid_max:    show only the entries in this obsid range
+                        date_from/date_to:      show only the entries submitted in these days (yyyy-mm-dd)
+                        after/before:           show the page after/before the entry of this rowid
+            user    --- the current user
+    output: view    --- a dict of the above; 'args' holds the ones given, other than after/before
+    """
+    view = {'sort': 'date', 'sort_user': user, 'submitter': '', 'column': '',
+            'obsid_min': None, 'obsid_max': None, 'date_from': '', 'date_to': '',
+            'after': None, 'before': None}
+
+    if args.get('sort') in SORT_KEYS:
+        view['sort'] = args['sort']
+    if args.get('column') in OPEN_COLUMNS:
+        view['column'] = args['column']
+
+    for key in ['sort_user', 'submitter']:
+        val = args.get(key, '').strip()
+        if val != '':
+            view[key] = val
+
+    for key in ['obsid_min', 'obsid_max', 'after', 'before']:
+        try:
+            view[key] = int(args[key])
+        except (KeyError, ValueError):
+            pass
+
+    for key in ['date_from', 'date_to']:
+        try:
+            datetime.strptime(args[key], '%Y-%m-%d')
+            view[key] = args[key]
+        except (KeyError, ValueError):
+            pass
+
+    view['args'] = {key: val for key, val in view.items()
+                        if key not in ['after', 'before'] and val not in ['', None]}
+    return view
+
 #----------------------------------------------------------------------------------
 #-- read_status_data: read the data base and create a list of data               --
 #----------------------------------------------------------------------------------
 
-def read_status_data():
+def read_status_data(view):
     """
     read the data base and create a list of data
-    input:  none but read from ocat_dir/updates_table.db
-    output: odata   --- a list of data which need to be sign off
-            cdata   --- a list of data which are already signed off
-            mtime   --- the last file modified time stamp in Chandra Time
+    input:  view    --- a dict of the sort order, filters and page (see read_view_args)
+                        but read from ocat_dir/updates_table.db
+    output: odata   --- a list of data which need to be sign off on the page
+            cdata   --- a list of data which are already signed off (on the first page)
+            stamp   --- [<# of changes>, <the last change time in seconds from epoch>]
+                        of the revisions table (see udb.change_stamp)
             poc_dict    --- a dict of <obsidrev> <---> <poc>
+            page    --- a dict of after/before <---> rowid of the next/previous page start
+                        (None if there is no such page)
     """
 #
-#--- Main database file
-#--- Also find out the last file modification time
+#--- find out how many times the database was changed; the page is read after this,
+#--- so a change made while reading is caught at the next submission
 #
-    ufile = os.path.join(current_app.config['OCAT_DIR'], 'updates_table.db')
-    mtime = ocf.find_file_modification_time(ufile)
+    stamp = udb.change_stamp()
+#
+#--- filters on the both open and closed entries
 #
-#--- SQL query to database
+    where, params = make_filters(view)
 #
-    with closing(sq.connect(ufile)) as conn: # auto-closes
-        with conn: # auto-commits
-            with closing(conn.cursor()) as cur: # auto-closes
-                fetch_result = cur.execute(f"SELECT * from revisions ORDER BY rev_time DESC LIMIT {FETCH_SIZE}").fetchall()
+#--- SQL query to database: only open entries of the page
 #
-#--- columns listed in the following order in the database:
+    o_where = [udb.open_expr] + where
+    if view['column'] != '':
+        o_where.append(f"{OPEN_COLUMNS[view['column']]} = 'NA'")
+    fetch_result, page = fetch_page(o_where, params, view)
+#
+#--- columns listed in the following order:
 #--- obsidrev (0), general_signoff (1), general_date (2), acis_signoff (3), acis_date (4)
 #--- acis_si_mode_signoff (5), acis_si_mode_date (6), hrc_si_mode_signoff (7), hrc_si_mode_date (8)
 #--- usint_verification (9), usint_date (10), sequence (11), submitter (12), rev_time (13) (creation of rev in epoch time)
+#--- general_epoch (14), acis_epoch (15), acis_si_mode_epoch (16), hrc_si_mode_epoch (17), usint_epoch (18)
+#--- new_comment (19), coord_shift (20), # of open revisions (21), highest signed-off rev (22), highest rev (23)
+#--- rowid (24)
 #
-    odata  = []                 #--- keep open data
-    cdata  = []                 #--- keep closed data
-    c_dict = {}                 #--- a dict to keep all opened rev # of <obsid>
-    h_dict = {}                 #--- a dict to keep highest closed rev # of <obsid>
-    r_dict = {}                 #--- a dict to keep highest  rev # of <obsid>
+    odata     = []              #--- keep open data
+    cdata     = []              #--- keep closed data
     poc_dict  = {}              #--- a dict to keep obsidrev <--> poc
-#
-#--- Iterate over the fetch results
-#
     for entry in fetch_result:
-        obsid, rev = str(entry[0]).split('.')
-        rev = int(rev)
-#
-#--- Generate opened/closed sublists and check if a signoff is still required
-#
         sublist, opened = check_status(entry)
-        if opened:
-            odata.append(sublist)
-            poc_dict[sublist[0]] = sublist[3]
+        odata.append(sublist)
+        poc_dict[sublist[0]] = sublist[3]
+#
+#--- records verified today or yesterday are kept for informational display
+#
+    if page['first'] and view['column'] == '':
+        c_where = ['usint_epoch >= :recent'] + where
+        cmd     = f"SELECT {udb.revision_columns} from revisions WHERE {' AND '.join(c_where)} ORDER BY rev_time DESC"
+        recent_result = udb.fetch_all(cmd, dict(params, recent=udb.recent_cutoff()))
+        for entry in recent_result:
+            sublist, opened = check_status(entry)
+            if not opened:
+                cdata.append(sublist)
+                poc_dict[sublist[0]] = sublist[3]
 #
-#--- prep to check multiple opening of the same obsid
+#--- update note sections of open entries
 #
-            if obsid in c_dict.keys():
-                c_dict[obsid]  = c_dict[obsid] + 1
+    odata = update_notes(odata, fetch_result)
 
-            else:
-                c_dict[obsid] = 1
-                if not (obsid in h_dict.keys()):
-                    h_dict[obsid] = 0
-#
-#--- <obsid>.<rev> which is already signed-off and closed
-#
-        else:
+    return odata, cdata, stamp, poc_dict, page
+
+#----------------------------------------------------------------------------------
+#-- make_filters: create sql conditions of the filters of the view               --
+#----------------------------------------------------------------------------------
+
+def make_filters(view):
+    """
+    create sql conditions of the filters of the view
+    input:  view    --- a dict of the sort order, filters and page
+    output: where   --- a list of sql conditions
+            params  --- a dict of named parameters used in the conditions
+    """
+    where  = []
+    params = {'user': view['sort_user']}
+    if view['submitter'] != '':
+        where.append('submitter = :submitter')
+        params['submitter'] = view['submitter']
+
+    if view['obsid_min'] is not None:
+        where.append('obsid >= :obsid_min')
+        params['obsid_min'] = view['obsid_min']
+
+    if view['obsid_max'] is not None:
+        where.append('obsid <= :obsid_max')
+        params['obsid_max'] = view['obsid_max']
 #
-#--- find out highest signed-off rev #  of each obsid
+#--- the submission date in local time; date_to includes the whole day
 #
-            if obsid in h_dict.keys():
-                prev = float(h_dict[obsid])
-                if  rev > prev:
-                    h_dict[obsid] = f"{rev:>03}"
-            else:
-                h_dict[obsid] = f"{rev:>03}"
+    if view['date_from'] != '':
+        where.append('rev_time >= :date_from')
+        params['date_from'] = int(datetime.strptime(view['date_from'], '%Y-%m-%d').timestamp())
+
+    if view['date_to'] != '':
+        where.append('rev_time < :date_to')
+        params['date_to'] = int((datetime.strptime(view['date_to'], '%Y-%m-%d') + timedelta(days=1)).timestamp())
+
+    return where, params
+
+#----------------------------------------------------------------------------------
+#-- fetch_page: read one page of entries in the sort order of the view           --
+#----------------------------------------------------------------------------------
+
+def fetch_page(where, params, view):
+    """
+    read one page of entries in the sort order of the view; the page starts
+    after (or ends before) the row given by view['after'] (view['before'])
+    input:  where   --- a list of sql conditions
+            params  --- a dict of named parameters used in the conditions
+            view    --- a dict of the sort order, filters and page
+    output: fetch_result    --- a list of rows: revision_columns, NOTE_COLUMNS and rowid
+            page    --- a dict of first: True if this is the first page
+                                  after: rowid to start the next page after, or None
+                                  before: rowid to end the previous page before, or None
+    """
+    size   = current_app.config.get('ORUPDATE_PAGE_SIZE', 50)
+    before = view['before'] is not None
+    cursor = view['before'] if before else view['after']
 #
-#--- check the signed-off date is in the specified period
-#--- if so keep the record for informational display
+#--- reading backward, the order is reversed and so is the result
 #
-            if (TODAY - datetime.strptime(entry[10],'%m/%d/%y')).days < 2:
-                cdata.append(sublist)
-                poc_dict[sublist[0]] = sublist[3]
+    keys   = [[expr, desc != before] for expr, desc in SORT_KEYS[view['sort']]]
+    order  = ', '.join([f"{expr} {'DESC' if desc else 'ASC'}" for expr, desc in keys])
+    cmd    = f"SELECT {udb.revision_columns}, {NOTE_COLUMNS}, revisions.rowid from revisions"
+    where  = list(where)
+    if cursor is not None:
 #
-#--- find out highest  rev #  of each obsid
+#--- rows which come after the cursor row in the order: (k0 > c0) OR (k0 = c0 AND k1 > c1) OR ...
 #
-        if obsid in r_dict.keys():
-            prev = r_dict[obsid]
-            if  rev > prev:
-                r_dict[obsid] = rev
-        else:
-            r_dict[obsid] = rev
+        kcols = ', '.join([f"{expr} AS k{k}" for k, [expr, desc] in enumerate(keys)])
+        cmd   = f"WITH cursor AS (SELECT {kcols} FROM revisions WHERE revisions.rowid = :cursor) " + cmd + ', cursor'
+        o_list = []
+        for k, [expr, desc] in enumerate(keys):
+            terms = [f"({keys[m][0]}) = cursor.k{m}" for m in range(0, k)]
+            terms.append(f"({expr}) {'<' if desc else '>'} cursor.k{k}")
+            o_list.append('(' + ' AND '.join(terms) + ')')
+        where.append('(' + ' OR '.join(o_list) + ')')
+
+    if len(where) > 0:
+        cmd += ' WHERE ' + ' AND '.join(where)
+    cmd += f" ORDER BY {order} LIMIT {size + 1}"
+
+    fetch_result = udb.fetch_all(cmd, dict(params, cursor=cursor))
+    more         = len(fetch_result) > size
+    fetch_result = fetch_result[:size]
 #
-#--- update note sections of open entries
+#--- the cursor row is gone, or the previous pages are shorter than a page: show the first page
 #
-    odata = update_notes(odata, c_dict, h_dict, r_dict)
-    return odata, cdata, mtime, poc_dict
+    if cursor is not None and (len(fetch_result) == 0 or (before and not more)):
+        return fetch_page(where[:-1], params, dict(view, after=None, before=None))
+
+    if before:
+        fetch_result.reverse()
+        page = {'first': False, 'before': fetch_result[0][-1], 'after': fetch_result[-1][-1]}
+    else:
+        page = {'first': cursor is None, 'before': None, 'after': None}
+        if cursor is not None:
+            page['before'] = fetch_result[0][-1]
+        if more:
+            page['after'] = fetch_result[-1][-1]
+
+    return fetch_result, page
 
 #----------------------------------------------------------------------------------
 #-- check_status: create data list                                               --
@@ -302,66 +433,33 @@ def check_status(entry):
     sublist.append([0, 0, [], 'rgb(252, 226, 192, 0.3)', 0, 0])
     return sublist, opened
 
-#----------------------------------------------------------------------------------
-#-- check_file_creation_date: find a file creation date                          --
-#----------------------------------------------------------------------------------
-
-def check_file_creation_date(obsidrev):
-    """
-    find a file creation date
-    input:  obsidrev    --- <obsid>.<rev #>
-    output: mtime       --- a creation time in <mm>/<dd>/<yy>
-    """
-    ifile = os.path.join(current_app.config['OCAT_DIR'], 'updates', str(obsidrev))
-    if os.path.isfile(ifile):
-        fname = pathlib.Path(ifile)
-        mtime = datetime.fromtimestamp(fname.stat().st_ctime)
-        return mtime.strftime("%m/%d/%y")
-
 #----------------------------------------------------------------------------------
 #-- update_notes: create a content of the note section                          ---
 #----------------------------------------------------------------------------------
 
-def update_notes(odata, c_dict, h_dict, r_dict):
+def update_notes(odata, fetch_result):
     """
     create a content of the note section
     input:  odata   --- a list of lists of data; the note section is the last part
                     <obsidrev open>,<higher rev signed-off>,[<other comments>], 
                     <color>, <new comment?>, <a large coordindate shift?>]
-            c_dict  --- a dict of <obsid> <---> <rev # still open>
-            h_dict  --- a dict of <obsid.rev> <---> <rev # of highest signoff obsid.rev>
-                                                     in string format
-            r_dict  --- a dict of <obsid.rev> <---> <rev # of highest obsid.rev>
-                                                     in integer
+            fetch_result    --- the rows of odata, with NOTE_COLUMNS and rowid (see fetch_page)
     output: odata   --- an update data list
     """
 #
 #--- read color list and set opacity to 0.3
 #
     color_list  = read_color_list(opacity=0.3)
+    c_len       = len(color_list)
+    p_dict      = {}
 #
-#--- read large coordinate shift data
+#--- the flags of older entries are not in the database yet
 #
-    ifile       = os.path.join(current_app.config['OCAT_DIR'], 'cdo_warning_list')
-    with open(ifile,'r') as f:
-        coord_shift = [line.strip() for line in f.readlines()]
-    coord_shift.reverse()
-#
-#--- give the same color to the same obsid (ignore rev #)
-#
-    o_list = list(c_dict.keys())
-    o_len  = len(o_list)
-    c_len  = len(color_list)
-    p_dict = {}
-    for k in range(0, o_len):
-#
-#--- just in a case when the # of obsids is larger than the # of color list
-#
-        m  = k - c_len * int(k / c_len)
-        p_dict[o_list[k]] = color_list[m]
+    n_dict      = find_notes(fetch_result)
 
     for k in range(0, len(odata)):
         ent   = odata[k]
+        entry = fetch_result[k]
         atemp = re.split('\.', ent[0])
         obsid = atemp[0]
         rev   = int(float(atemp[1]))
@@ -370,72 +468,61 @@ def update_notes(odata, c_dict, h_dict, r_dict):
 #--- code = 0: no other revision open
 #--- code = 1: there are multiple revisions but this is the latest revision
 #--- code = 2: there are multiple revisions and there is a newer revision than this one
+#--- the same color is given to the same obsid (ignore rev #)
 #
-        if c_dict[obsid] > 1:
-            if rev < r_dict[obsid]:
+        if entry[21] > 1:
+            if rev < entry[23]:
                 ent[-1][0] = 2
             else:
                 ent[-1][0] = 1
+            if obsid not in p_dict:
+                p_dict[obsid] = color_list[len(p_dict) % c_len]
             ent[-1][3] = p_dict[obsid]
 #
 #--- higher obsid.rev is already signed off?
 #
-        if float(h_dict[obsid]) > rev:
-            ent[-1][1] = h_dict[obsid]
-#
-#--- a new comment?
-#
-        ent[-1][4] = check_comment(ent[0])
+        if entry[22] is not None and entry[22] > rev:
+            ent[-1][1] = f"{entry[22]:>03}"
 #
+#--- a new comment? (2: unknown; the revision file is not found)
 #--- a large coordinate shifts?
 #
-        ent[-1][5] = check_large_coord_shift(ent[0], coord_shift)
+        [comment, shift] = n_dict[entry[-1]]
+        ent[-1][4] = 2 if comment is None else comment
+        ent[-1][5] = shift
 
         odata[k] = ent
 
     return  odata
 
 #----------------------------------------------------------------------------------
-#-- check_comment: check whether ths entry has a new comment                     --
+#-- find_notes: find the note flags of entries written without them              --
 #----------------------------------------------------------------------------------
 
-def check_comment(obsidrev):
+def find_notes(fetch_result):
     """
-    check whether ths entry has a new comment
-    input:  obsidrev    --- <obsid>.<rev #>
-    outpu:  1 if there is a large coordinate shift, otherwise, 0
+    find the note flags of entries written before the flags were kept in
+    updates_table.db; they are found from the revision file and cdo_warning_list,
+    but not saved (backfill_note_flags.py saves them once)
+    input:  fetch_result    --- a list of rows with NOTE_COLUMNS and rowid (see fetch_page)
+    output: n_dict  --- a dict of <rowid> <---> [<new comment?>, <a large coordinate shift?>]
+                        new comment is None if the revision file is not found
     """
-    ifile = os.path.join(current_app.config['OCAT_DIR'], 'updates', str(obsidrev))
-    #If data directory corrupted/missing revision file, bigger problems exist
-    #yet this comment check can act as a safety check.
-    try:
-        with open(ifile, 'r') as f:
-            text = f.read()
-    except Exception as check_comment_exc:
-        return 2
-
-    mc = re.search('NEW COMMENTS', text)
-    if mc is not None:
-        return 1
-    else:
-        return 0
+    n_dict = {}
+    b_list = []
+    for entry in fetch_result:
+        n_dict[entry[-1]] = [entry[19], entry[20]]
+        if entry[19] is None or entry[20] is None:
+            b_list.append(entry)
 
-#----------------------------------------------------------------------------------
-#-- check_large_coord_shift: check a large coordinate shift                     ---
-#----------------------------------------------------------------------------------
+    if len(b_list) == 0:
+        return n_dict
 
-def check_large_coord_shift(obsidrev, coord_shift):
-    """
-    check a large coordinate shift
-    input:  obsidrev    --- <obsid>.<rev #>
-            coord_shift --- a list or obsid.rev with a large coordindate shift
-    outpu:  1 if there is a large coordinate shift, otherwise, 0
-    """
-    for comp in coord_shift:
-        if obsidrev  == comp:
-            return 1
-    
-    return 0
+    f_list = rvs.find_note_flags([[entry[0], entry[19], entry[20]] for entry in b_list])
+    for entry, flags in zip(b_list, f_list):
+        n_dict[entry[-1]] = flags
+
+    return n_dict
 
 #----------------------------------------------------------------------------------
 #-- read_color_list: read color table                                            --
@@ -466,105 +553,6 @@ def read_color_list(name=0, opacity=1):
 
     return color_list
 
-#----------------------------------------------------------------------------------
-#-- check_order_request: modify the display order                               ---
-#----------------------------------------------------------------------------------
-
-def check_order_request(form, odata):
-    """
-    modify the display order
-    input:  form    --- form data
-            odata   --- a list of data
-    ouput:  odata   --- a re-ordered list of data
-    """
-    if form['ordered_by'] == 'Date of Submission':
-        odata = ordered_by_date(odata)
-
-    elif form['ordered_by'] == 'Obsid':
-        odata = ordered_by_obsid(odata)
-
-    elif form['ordered_by'] == 'User ID:':
-        user = form['ordered_by_user']
-        user = user.strip()
-        odata = ordered_by_userid(odata, user)
-
-    return odata
-
-#----------------------------------------------------------------------------------
-#-- ordered_by_date: change the display order by date from the newest to oldest  --
-#----------------------------------------------------------------------------------
-
-def ordered_by_date(odata):
-    """
-    change the display order by date from the newest to oldest
-    input:  odata   --- a list of data
-    output: odata   --- a re-ordered list of data
-    """
-    d_list = []
-    for ent in odata:
-        date  = ent[2]
-        atemp = re.split('\/', date)
-        date  = atemp[2] + atemp[0] + atemp[1]
-        date  = int(date)
-        d_list.append(date)
-
-    out = [x for _, x in sorted(zip(d_list, odata))]
-    out.reverse()
-
-    return out
-
-#----------------------------------------------------------------------------------
-#-- ordered_by_obsid: change the display order by obsid                         ---
-#----------------------------------------------------------------------------------
-
-def ordered_by_obsid(odata):
-    """
-    change the display order by obsid
-    input:  odata   --- a list of data
-    output: odata   --- a re-ordered list of data
-    """
-    d_list = []
-    for ent in odata:
-        obsidrev = ent[0]
-#
-#--- reversing rev # order so that the largest/newest revision come to top
-#
-        atemp    = re.split('\.', obsidrev)
-        val      = 100 - int(float(atemp[1]))
-        val = f"{atemp[0]}.{val:>03}"
-        d_list.append(float(val))
-
-    out = [x for _, x in sorted(zip(d_list, odata))]
-
-    return out
-
-#----------------------------------------------------------------------------------
-#-- ordered_by_userid: bring groups of obsids owned by the user to top           --
-#----------------------------------------------------------------------------------
-
-def ordered_by_userid(odata, user):
-    """
-    bring groups of obsids owned by the user to top
-    input:  odata   --- a list of data
-    output: odata   --- a re-ordered list of data
-    """
-    top    = []
-    others = []
-
-    for ent in odata:
-        poc = ent[3].strip()
-        if poc == user:
-            top.append(ent)
-        else:
-            others.append(ent)
-#
-#--- order them in the order of obsid
-#
-    top = ordered_by_obsid(top)
-    out = top + others
-
-    return out
-
 #----------------------------------------------------------------------------------
 #-- check_signoff: update updates_table.db file according to which sign-off is clicked
 #----------------------------------------------------------------------------------
@@ -584,9 +572,6 @@ def check_signoff(form, poc_dict, odata):
                            otherwise, return False
     """
     for key in form.keys():
-        mc = re.search('ordered', key)
-        if mc is not None:
-            continue
 #
 #--- no one modified the file; so we can procced update
 #
@@ -617,7 +602,7 @@ def check_signoff(form, poc_dict, odata):
             if obsidrev != 0:
                 chk = update_data(obsidrev, 'acis_signoff')
                 if chk == False:
-                    check_too_ddt(obsidrev, 'acis', odata, poc_dict[obsidrev])
+                    check_too_ddt(obsidrev, 'acis', odata, poc_dict.get(obsidrev, ''))
 #
 #--- acis si is signed off
 #
@@ -626,7 +611,7 @@ def check_signoff(form, poc_dict, odata):
             if obsidrev != 0:
                 chk = update_data(obsidrev, 'acis_si_mode_signoff')
                 if chk == False:
-                    check_too_ddt(obsidrev, 'si', odata, poc_dict[obsidrev])
+                    check_too_ddt(obsidrev, 'si', odata, poc_dict.get(obsidrev, ''))
 #
 #--- hrc si is signed off
 #
@@ -635,7 +620,7 @@ def check_signoff(form, poc_dict, odata):
             if obsidrev != 0:
                 chk = update_data(obsidrev, 'hrc_si_mode_signoff')
                 if chk == False:
-                    check_too_ddt(obsidrev, 'si', odata, poc_dict[obsidrev])
+                    check_too_ddt(obsidrev, 'si', odata, poc_dict.get(obsidrev, ''))
 #
 #--- verification is signed off
 #
@@ -703,34 +688,33 @@ def update_data(obsidrev, column_signoff):
 #
     ufile = os.path.join(current_app.config['OCAT_DIR'], 'updates_table.db')
     sql_record = ''
+    today      = udb.today_string()
     try:
-        with closing(sq.connect(ufile)) as conn: # auto-closes
-            with conn: # auto-commits
-                with closing(conn.cursor()) as cur: # auto-closes
-                    if column_signoff == 'discard':
+        with udb.transaction() as cur:
+            if column_signoff == 'discard':
 #
 #--- Pull the current signoff status and replace any unfilled signoffs with "N/A"
 #
-                        select_discard = f'SELECT general_signoff, acis_signoff, acis_si_mode_signoff, hrc_si_mode_signoff from revisions WHERE obsidrev = {obsidrev}'
-                        sql_record += f"SQL Select Discard: {select_discard}\n"
-                        res = cur.execute(select_discard)
-                        curr_signoff = res.fetchone()
-                        discard_execute = f'UPDATE revisions SET general_signoff = "{curr_signoff[0]}", acis_signoff = "{curr_signoff[1]}", acis_si_mode_signoff = "{curr_signoff[2]}", hrc_si_mode_signoff = "{curr_signoff[3]}", usint_verification = "{current_user.username}", usint_date = "{TODAY_STRING}" WHERE obsidrev = {obsidrev}'
-                        discard_execute = discard_execute.replace('NA','N/A').replace('"None"','NULL')
-                        sql_record += f"SQL Update Discard: {discard_execute}\n"
-                        if current_app.config['CONFIGURATION_NAME'] == 'localhost':
-                            print(sql_record)
-                        cur.execute(discard_execute)
-                    else:
+                select_discard = f'SELECT general_signoff, acis_signoff, acis_si_mode_signoff, hrc_si_mode_signoff from revisions WHERE obsidrev = {obsidrev}'
+                sql_record += f"SQL Select Discard: {select_discard}\n"
+                res = cur.execute(select_discard)
+                curr_signoff = res.fetchone()
+                discard_execute = f'UPDATE revisions SET general_signoff = "{curr_signoff[0]}", acis_signoff = "{curr_signoff[1]}", acis_si_mode_signoff = "{curr_signoff[2]}", hrc_si_mode_signoff = "{curr_signoff[3]}", usint_verification = "{current_user.username}", usint_date = "{today}" WHERE obsidrev = {obsidrev}'
+                discard_execute = discard_execute.replace('NA','N/A').replace('"None"','NULL')
+                sql_record += f"SQL Update Discard: {discard_execute}\n"
+                if current_app.config['CONFIGURATION_NAME'] == 'localhost':
+                    print(sql_record)
+                cur.execute(discard_execute)
+            else:
 #
 #--- Update signoff column and date
 #
-                        date_col = column_signoff.replace("_signoff","_date").replace("_verification","_date")
-                        update_execute = f'UPDATE revisions SET {column_signoff} = "{current_user.username}", {date_col} = "{TODAY_STRING}" WHERE obsidrev = {obsidrev}'
-                        sql_record += f"SQL Update: {update_execute}\n"
-                        if current_app.config['CONFIGURATION_NAME'] == 'localhost':
-                            print(sql_record)
-                        cur.execute(update_execute)
+                date_col = column_signoff.replace("_signoff","_date").replace("_verification","_date")
+                update_execute = f'UPDATE revisions SET {column_signoff} = "{current_user.username}", {date_col} = "{today}" WHERE obsidrev = {obsidrev}'
+                sql_record += f"SQL Update: {update_execute}\n"
+                if current_app.config['CONFIGURATION_NAME'] == 'localhost':
+                    print(sql_record)
+                cur.execute(update_execute)
         return False
     except sq.OperationalError:
         current_app.logger.error(traceback.format_exc())
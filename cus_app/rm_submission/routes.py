@@ -11,43 +11,26 @@ import os
 import sys
 import re
 import string
-import Chandra.Time
 import time
-import sqlite3 as sq
-from contextlib import closing
 import traceback
-from datetime       import datetime
 
-from flask          import render_template, flash, redirect, url_for, session
+from flask          import render_template, flash, redirect, url_for
 from flask          import request, g, jsonify, current_app
 from flask_login    import current_user
 
 from cus_app            import db
-from cus_app.models     import User, register_user 
+from cus_app.models     import User
 from cus_app.rm_submission    import bp
 import cus_app.emailing as email
 
 import cus_app.supple.ocat_common_functions         as ocf
+import cus_app.supple.revision_store                as rvs
+import cus_app.supple.updates_db                    as udb
 #
 #--- Define Globals
 #
-TODAY = datetime.now()
-TODAY_STRING = TODAY.strftime('%m/%d/%y')
-FETCH_SIZE = 1000
+DISPLAY_SIZE = 10
 NULL_SIGN_LIST = ['NA',None]
-#----------------------------------------------------------------------------------
-#-- before_request: this will be run before every time index is called          ---
-#----------------------------------------------------------------------------------
-
-@bp.before_app_request
-def before_request():
-    if current_user.is_authenticated:
-        session['session_start'] = int(Chandra.Time.DateTime().secs)
-        session.permanent        = True
-        session.modified         = True
-    else:
-        register_user()
-
 #----------------------------------------------------------------------------------
 #-- index: this is the main function to dispaly remove submission page           --
 #----------------------------------------------------------------------------------
@@ -105,19 +88,28 @@ def find_sign_off_entries():
                         are included
     """
     user  = current_user.username
-    ufile = os.path.join(current_app.config['OCAT_DIR'], 'updates_table.db')
+    now   = int(time.time())
 #
-#--- SQL query to database
+#--- a submission can be removed within two days of its creation and a sign-off
+#--- reversed on the day it was made or the next day
 #
-    with closing(sq.connect(ufile)) as conn: # auto-closes
-        with conn: # auto-commits
-            with closing(conn.cursor()) as cur: # auto-closes
-                fetch_result = cur.execute(f"SELECT * from revisions ORDER BY rev_time DESC LIMIT {FETCH_SIZE}").fetchall()
+    cutoff  = udb.recent_cutoff()
+    no_sign = ' AND '.join([f"IFNULL({col}, 'NA') = 'NA'" for col in ['general_signoff', 'acis_signoff', 'acis_si_mode_signoff', 'hrc_si_mode_signoff', 'usint_verification']])
+    signed  = ' OR '.join([f"({col}_signoff = ? AND {col}_epoch >= ?)" for col in ['general', 'acis', 'acis_si_mode', 'hrc_si_mode']])
+    cmd     = f"SELECT {udb.revision_columns} from revisions WHERE (submitter = ? AND {no_sign} AND rev_time > ?)"\
+              + f" OR (usint_verification = 'NA' AND ({signed})) OR (usint_verification = ? AND usint_epoch >= ?) ORDER BY rev_time DESC"
+    params  = [user, now - 2 * 86400] + [user, cutoff] * 4 + [user, cutoff]
 #
-#--- columns listed in the following order in the database:
+#--- SQL query to database; the last entries are displayed when there is nothing to reverse
+#
+    fetch_result = udb.fetch_all(cmd, params)
+    disp_result  = udb.fetch_all(f"SELECT {udb.revision_columns} from revisions ORDER BY rev_time DESC LIMIT {DISPLAY_SIZE}")
+#
+#--- columns listed in the following order:
 #--- obsidrev (0), general_signoff (1), general_date (2), acis_signoff (3), acis_date (4)
 #--- acis_si_mode_signoff (5), acis_si_mode_date (6), hrc_si_mode_signoff (7), hrc_si_mode_date (8)
 #--- usint_verification (9), usint_date (10), sequence (11), submitter (12), rev_time (13) (creation of rev in epoch time)
+#--- general_epoch (14), acis_epoch (15), acis_si_mode_epoch (16), hrc_si_mode_epoch (17), usint_epoch (18)
 #
     s_dict = {}
     for entry in fetch_result:
@@ -125,38 +117,29 @@ def find_sign_off_entries():
 #--- If there are no signoffs whatsoever, check if can we remove the obsidrev itself
 #
         if (entry[12] == user) and (entry[1] in NULL_SIGN_LIST) and (entry[3] in NULL_SIGN_LIST) and (entry[5] in NULL_SIGN_LIST) and (entry[7] in NULL_SIGN_LIST) and (entry[9] in NULL_SIGN_LIST):
-            if (TODAY - datetime.fromtimestamp(entry[13])).days < 2:
-                s_dict[str(entry[0])] = [format_display(entry), 0]
+            s_dict[str(entry[0])] = [format_display(entry), 0]
 
         elif entry[9] == 'NA':
 #
 #--- Reverting regular signoffs
 #
             for idx in range(7,0,-2): # Range between sign off column indexes in reverse order
-                if entry[idx] == user:
-                    if (TODAY - datetime.strptime(entry[idx+1],'%m/%d/%y')).days < 2:
+                if entry[idx] == user and entry[14 + idx // 2] is not None and entry[14 + idx // 2] >= cutoff:
 #
-#--- If the  current user signed off on this particular column within the last two days, then list it as reversible
+#--- If the  current user signed off on this particular column today or yesterday, then list it as reversible
 #
-                        s_dict[str(entry[0])] = [format_display(entry), (idx // 2) + 1]
-                        break
-                    else:
-                        continue
+                    s_dict[str(entry[0])] = [format_display(entry), (idx // 2) + 1]
+                    break
         elif entry[9] == user:
 #
 #--- Obsid has been verified by the user. Therefore need to check if undoing 'asis' approval or a regular usint verification
-#
-            if (TODAY - datetime.strptime(entry[10],'%m/%d/%y')).days < 2:
-#
 #--- Check if it's an ASIS revision by noting if the sign columns are all None
 #
-                if (entry[1] == None) and (entry[3] == None) and (entry[5] == None) and (entry[7] == None):
-                    s_dict[str(entry[0])] = [format_display(entry), 6]
-                else:
-                    s_dict[str(entry[0])] = [format_display(entry), 5]
+            if (entry[1] == None) and (entry[3] == None) and (entry[5] == None) and (entry[7] == None):
+                s_dict[str(entry[0])] = [format_display(entry), 6]
             else:
-                continue
-    return fetch_result[:10], s_dict
+                s_dict[str(entry[0])] = [format_display(entry), 5]
+    return disp_result, s_dict
 
 #----------------------------------------------------------------------------------
 #--  format_display: modify updates_table.db entries into Jinja2 parseable lists  -
@@ -235,7 +218,6 @@ def update_data_tables(form):
     output: updated <ocat_dir>/updates_table.db
                     <ocat_dir/approved
     """
-    ufile = os.path.join(current_app.config['OCAT_DIR'], 'updates_table.db')
     approve_file = os.path.join(current_app.config['OCAT_DIR'],'approved')
 #
 #--- find out which entry is asked to be reversed sign-off status
@@ -257,7 +239,7 @@ def update_data_tables(form):
 #
             reversal_statement = None
             if pos == 0:
-                file_remove = os.path.join(current_app.config['OCAT_DIR'],'updates',obsidrev)
+                file_remove = rvs.revision_path(obsidrev)
                 try:
                     os.system(f"rm -rf {file_remove}")
                 except:
@@ -279,7 +261,7 @@ def update_data_tables(form):
 #--- Removing an ASIS submittion involves, removing the parameter file recording only the ASIS change, 
 #--- removing obsidrev from the approved list, and removing the ASIS revision from the updates_table.db
 #
-                file_remove = os.path.join(current_app.config['OCAT_DIR'],'updates',obsidrev)
+                file_remove = rvs.revision_path(obsidrev)
                 reversal_statement = f"DELETE FROM revisions WHERE obsidrev = {obsidrev}"
                 with open(approve_file,'r') as f:
                     data = [line.strip() for line in f.readlines()]
@@ -303,10 +285,8 @@ def update_data_tables(form):
 #
 #--- SQL query to database
 #
-                with closing(sq.connect(ufile)) as conn: # auto-closes
-                    with conn: # auto-commits
-                        with closing(conn.cursor()) as cur: # auto-closes
-                            cur.execute(reversal_statement)
+                with udb.transaction() as cur:
+                    cur.execute(reversal_statement)
                 return False
             else:
                 current_app.logger.error(f"Attempting to remove submission with undetermined status: {atemp}")
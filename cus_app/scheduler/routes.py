@@ -17,13 +17,12 @@ import copy
 import threading
 import Chandra.Time
 
-from flask              import render_template, flash, redirect, url_for, session
+from flask              import render_template, flash, redirect, url_for
 from flask              import request, current_app
 from flask_login        import current_user
 
 from cus_app.scheduler      import bp
 from cus_app.emailing       import send_email
-from cus_app.models         import register_user
 
 import cus_app.supple.ocat_common_functions     as ocf  #--- save commonly used functions
 import cus_app.scheduler.read_poc_schedule      as rps  #--- create a data table from the database
@@ -54,19 +53,6 @@ warning = warning + "submited your update. Please check the schedule below  "
 warning = warning + "(automatically updated) and re-submit your update. "
 warning = warning + "If you just reloaded the page, please ignore this message."
 
-#-------------------------------------------------------------------
-#-- before_request: this will be run before every time index is called  
-#-------------------------------------------------------------------
-                                                                    
-@bp.before_app_request
-def before_request():
-    if current_user.is_authenticated:
-        session['session_start'] = int(Chandra.Time.DateTime().secs)
-        session.permanent        = True
-        session.modified         = True
-    else:
-        register_user()
-
 #-------------------------------------------------------------------
 #-- index: this is the main function to display scheduler page    --
 #-------------------------------------------------------------------
@@ -0,0 +1,193 @@
+#####################################################################################
+#                                                                                   #
+#   edit_session.py: server side store of Ocat Data Page edit sessions              #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#   when the page of an obsid is opened, the parameter dict made from the          #
+#   database is kept in LOG_DIR/edit_sessions.db under (user, obsid, token),       #
+#   and the token is passed back with each form. the following POSTs (Refresh,     #
+#   Submit, Return, Finalize) apply the form to the kept dict instead of           #
+#   reading the observation again. a session not used for EDIT_SESSION_TTL sec     #
+#   expires, and the next POST starts a new one from the database.                 #
+#                                                                                   #
+#   Finalize reads the observation once more (find_changes) to see whether         #
+#   someone else changed it, or submitted a revision, after the session started.   #
+#                                                                                   #
+#####################################################################################
+
+import os
+import time
+import pickle
+import secrets
+import traceback
+import sqlite3 as sq
+from contextlib     import closing
+from flask          import current_app
+from flask_login    import current_user
+
+import cus_app.supple.read_ocat_data            as rod
+import cus_app.supple.ocat_data_cache           as odc
+import cus_app.supple.updates_db                as udb
+
+#------------------------------------------------------------------------------------
+#-- start: keep the parameter dict of a newly opened page                         --
+#------------------------------------------------------------------------------------
+
+def start(obsid, ct_dict, warning):
+    """
+    keep the parameter dict of a newly opened page
+    input:  obsid   --- obsid
+            ct_dict --- a dict of <param> <--> <information> just made from the database
+            warning --- the warning line of the page
+    output: token   --- the session token passed back with the forms; '' if the
+                        session could not be kept (the POSTs then read the database)
+    """
+    token  = secrets.token_hex(16)
+    record = {'ct_dict': ct_dict,
+              'warning': warning,
+#
+#--- the database values behind ct_dict (already read in this request) and the
+#--- latest revision, which find_changes compares against at Finalize
+#
+              'ocat'   : rod.read_ocat_data(obsid),
+              'rev'    : latest_rev(obsid),
+             }
+    ttl    = current_app.config.get('EDIT_SESSION_TTL', 7200)
+    stime  = time.time()
+    try:
+        with closing(connect_store()) as conn:
+            with conn:
+                conn.execute('INSERT INTO edit_session (user, obsid, token, data, accessed) VALUES (?, ?, ?, ?, ?)',\
+                             (current_user.username, str(obsid).strip(), token, pickle.dumps(record), stime))
+                conn.execute('DELETE FROM edit_session WHERE accessed <= ?', (stime - ttl,))
+    except Exception:
+        current_app.logger.error(traceback.format_exc())
+        return ''
+
+    return token
+
+#------------------------------------------------------------------------------------
+#-- load: return a kept edit session                                               --
+#------------------------------------------------------------------------------------
+
+def load(obsid, token):
+    """
+    return a kept edit session of the current user
+    input:  obsid   --- obsid
+            token   --- the session token from the form
+    output: record  --- a dict of ct_dict, warning, ocat (the database values) and rev;
+                        None if there is no such session or it expired
+    """
+    if token in ['', None]:
+        return None
+
+    ttl   = current_app.config.get('EDIT_SESSION_TTL', 7200)
+    stime = time.time()
+    key   = (current_user.username, str(obsid).strip(), str(token))
+    try:
+        with closing(connect_store()) as conn:
+            with conn:
+                out = conn.execute('SELECT data, accessed FROM edit_session WHERE user = ? AND obsid = ? AND token = ?',\
+                                   key).fetchone()
+                if out is None or stime - out[1] >= ttl:
+                    return None
+
+                conn.execute('UPDATE edit_session SET accessed = ? WHERE user = ? AND obsid = ? AND token = ?',\
+                             (stime,) + key)
+
+        return pickle.loads(out[0])
+
+    except Exception:
+        current_app.logger.error(traceback.format_exc())
+
+    return None
+
+#------------------------------------------------------------------------------------
+#-- discard: remove an edit session                                                --
+#------------------------------------------------------------------------------------
+
+def discard(obsid, token):
+    """
+    remove an edit session of the current user (e.g. after Finalize)
+    input:  obsid   --- obsid
+            token   --- the session token
+    output: none
+    """
+    if token in ['', None]:
+        return
+    try:
+        with closing(connect_store()) as conn:
+            with conn:
+                conn.execute('DELETE FROM edit_session WHERE user = ? AND obsid = ? AND token = ?',\
+                             (current_user.username, str(obsid).strip(), str(token)))
+    except Exception:
+        current_app.logger.error(traceback.format_exc())
+
+#------------------------------------------------------------------------------------
+#-- find_changes: check whether the observation was changed during the session    --
+#------------------------------------------------------------------------------------
+
+def find_changes(obsid, record):
+    """
+    read the observation from the database (not from the caches) and find what
+    was changed after the edit session started
+    input:  obsid   --- obsid
+            record  --- the edit session from load
+    output: c_list  --- a list of changed database parameter names, with 'revision'
+                        if a new revision was submitted; [] if nothing changed.
+                        the fresh values are left in the caches for this request.
+    """
+    odc.invalidate(obsid)
+    ocat   = rod.read_ocat_data(obsid)
+    saved  = record['ocat']
+
+    c_list = []
+    for param in sorted(set(ocat) | set(saved)):
+        if ocat.get(param) != saved.get(param):
+            c_list.append(param)
+
+    if latest_rev(obsid) != record['rev']:
+        c_list.append('revision')
+
+    return c_list
+
+#------------------------------------------------------------------------------------
+#-- latest_rev: return the latest revision # of an obsid in updates_table.db      --
+#------------------------------------------------------------------------------------
+
+def latest_rev(obsid):
+    """
+    return the latest revision # of an obsid in updates_table.db
+    input:  obsid   --- obsid
+    output: the revision #; 0 if there is none, None if the database cannot be read
+    """
+    try:
+        out = udb.fetch_all('SELECT MAX(rev) FROM revisions WHERE obsid = ?', (int(obsid),))
+    except sq.Error:
+        current_app.logger.error(traceback.format_exc())
+        return None
+
+    if len(out) == 0 or out[0][0] is None:
+        return 0
+
+    return out[0][0]
+
+#------------------------------------------------------------------------------------
+#-- connect_store: open the edit session database                                 --
+#------------------------------------------------------------------------------------
+
+def connect_store():
+    """
+    open the edit session database; the table is created if it does not exist
+    input:  none
+    output: conn    --- sqlite3 connection
+    """
+    sfile = os.path.join(current_app.config['LOG_DIR'], 'edit_sessions.db')
+    conn  = sq.connect(sfile, timeout=5)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('CREATE TABLE IF NOT EXISTS edit_session (user TEXT, obsid TEXT, token TEXT, data BLOB, accessed REAL, '\
+                 'PRIMARY KEY (user, obsid, token))')
+    conn.execute('CREATE INDEX IF NOT EXISTS edit_session_accessed ON edit_session (accessed)')
+
+    return conn
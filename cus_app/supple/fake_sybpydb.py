@@ -0,0 +1,396 @@
+#####################################################################################
+#                                                                                   #
+#   fake_sybpydb.py: a stand-in for the sybpydb module, backed by sqlite           #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#   Note: only the part of the sybpydb interface used in get_value_from_sybase.py  #
+#         is provided. A command registered in RESPONSES returns the registered    #
+#         rows; any other command runs on the sqlite database set by configure     #
+#         (see seed_database for the synthetic observations). Every round trip     #
+#         sleeps <latency> seconds so that it costs about what a server would.     #
+#                                                                                   #
+#         select with SYBASE_DRIVER = 'fake' in the configuration.                 #
+#                                                                                   #
+#####################################################################################
+
+import os
+import re
+import sys
+import time
+import random
+import threading
+from collections import deque
+import sqlite3 as sq
+from contextlib import closing
+#
+#--- <command> <---> a list of row tuples (or a function taking the command)
+#
+RESPONSES = {}
+#
+#--- counters which can be inspected when checking the pool behavior
+#
+stats     = {'connect': 0, 'execute': 0, 'use': 0}
+_lock     = threading.Lock()
+#
+#--- sqlite database file and seconds slept per round trip; set by configure
+#
+_dbfile   = None
+_latency  = 0
+#
+#--- text columns handed out as LOB objects, as sybpydb does for text columns
+#
+lob_columns = ['remarks', 'mp_remarks']
+
+class Error(Exception):
+    pass
+
+#------------------------------------------------------------------------------------
+#-- LOB: a text value which can only be read with readinto, like sybpydb.LOB      --
+#------------------------------------------------------------------------------------
+
+class LOB(object):
+
+    def __init__(self, text):
+        if isinstance(text, str):
+            text = text.encode('utf-8')
+        self.data = text
+        self.pos  = 0
+
+    def readinto(self, buf):
+        if self.pos >= len(self.data):
+            return None
+
+        part = self.data[self.pos:self.pos + len(buf)]
+        buf[:len(part)] = part
+        self.pos += len(part)
+
+        return len(part)
+
+#------------------------------------------------------------------------------------
+#-- configure: set the sqlite database and the latency                            --
+#------------------------------------------------------------------------------------
+
+def configure(dbfile=None, latency=0):
+    """
+    set the sqlite database and the latency; a database file which does not
+    exist yet is created with seed_database
+    input:  dbfile  --- sqlite database file; None: RESPONSES only
+            latency --- seconds slept per round trip (connect/execute)
+    output: none
+    """
+    global _dbfile, _latency
+
+    if dbfile is not None and not os.path.isfile(dbfile):
+        seed_database(dbfile)
+
+    _dbfile  = dbfile
+    _latency = float(latency)
+
+#------------------------------------------------------------------------------------
+#-- connect: open a fake connection                                                --
+#------------------------------------------------------------------------------------
+
+def connect(servername=None, user=None, password=None, **kwargs):
+    """
+    open a fake connection
+    input:  servername/user/password    --- accepted and ignored
+    output: Connection
+    """
+    with _lock:
+        stats['connect'] += 1
+
+    if _latency > 0:
+        time.sleep(_latency)
+
+    return Connection(_dbfile)
+
+#------------------------------------------------------------------------------------
+
+def reset():
+    """
+    clear registered responses and counters
+    """
+    RESPONSES.clear()
+    for key in stats.keys():
+        stats[key] = 0
+
+#------------------------------------------------------------------------------------
+
+class Connection(object):
+
+    def __init__(self, dbfile=None):
+        self.closed   = False
+        self.database = None
+#
+#--- a pooled connection is used by one thread at a time, but not always the same one
+#
+        self.db       = None
+        if dbfile is not None:
+            self.db = sq.connect(dbfile, check_same_thread=False)
+
+    def cursor(self):
+        if self.closed:
+            raise Error('connection is closed')
+
+        return Cursor(self)
+
+    def close(self):
+        self.closed = True
+        if self.db is not None:
+            self.db.close()
+
+#------------------------------------------------------------------------------------
+
+class Cursor(object):
+
+    def __init__(self, conn):
+        self.conn        = conn
+        self.rows        = deque()
+        self.description = None
+
+    def execute(self, cmd):
+        if self.conn.closed:
+            raise Error('connection is closed')
+
+        with _lock:
+            stats['execute'] += 1
+
+        if _latency > 0:
+            time.sleep(_latency)
+
+        self.description = None
+        mc = re.match(r'\s*use\s+(\w+)\s*$', cmd)
+        if mc is not None:
+            with _lock:
+                stats['use'] += 1
+            self.conn.database = mc.group(1)
+            self.rows = deque()
+            return
+
+        if cmd.strip() == 'select 1':
+            self.rows = deque([(1,)])
+            return
+
+        if cmd in RESPONSES:
+            out = RESPONSES[cmd]
+            if callable(out):
+                out = out(cmd)
+
+            self.rows = deque(tuple(row) for row in out)
+            return
+
+        if self.conn.db is None:
+            raise Error('no response registered for: ' + cmd)
+
+        try:
+            cur = self.conn.db.execute(cmd)
+        except sq.Error as e:
+            raise Error(str(e))
+
+        if cur.description is None:
+            self.rows = deque()
+            return
+#
+#--- text columns come back as LOB objects and are typed as LOB in the description
+#
+        self.description = []
+        l_pos            = []
+        for k in range(0, len(cur.description)):
+            name = cur.description[k][0]
+            if name in lob_columns:
+                self.description.append((name, LOB, None, None, None, None, None))
+                l_pos.append(k)
+            else:
+                self.description.append((name, None, None, None, None, None, None))
+
+        self.rows = deque()
+        for row in cur.fetchall():
+            if len(l_pos) > 0:
+                row = list(row)
+                for k in l_pos:
+                    if isinstance(row[k], str):
+                        row[k] = LOB(row[k])
+                row = tuple(row)
+
+            self.rows.append(row)
+
+    def fetchall(self):
+        out       = list(self.rows)
+        self.rows = deque()
+        return out
+
+    def fetchone(self):
+        if len(self.rows) == 0:
+            return None
+
+        return self.rows.popleft()
+
+    def close(self):
+        self.rows = deque()
+
+#------------------------------------------------------------------------------------
+#-- seed_database: create a sqlite database with synthetic observations           --
+#------------------------------------------------------------------------------------
+
+def seed_database(dbfile, nobs=500, seed=1):
+    """
+    create a sqlite database with synthetic observations. the tables and
+    columns are those of the replica (see ocat_replica.table_list). the data
+    cover ACIS and HRC observations, TOO/DDT, monitor chains (pre_id),
+    group ids, and ranked roll/time/window constraints.
+    input:  dbfile  --- sqlite database file; an existing file is replaced
+            nobs    --- the number of observations
+            seed    --- random seed; the same seed gives the same database
+    output: dbfile  --- sqlite database
+    """
+    from . import ocat_replica as orp
+
+    rng = random.Random(seed)
+    if os.path.isfile(dbfile):
+        os.remove(dbfile)
+
+    t_dict = {}
+    for table, c_list, i_list in orp.table_list():
+        t_dict[table] = [list(dict.fromkeys(c_list)), i_list, []]
+
+    def add(table, **kwargs):
+        t_dict[table][2].append([kwargs.get(col) for col in t_dict[table][0]])
+
+    l_names = ['Smith', 'Wang', 'Garcia', 'Mueller', 'Tanaka', 'Rossi', 'Dubois', 'Kim']
+    pre_obs = None
+    group   = None
+    propid  = None
+    for k in range(0, nobs):
+        obsid = 20000 + k
+#
+#--- a new proposal every few observations
+#
+        if propid is None or rng.random() < 0.25:
+            propid = 25000 + k
+            add('prop_info', ocat_propid=propid, prop_num=str(24000000 + k),\
+                title=f'Synthetic proposal {k}', joint='None', ao_str=str(rng.randint(20, 25)))
+            add('view_pi', ocat_propid=propid, last=rng.choice(l_names))
+            if rng.random() < 0.5:
+                add('view_coi', ocat_propid=propid, last=rng.choice(l_names))
+
+        inst   = rng.choice(['ACIS-S', 'ACIS-I', 'HRC-S', 'HRC-I'])
+        otype  = rng.choices(['GO', 'TOO', 'DDT', 'GTO', 'CAL'], [60, 15, 5, 15, 5])[0]
+        status = rng.choices(['unobserved', 'scheduled', 'observed', 'archived', 'canceled',\
+                              'untriggered'], [35, 10, 10, 35, 5, 5])[0]
+#
+#--- monitor chains: continue the previous chain or start a new one
+#
+        pre_id = None
+        if pre_obs is not None and rng.random() < 0.6:
+            pre_id  = pre_obs
+        pre_obs = obsid if rng.random() < 0.2 or pre_id is not None else None
+#
+#--- group ids: a few observations of the same target share one
+#
+        if group is not None and rng.random() < 0.5:
+            group_id = group
+        elif pre_id is None and rng.random() < 0.05:
+            group    = f'SYN{obsid}_{rng.randint(1000000, 9999999)}'
+            group_id = group
+        else:
+            group    = None
+            group_id = None
+
+        tooid  = obsid if otype in ['TOO', 'DDT'] else None
+        acisid = obsid if inst.startswith('ACIS') else None
+        hrcid  = obsid if inst.startswith('HRC')  else None
+        n_roll = rng.choice([0, 0, 0, 1, 2, 3])
+        n_time = rng.choice([0, 0, 0, 1, 2, 4])
+        n_win  = rng.choice([0, 0, 0, 0, 1, 2]) if acisid is not None else 0
+        phase  = 'Y' if rng.random() < 0.1 else 'N'
+        dither = 'Y' if rng.random() < 0.2 else 'N'
+        remark = rng.choice([None, 'Please coordinate with the ground observatory.',\
+                             'Line one of the remarks.\nLine two of the remarks.'])
+
+        add('target', obsid=obsid, targid=obsid, seq_nbr=str(500000 + k),\
+            targname=f'SYN-{k:04d}', obj_flag='NO', object='NONE', si_mode=f'TE_{k % 100:05d}',\
+            photometry_flag='N', ra=round(rng.uniform(0, 360), 6), dec=round(rng.uniform(-90, 90), 6),\
+            est_cnt_rate=round(rng.uniform(0, 5), 3), dither_flag=dither,\
+            approved_exposure_time=float(rng.choice([5, 10, 20, 40, 100])),\
+            pre_min_lead=1.0 if pre_id else None, pre_max_lead=5.0 if pre_id else None,\
+            pre_id=pre_id, seg_max_num=0, aca_mode='DEFAULT', phase_constraint_flag=phase,\
+            ocat_propid=propid, acisid=acisid, hrcid=hrcid,\
+            grating=rng.choice(['NONE', 'NONE', 'HETG', 'LETG']), instrument=inst,\
+            rem_exp_time=0.0, type=otype, status=status,\
+            soe_st_sched_date='2026-11-01T12:00:00' if status == 'scheduled' else None,\
+            lts_lt_plan='2026-12-01T00:00:00' if status == 'unobserved' else None,\
+            data_rights='N', tooid=tooid, uninterrupt='N', multitelescope='N',\
+            constr_in_remarks='N', group_id=group_id, obs_ao_str=str(rng.randint(20, 25)),\
+            roll_flag='Y' if n_roll > 0 else 'N', window_flag='Y' if n_time > 0 else 'N',\
+            spwindow_flag='Y' if n_win > 0 else 'N', remarks=remark, mp_remarks=None)
+
+        for r in range(1, n_roll + 1):
+            add('rollreq', obsid=obsid, ordr=r, roll_constraint='Y', roll_180='N',\
+                roll=float(rng.randint(0, 359)), roll_tolerance=float(rng.choice([5, 10, 20])))
+
+        for r in range(1, n_time + 1):
+            add('timereq', obsid=obsid, ordr=r, window_constraint='Y',\
+                tstart=f'2026-{r + 1:02d}-01T00:00:00', tstop=f'2026-{r + 1:02d}-20T00:00:00')
+
+        for r in range(1, n_win + 1):
+            add('aciswin', obsid=obsid, ordr=r, aciswin_id=obsid * 10 + r, start_row=1,\
+                start_column=1, width=1023, height=rng.choice([128, 256, 512]),\
+                lower_threshold=0.08, pha_range=13.0, sample=0,\
+                chip=rng.choice(['I3', 'S3']), include_flag='I')
+
+        if tooid is not None:
+            add('too', tooid=tooid, type=rng.choice(['0-5', '5-15', '15-30', '30+']),\
+                start=0.0, stop=float(rng.choice([5, 15, 30])), followup=rng.randint(0, 3),\
+                trig='Trigger when the source is brighter than 1e-11.', remarks=None)
+
+        if acisid is not None:
+            ccds = ['Y', 'Y', 'Y', 'Y', 'N', 'N', 'Y', 'Y', 'O1', 'N'] if inst == 'ACIS-S'\
+                   else ['Y', 'Y', 'Y', 'Y', 'N', 'N', 'O1', 'N', 'N', 'N']
+            add('acisparam', acisid=acisid, exp_mode=rng.choice(['TE', 'TE', 'CC']),\
+                ccdi0_on=ccds[0], ccdi1_on=ccds[1], ccdi2_on=ccds[2], ccdi3_on=ccds[3],\
+                ccds0_on=ccds[4], ccds1_on=ccds[5], ccds2_on=ccds[6], ccds3_on=ccds[7],\
+                ccds4_on=ccds[8], ccds5_on=ccds[9], bep_pack='VF', onchip_sum='N',\
+                frame_time=3.2, subarray='NONE', duty_cycle='N', most_efficient='Y',\
+                eventfilter='N', dropped_chip_count=0, multiple_spectral_lines='N')
+
+        if hrcid is not None:
+            add('hrcparam', hrcid=hrcid, hrc_zero_block='N', timing_mode='N', si_mode='HRCIEVTS')
+
+        if phase == 'Y':
+            add('phasereq', obsid=obsid, phase_period=round(rng.uniform(0.1, 10), 3),\
+                phase_epoch=50000.0, phase_start=0.1, phase_end=0.3,\
+                phase_start_margin=0.05, phase_end_margin=0.05)
+
+        if dither == 'Y':
+            add('dither', obsid=obsid, y_amp=0.002, y_freq=0.36, y_phase=0.0,\
+                z_amp=0.002, z_freq=0.51, z_phase=0.0)
+
+        add('sim', obsid=obsid, trans_offset=0.0, focus_offset=0.0)
+
+        if status in ['scheduled', 'observed', 'archived']:
+            add('soe', obsid=obsid, unscheduled='N', soe_roll=float(rng.randint(0, 359)))
+
+    with closing(sq.connect(dbfile)) as conn:
+        with conn:
+            for table, [c_list, i_list, rows] in t_dict.items():
+                conn.execute(f"CREATE TABLE {table} ({', '.join(c_list)})")
+                conn.executemany(f"INSERT INTO {table} VALUES ({', '.join(['?'] * len(c_list))})", rows)
+                for col in i_list:
+                    conn.execute(f"CREATE INDEX {table}_{col} ON {table} ({col})")
+
+#------------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+#
+#--- e.g. python -m cus_app.supple.fake_sybpydb /tmp/fake_ocat.db 2000
+#
+    if len(sys.argv) < 2:
+        print("Usage: python -m cus_app.supple.fake_sybpydb <sqlite file> [<# of obs>]")
+        exit(1)
+
+    nobs = 500
+    if len(sys.argv) > 2:
+        nobs = int(sys.argv[2])
+
+    seed_database(sys.argv[1], nobs)
@@ -19,20 +19,176 @@
 import sys
 import os
 import string
-import re
-import json
 import time
 import datetime
-import sybpydb
+import threading
+import importlib
+from . import sybase_pool   as sbp
 #
 #--- set parameters
 #
 pass_dir = '/data/mta4/CUS/authorization/'
 serv     = 'ocatsqlsrv'
 usr      = 'mtaops_internal_web'
-line     = pass_dir + '.targpass_internal'
-with  open(line, 'r') as f:
-    passwd = f.readline().strip()
+passwd   = None
+#
+#--- database driver: 'sybpydb' (the sybase client) or 'fake' (fake_sybpydb.py on sqlite);
+#--- it is imported when the first connection is opened. set by init_app with SYBASE_DRIVER
+#
+driver_name   = 'sybpydb'
+_driver       = None
+#
+#--- connection pool settings; overridden by init_app with the SYBASE_POOL_* config values
+#
+pool_size     = 4
+pool_timeout  = 30
+pool_ping     = 60
+_pool         = None
+_pool_lock    = threading.Lock()
+#
+#--- LOB (text/image) columns are read in place with a reusable per-thread buffer
+#
+lob_type_names = ['LOB', 'TEXT', 'UNITEXT', 'IMAGE']
+lob_chunk_size = 65536
+_local         = threading.local()
+
+#------------------------------------------------------------------------------------
+#-- init_app: set the connection pool parameters from the flask configuration     --
+#------------------------------------------------------------------------------------
+
+def init_app(app):
+    """
+    set the connection pool parameters from the flask configuration
+    input:  app --- flask application
+    output: none
+    """
+    configure_pool(size          = app.config.get('SYBASE_POOL_SIZE',     pool_size),
+                   timeout       = app.config.get('SYBASE_POOL_TIMEOUT',  pool_timeout),
+                   ping_interval = app.config.get('SYBASE_PING_INTERVAL', pool_ping))
+
+    configure_driver(app.config.get('SYBASE_DRIVER', driver_name))
+    if driver_name == 'fake':
+        get_driver().configure(dbfile  = app.config.get('FAKE_SYBASE_FILE'),
+                               latency = app.config.get('FAKE_SYBASE_LATENCY', 0))
+
+#------------------------------------------------------------------------------------
+#-- configure_driver: select the database driver                                  --
+#------------------------------------------------------------------------------------
+
+def configure_driver(name):
+    """
+    select the database driver; open connections are closed
+    input:  name    --- 'sybpydb' or 'fake'
+    output: none
+    """
+    global driver_name, _driver
+
+    if name not in ['sybpydb', 'fake']:
+        raise ValueError(f'Unknown SYBASE_DRIVER: {name}')
+
+    if name != driver_name:
+        driver_name = name
+        _driver     = None
+        configure_pool()
+
+#------------------------------------------------------------------------------------
+#-- get_driver: import and return the database driver module                      --
+#------------------------------------------------------------------------------------
+
+def get_driver():
+    """
+    import and return the database driver module
+    input:  none
+    output: _driver --- sybpydb or fake_sybpydb module
+    """
+    global _driver
+
+    if _driver is None:
+        if driver_name == 'fake':
+            from . import fake_sybpydb
+            _driver = fake_sybpydb
+        else:
+            _driver = importlib.import_module('sybpydb')
+
+    return _driver
+
+#------------------------------------------------------------------------------------
+#-- get_password: read the sybase password                                        --
+#------------------------------------------------------------------------------------
+
+def get_password():
+    """
+    read the sybase password; the file is read only once
+    input:  none; but read from <pass_dir>/.targpass_internal
+    output: passwd  --- password
+    """
+    global passwd
+
+    if passwd is None:
+        with  open(pass_dir + '.targpass_internal', 'r') as f:
+            passwd = f.readline().strip()
+
+    return passwd
+
+#------------------------------------------------------------------------------------
+#-- configure_pool: reset the connection pool with new parameters                  --
+#------------------------------------------------------------------------------------
+
+def configure_pool(size=None, timeout=None, ping_interval=None):
+    """
+    reset the connection pool with new parameters
+    input:  size            --- the maximum number of connections per process
+            timeout         --- seconds to wait for a free connection
+            ping_interval   --- idle seconds after which a connection is health checked
+    output: none
+    """
+    global pool_size, pool_timeout, pool_ping, _pool
+
+    if size is not None:
+        pool_size = int(size)
+    if timeout is not None:
+        pool_timeout = timeout
+    if ping_interval is not None:
+        pool_ping = ping_interval
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+        _pool = None
+
+#------------------------------------------------------------------------------------
+#-- get_pool: return the connection pool of this process                          --
+#------------------------------------------------------------------------------------
+
+def get_pool():
+    """
+    return the connection pool of this process. a pool inherited through
+    fork is not reused; the child opens its own connections.
+    input:  none
+    output: _pool   --- sybase_pool.ConnectionPool
+    """
+    global _pool
+
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = sbp.ConnectionPool(connect_sybase, size=pool_size, timeout=pool_timeout,
+                                       ping_interval=pool_ping)
+    return _pool
+
+#------------------------------------------------------------------------------------
+#-- connect_sybase: open a new connection to the sybase server                    --
+#------------------------------------------------------------------------------------
+
+def connect_sybase():
+    """
+    open a new connection to the sybase server
+    input:  none
+    output: a sybpydb (or fake_sybpydb) connection
+    """
+    if driver_name == 'fake':
+        return get_driver().connect(servername=serv, user=usr)
+
+    return get_driver().connect(servername=serv, user=usr, password=get_password())
 
 #------------------------------------------------------------------------------------
 #-- get_value_from_sybase: run sybase command for python3.8                        --
@@ -43,31 +199,15 @@ def get_value_from_sybase(cmd, db='axafocat'):
     run sybase command for python3.8
     input:  cmd --- sybase command, fetchin only
             db  --- database name; default: axafocat
-    output: row --- a json string (of a list of lists)
+    output: save    --- a list of tuples of row values
     """
 #
-#--- connect to sybase
-#
-    conn = sybpydb.connect(servername=serv, user=usr, password=passwd)
-    cur  = conn.cursor()
-#
-#--- set db name
-#
-    dcmd = 'use ' + db
-    cur.execute(dcmd)
-#
-#--- fetch data
+#--- fetch data on a pooled connection which is already set to the db
 #
     try:
-        cur.execute(cmd)
-        row = cur.fetchall()
+        row = get_pool().run(db, lambda cur: fetch_rows(cur, cmd))
 
-        cur.close()
-        conn.close()
-
-    except:
-        cur.close()
-        conn.close()
+    except Exception:
         return [[]]
 #
 #--- convert none string data into string
@@ -75,23 +215,13 @@ def get_value_from_sybase(cmd, db='axafocat'):
     save = []
     for dset in row:
         tsave = []
-        for k in range(0, len(dset)):
-            ent = dset[k]
-#
-#--- convert sybpydb.LOB objects are converted back to a string
-#
-            mc = re.search('LOB', str(ent))
-            if mc is not None:
-                out = convert_lob_to_string(cmd, k)
+        for ent in dset:
 #
 #--- convert datetime object into date
 #
-            elif isinstance(ent, datetime.date):
+            if isinstance(ent, datetime.date):
                 out = ent.strftime('%Y-%m-%dT%H:%M:%S')
 
-#            elif isinstance(ent, varchar):
-#                out = str(ent)
-
             else:
                 out = ent
 
@@ -99,50 +229,75 @@ def get_value_from_sybase(cmd, db='axafocat'):
 
         tsave = tuple(tsave)
         save.append(tsave)
-#
-#--- convert a list to a json string so that we can pass back to the main script
-#
-    row = json.dumps(save)
 
-    #return row
     return save
 
 #-------------------------------------------------------------------------------------
-#-- convert_lob_to_string: rerun pybase command for a lob object and convert into a string
+#-- fetch_rows: run a command and fetch all rows, reading LOB columns in place      --
 #-------------------------------------------------------------------------------------
 
-def convert_lob_to_string(cmd, pos):
+def fetch_rows(cur, cmd):
     """
-    rerun pybase command for a lob object and convert into a string
-    input:  cmd --- original pybase command
-            pos --- the position of lob object in the command column names
-    output: out --- a content of lob
+    run a command and fetch all rows. LOB objects (text/image columns) can be
+    read only while the cursor is on their row, so rows are fetched one by one
+    and the LOBs are read into strings before moving to the next row.
+    input:  cur     --- cursor
+            cmd     --- sybase command
+    output: row     --- a list of rows
     """
-#
-#--- reconstruct the command for the lob object
-#
-    atemp = re.split('select', cmd)
-    btemp = re.split('from',   atemp[1])
-    ctemp = re.split(',',      btemp[0])
-    col   = ctemp[pos]
-    
-    cmd   = 'select ' + col + ' from ' + btemp[1]
-#
-#--- return the sybase command
-#
-    conn = sybpydb.connect(servername=serv, user=usr, password=passwd)
-    cur  = conn.cursor()
     cur.execute(cmd)
-    row  = cur.fetchone()
 #
-#--- convert lob object to a string
+#--- if the description does not show LOB columns, check every column
 #
-    out  = getlobdata(row[0])
+    l_pos = find_lob_columns(cur)
+
+    row = []
+    while True:
+        dset = cur.fetchone()
+        if dset is None:
+            break
 
-    cur.close()
-    conn.close()
+        if len(l_pos) > 0:
+            c_pos = l_pos
+        else:
+            c_pos = range(0, len(dset))
 
-    return out
+        tsave = None
+        for k in c_pos:
+            if hasattr(dset[k], 'readinto'):
+                if tsave is None:
+                    tsave = list(dset)
+                tsave[k] = getlobdata(dset[k])
+
+        if tsave is not None:
+            dset = tsave
+
+        row.append(dset)
+
+    return row
+
+#-------------------------------------------------------------------------------------
+#-- find_lob_columns: find the positions of LOB columns from cursor.description     --
+#-------------------------------------------------------------------------------------
+
+def find_lob_columns(cur):
+    """
+    find the positions of LOB columns from cursor.description
+    input:  cur     --- cursor after execute
+    output: l_pos   --- a list of column positions; empty if no LOB type is found
+    """
+    l_pos = []
+    if not cur.description:
+        return l_pos
+
+    drv     = get_driver()
+    l_types = [getattr(drv, name) for name in lob_type_names if hasattr(drv, name)]
+
+    for k in range(0, len(cur.description)):
+        if cur.description[k][1] in l_types:
+            l_pos.append(k)
+
+    return l_pos
 
 #-------------------------------------------------------------------------------------
 #-- getlobdata: convert LOB object to a string                                      --
@@ -154,25 +309,34 @@ def getlobdata(lob):
     input:  lob --- LOB object
     output: out --- a string
 
-    this functioin works only when LOB object is extracted specificlly for that column
-    with fetchone. See "convert_lob_to_string" how to set to use this function.
+    the LOB must be read before the cursor moves to the next row; see fetch_rows.
+    the read buffer is kept per thread and reused.
 
     ref: http://infocenter.sybase.com/help/index.jsp?topic=/com.sybase.infocenter.dc20155.1600/doc/html/adh1376805082896.html
     """
+    chunk = getattr(_local, 'chunk', None)
+    if chunk is None:
+        chunk        = bytearray(lob_chunk_size)
+        _local.chunk = chunk
+
+    view   = memoryview(chunk)
     outarr = bytearray()
-    chunk = bytearray(1024)
     while True:
         clen = lob.readinto(chunk)
-        if clen == None:
+        if not clen:
             break
 
-        outarr.extend(chunk[:clen])
-
-    out = str(outarr)
+        outarr.extend(view[:clen])
+#
+#--- the database keeps text in utf-8 but older entries can be in latin-1
+#
+    try:
+        out = outarr.decode('utf-8')
+    except UnicodeDecodeError:
+        out = outarr.decode('latin-1')
 
     return out
 
-
 #-------------------------------------------------------------------------------------
 
 if __name__ == "__main__":
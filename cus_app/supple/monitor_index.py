@@ -0,0 +1,232 @@
+#####################################################################################
+#                                                                                   #
+#   monitor_index.py: in-memory index of monitor series and group members          #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#   the index is built from one query on the target table and answers monitor     #
+#   chain and group member questions without further database access.            #
+#                                                                                   #
+#   Note: this module is also imported by other_scripts/TOO_Obs/readSQL.py,        #
+#         which still runs on python 2; keep it free of python 3 only syntax.     #
+#                                                                                   #
+#####################################################################################
+
+import time
+import threading
+#
+#--- observations which are linked by pre_id or share a group_id, and the obsids used as pre_id
+#
+bulk_cmd = 'select obsid, pre_id, group_id, status from target '\
+           + 'where pre_id is not null or group_id is not null '\
+           + 'or obsid in (select pre_id from target where pre_id is not null)'
+#
+#--- statuses of observations which are not observed yet
+#
+active_status = ['unobserved', 'scheduled', 'untriggered']
+
+#------------------------------------------------------------------------------------
+#-- MonitorIndex: monitor chains and groups of the target table                   --
+#------------------------------------------------------------------------------------
+
+class MonitorIndex(object):
+    """
+    monitor chains and groups of the target table
+    input:  fetch   --- a function running a select command and returning
+                        a list of (obsid, pre_id, group_id, status)
+            ttl     --- seconds after which the index is read again
+    """
+    def __init__(self, fetch, ttl=600):
+        self.fetch    = fetch
+        self.ttl      = ttl
+        self.loaded   = 0
+        self._lock    = threading.Lock()
+        self._rlock   = threading.Lock()
+
+        self.pre_dict = {}          #--- obsid    <--> pre_id
+        self.nxt_dict = {}          #--- pre_id   <--> a list of obsids following it
+        self.grp_dict = {}          #--- group_id <--> a list of obsids in the group
+        self.sts_dict = {}          #--- obsid    <--> status
+
+    #--------------------------------------------------------------------------------
+
+    def refresh(self):
+        """
+        read the target table again and replace the index
+        input:  none
+        output: none; RuntimeError is raised if the table cannot be read
+        """
+        out = self.fetch(bulk_cmd)
+#
+#--- [[]] is the error return of get_value_from_sybase
+#
+        if len(out) > 0 and len(out[0]) == 0:
+            raise RuntimeError('Failed to read monitor/group data from target')
+
+        pre_dict = {}
+        nxt_dict = {}
+        grp_dict = {}
+        sts_dict = {}
+        for obsid, pre_id, group_id, status in out:
+            obsid = int(obsid)
+            sts_dict[obsid] = status
+
+            if pre_id is not None:
+                pre_id = int(pre_id)
+                pre_dict[obsid] = pre_id
+                nxt_dict.setdefault(pre_id, []).append(obsid)
+
+            if group_id not in [None, '']:
+                grp_dict.setdefault(str(group_id).strip(), []).append(obsid)
+
+        for o_list in nxt_dict.values():
+            o_list.sort()
+        for o_list in grp_dict.values():
+            o_list.sort()
+#
+#--- replace all at once; readers see either the old or the new index
+#
+        with self._lock:
+            self.pre_dict = pre_dict
+            self.nxt_dict = nxt_dict
+            self.grp_dict = grp_dict
+            self.sts_dict = sts_dict
+            self.loaded   = time.time()
+
+    #--------------------------------------------------------------------------------
+
+    def check(self):
+        """
+        read the target table if the index is older than ttl; only one thread reads it
+        """
+        if time.time() - self.loaded > self.ttl:
+            with self._rlock:
+                if time.time() - self.loaded > self.ttl:
+                    self.refresh()
+
+    #--------------------------------------------------------------------------------
+
+    def knows(self, obsid):
+        """
+        check whether obsid is in the index
+        input:  obsid   --- obsid
+        output: True/False
+        """
+        self.check()
+        return int(obsid) in self.sts_dict
+
+    #--------------------------------------------------------------------------------
+
+    def is_pre_id(self, obsid):
+        """
+        check whether another observation follows obsid
+        input:  obsid   --- obsid
+        output: True/False
+        """
+        self.check()
+        return int(obsid) in self.nxt_dict
+
+    #--------------------------------------------------------------------------------
+
+    def series_rev(self, obsid):
+        """
+        find obsids before obsid in the monitor chain, following pre_id
+        input:  obsid   --- obsid
+        output: a_list  --- a sorted list of obsids (in string)
+        """
+        self.check()
+        pre_dict = self.pre_dict
+        a_list   = []
+        val      = pre_dict.get(int(obsid))
+        while val is not None and str(val) not in a_list:
+            a_list.append(str(val))
+            val = pre_dict.get(val)
+
+        return sorted(a_list)
+
+    #--------------------------------------------------------------------------------
+
+    def series_fwd(self, obsid):
+        """
+        find obsids after obsid in the monitor chain; at each step the first
+        (lowest) obsid which has the previous one as pre_id is taken
+        input:  obsid   --- obsid
+        output: a_list  --- a sorted list of obsids (in string)
+        """
+        self.check()
+        nxt_dict = self.nxt_dict
+        a_list   = []
+        val      = int(obsid)
+        while val in nxt_dict:
+            val = nxt_dict[val][0]
+            if str(val) in a_list:
+                break
+            a_list.append(str(val))
+
+        return sorted(a_list)
+
+    #--------------------------------------------------------------------------------
+
+    def chain(self, obsid):
+        """
+        find the full monitor chain of obsid: obsid, all obsids before it, and
+        all obsids following it (on every branch)
+        input:  obsid   --- obsid
+        output: a sorted list of obsids (in int)
+        """
+        self.check()
+        pre_dict = self.pre_dict
+        nxt_dict = self.nxt_dict
+
+        c_set = set([int(obsid)])
+        val   = pre_dict.get(int(obsid))
+        while val is not None and val not in c_set:
+            c_set.add(val)
+            val = pre_dict.get(val)
+
+        stack = [int(obsid)]
+        while len(stack) > 0:
+            for val in nxt_dict.get(stack.pop(), []):
+                if val not in c_set:
+                    c_set.add(val)
+                    stack.append(val)
+
+        return sorted(c_set)
+
+    #--------------------------------------------------------------------------------
+
+    def group_members(self, group_id):
+        """
+        find obsids in the group
+        input:  group_id    --- group id
+        output: a sorted list of obsids (in int)
+        """
+        self.check()
+        return list(self.grp_dict.get(str(group_id).strip(), []))
+
+    #--------------------------------------------------------------------------------
+
+    def select_unobserved(self, o_list):
+        """
+        select obsids which are not observed yet (unobserved, scheduled, or untriggered)
+        input:  o_list  --- a list of obsids
+        output: u_list  --- a list of obsids in the same order and form as o_list
+        """
+        self.check()
+        sts_dict = self.sts_dict
+        u_list   = []
+        for obsid in o_list:
+            if sts_dict.get(int(obsid)) in active_status:
+                u_list.append(obsid)
+
+        return u_list
+
+    #--------------------------------------------------------------------------------
+
+    def unobserved_group_members(self, group_id):
+        """
+        find obsids in the group which are not observed yet
+        input:  group_id    --- group id
+        output: a sorted list of obsids (in int)
+        """
+        return self.select_unobserved(self.group_members(group_id))
@@ -29,6 +29,8 @@ from astropy.coordinates import Angle
 import Chandra.Time
 
 from flask  import current_app
+
+from . import revision_store as rvs
 #
 #--- directory
 #
@@ -264,6 +266,21 @@ def is_integer(val):
     else:
         return val
 
+#--------------------------------------------------------------------------
+#-- chunk_list: split a list into lists of a given size                  --
+#--------------------------------------------------------------------------
+
+def chunk_list(a_list, size):
+    """
+    split a list into lists of a given size
+    input:  a_list  --- a list
+            size    --- the maximum number of entries in each list
+    output: a list of lists; the last one can be shorter
+    """
+    size = max(int(size), 1)
+
+    return [a_list[k:k+size] for k in range(0, len(a_list), size)]
+
 #--------------------------------------------------------------------------
 #-- add_leading_zero: add leading 0 to digit                             --
 #--------------------------------------------------------------------------
@@ -459,20 +476,13 @@ def find_other_revisions(obsid, rev=0):
     input:  obsid       --- obsid
             rev         --- rev # of the current data
                             if 0, find all revisions
-    output: other_rev   --- a list of html link to the other rev
+    output: other_rev   --- a list of <obsid>.<rev#> of the other revs
     """
-    data = [each for each in os.listdir(f"{current_app.config['OCAT_DIR']}/updates/") if each.startswith(str(obsid)+".")]
     rev       = int(rev)
     other_rev = []
-    for ent in data:
-        atemp = re.split('\/', ent)
-        btemp = re.split('\.', atemp[-1])
-        crev  = int(btemp[-1])
+    for crev in rvs.list_revisions(obsid):
         if crev != rev:
-            if atemp[-1] != '':
-                other_rev.append(atemp[-1])
-
-    other_rev = sorted(other_rev)
+            other_rev.append(rvs.revision_name(obsid, crev))
 
     return other_rev
 
@@ -0,0 +1,236 @@
+#####################################################################################
+#                                                                                   #
+#   ocat_data_cache.py: caches of observation data read from the database          #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#   request cache: kept on flask.g, so that an obsid is read from the database     #
+#                  at most once during one http request.                           #
+#   shared cache:  a sqlite file under LOG_DIR shared by all worker processes,     #
+#                  with a ttl (OCAT_CACHE_TTL) and lru eviction                    #
+#                  (OCAT_CACHE_MAX_ENTRIES).                                       #
+#                                                                                   #
+#####################################################################################
+
+import os
+import copy
+import time
+import pickle
+import traceback
+import sqlite3 as sq
+from contextlib     import closing
+from flask          import current_app, g, has_app_context, has_request_context, request
+from flask_login    import current_user
+
+#------------------------------------------------------------------------------------
+#-- request_get: return a cached value of this request                            --
+#------------------------------------------------------------------------------------
+
+def request_get(name, obsid):
+    """
+    return a cached value of this request
+    input:  name    --- cache name, e.g. 'read_ocat_data'
+            obsid   --- obsid
+    output: a copy of the cached value; None if it is not cached (or there is
+            no application context)
+    """
+    if not has_app_context():
+        return None
+
+    stats = request_stats()
+    cache = g.setdefault('ocat_cache', {})
+    key   = (name, str(obsid).strip())
+
+    if key in cache:
+        stats['hit'] += 1
+#
+#--- the callers modify the returned dict; hand out a copy
+#
+        return copy.deepcopy(cache[key])
+
+    stats['miss'] += 1
+
+    return None
+
+#------------------------------------------------------------------------------------
+#-- request_set: keep a value for the rest of this request                        --
+#------------------------------------------------------------------------------------
+
+def request_set(name, obsid, value):
+    """
+    keep a value for the rest of this request
+    input:  name    --- cache name, e.g. 'read_ocat_data'
+            obsid   --- obsid
+            value   --- value to keep
+    output: none
+    """
+    if not has_app_context():
+        return
+
+    cache = g.setdefault('ocat_cache', {})
+    cache[(name, str(obsid).strip())] = copy.deepcopy(value)
+
+#------------------------------------------------------------------------------------
+#-- request_stats: return the hit/miss counters of this request                   --
+#------------------------------------------------------------------------------------
+
+def request_stats():
+    """
+    return the hit/miss counters of this request
+    input:  none
+    output: a dict of <counter name> <--> <count>
+    """
+    return g.setdefault('ocat_cache_stats', {'hit': 0, 'miss': 0, 'shared_hit': 0, 'shared_miss': 0})
+
+#------------------------------------------------------------------------------------
+#-- log_request_stats: write the hit/miss counts of this request into the log     --
+#------------------------------------------------------------------------------------
+
+def log_request_stats(exc=None):
+    """
+    write the hit/miss counts of this request into the log; registered as
+    a teardown_request function in create_app
+    input:  exc     --- exception raised during the request (not used)
+    output: none
+    """
+    stats = g.pop('ocat_cache_stats', None)
+    g.pop('ocat_cache', None)
+
+    if stats is not None:
+        line = f"Ocat data request cache: {stats['hit']} hits, {stats['miss']} misses; "
+        line = line + f"shared cache: {stats['shared_hit']} hits, {stats['shared_miss']} misses"
+        current_app.logger.info(line)
+
+#------------------------------------------------------------------------------------
+#-- shared_get: return a value from the shared cache                              --
+#------------------------------------------------------------------------------------
+
+def shared_get(obsid):
+    """
+    return a value from the shared cache
+    input:  obsid   --- obsid
+    output: the cached value; None if it is not cached, expired, or the cache
+            is disabled/bypassed
+    """
+    if not use_shared_cache():
+        return None
+
+    stats = request_stats()
+    ttl   = current_app.config.get('OCAT_CACHE_TTL', 300)
+    stime = time.time()
+    try:
+        with closing(connect_cache()) as conn:
+            with conn:
+                out = conn.execute('SELECT data, created FROM ocat_cache WHERE obsid = ?',\
+                                   (str(obsid).strip(),)).fetchone()
+                if out is not None and stime - out[1] < ttl:
+                    conn.execute('UPDATE ocat_cache SET accessed = ? WHERE obsid = ?',\
+                                 (stime, str(obsid).strip()))
+                    stats['shared_hit'] += 1
+                    return pickle.loads(out[0])
+    except Exception:
+        current_app.logger.error(traceback.format_exc())
+
+    stats['shared_miss'] += 1
+
+    return None
+
+#------------------------------------------------------------------------------------
+#-- shared_set: keep a value in the shared cache                                  --
+#------------------------------------------------------------------------------------
+
+def shared_set(obsid, value):
+    """
+    keep a value in the shared cache and drop expired and least recently used entries
+    input:  obsid   --- obsid
+            value   --- value to keep
+    output: none
+    """
+    if not has_app_context() or not current_app.config.get('OCAT_CACHE_ENABLED', False):
+        return
+
+    ttl   = current_app.config.get('OCAT_CACHE_TTL', 300)
+    limit = current_app.config.get('OCAT_CACHE_MAX_ENTRIES', 500)
+    stime = time.time()
+    try:
+        with closing(connect_cache()) as conn:
+            with conn:
+                conn.execute('INSERT OR REPLACE INTO ocat_cache (obsid, data, created, accessed) VALUES (?, ?, ?, ?)',\
+                             (str(obsid).strip(), pickle.dumps(value), stime, stime))
+                conn.execute('DELETE FROM ocat_cache WHERE created <= ?', (stime - ttl,))
+                conn.execute('DELETE FROM ocat_cache WHERE obsid IN (SELECT obsid FROM ocat_cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)', (limit,))
+    except Exception:
+        current_app.logger.error(traceback.format_exc())
+
+#------------------------------------------------------------------------------------
+#-- invalidate: remove an obsid from the shared cache                             --
+#------------------------------------------------------------------------------------
+
+def invalidate(obsid):
+    """
+    remove an obsid from the shared cache and from the request cache
+    input:  obsid   --- obsid
+    output: none
+    """
+    if not has_app_context():
+        return
+
+    cache = g.get('ocat_cache')
+    if cache is not None:
+        for key in list(cache.keys()):
+            if key[1] == str(obsid).strip():
+                del cache[key]
+
+    if not current_app.config.get('OCAT_CACHE_ENABLED', False):
+        return
+    try:
+        with closing(connect_cache()) as conn:
+            with conn:
+                conn.execute('DELETE FROM ocat_cache WHERE obsid = ?', (str(obsid).strip(),))
+    except Exception:
+        current_app.logger.error(traceback.format_exc())
+
+#------------------------------------------------------------------------------------
+#-- use_shared_cache: check whether the shared cache can be read for this request --
+#------------------------------------------------------------------------------------
+
+def use_shared_cache():
+    """
+    check whether the shared cache can be read for this request. it is skipped
+    when OCAT_CACHE_ENABLED is False, OCAT_CACHE_BYPASS is True, or an admin
+    user adds 'fresh' to the request arguments (e.g. /chkupdata/12345.001?fresh=1).
+    input:  none
+    output: True/False
+    """
+    if not has_app_context():
+        return False
+
+    if not current_app.config.get('OCAT_CACHE_ENABLED', False):
+        return False
+
+    if current_app.config.get('OCAT_CACHE_BYPASS', False):
+        return False
+
+    if has_request_context() and request.args.get('fresh') not in [None, '', '0']:
+        if current_user.is_authenticated and 'admin' in current_user.groups_string:
+            return False
+
+    return True
+
+#------------------------------------------------------------------------------------
+#-- connect_cache: open the shared cache database                                 --
+#------------------------------------------------------------------------------------
+
+def connect_cache():
+    """
+    open the shared cache database; the table is created if it does not exist
+    input:  none
+    output: conn    --- sqlite3 connection
+    """
+    cfile = os.path.join(current_app.config['LOG_DIR'], 'ocat_cache.db')
+    conn  = sq.connect(cfile, timeout=5)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('CREATE TABLE IF NOT EXISTS ocat_cache (obsid TEXT PRIMARY KEY, data BLOB, created REAL, accessed REAL)')
+    conn.execute('CREATE INDEX IF NOT EXISTS ocat_cache_accessed ON ocat_cache (accessed)')
+
+    return conn
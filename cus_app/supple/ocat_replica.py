@@ -0,0 +1,170 @@
+#####################################################################################
+#                                                                                   #
+#   ocat_replica.py: a local sqlite copy of the axafocat tables read by the app    #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#   the replica is written by sync_ocat_replica.py (nightly cron) and read by the  #
+#   read-only pages when OCAT_READ_BACKEND is 'replica'. Submissions always read  #
+#   Sybase.                                                                        #
+#                                                                                   #
+#####################################################################################
+
+import os
+import time
+import decimal
+import sqlite3 as sq
+from contextlib import closing
+from flask      import current_app, has_app_context
+
+from . import get_value_from_sybase     as gvs
+
+#------------------------------------------------------------------------------------
+#-- table_list: tables, columns and indexes kept in the replica                   --
+#------------------------------------------------------------------------------------
+
+def table_list():
+    """
+    tables, columns and indexes kept in the replica; the columns are those
+    read_ocat_data.py reads plus the keys it searches on
+    input:  none
+    output: a list of [<table>, <a list of columns>, <a list of indexed columns>]
+    """
+    from . import read_ocat_data as rod
+
+    return [
+        ['target',    ['obsid'] + rod.gen_list + rod.rem_list, ['obsid', 'pre_id', 'group_id']],
+        ['rollreq',   ['obsid', 'ordr'] + rod.roll_list,       ['obsid']],
+        ['timereq',   ['obsid', 'ordr'] + rod.time_list,       ['obsid']],
+        ['aciswin',   ['obsid'] + rod.awin_list,               ['obsid']],
+        ['acisparam', ['acisid'] + rod.acis_list,              ['acisid']],
+        ['hrcparam',  ['hrcid'] + rod.hrc_list,                ['hrcid']],
+        ['too',       ['tooid'] + rod.too_list,                ['tooid']],
+        ['phasereq',  ['obsid'] + rod.phase_list,              ['obsid']],
+        ['dither',    ['obsid'] + rod.dither_list,             ['obsid']],
+        ['sim',       ['obsid'] + rod.sim_list,                ['obsid']],
+        ['soe',       ['obsid', 'unscheduled', 'soe_roll'],    ['obsid']],
+        ['prop_info', ['ocat_propid'] + rod.prop_list,         ['ocat_propid']],
+        ['view_pi',   ['ocat_propid', 'last'],                 ['ocat_propid']],
+        ['view_coi',  ['ocat_propid', 'last'],                 ['ocat_propid']],
+        ]
+
+#------------------------------------------------------------------------------------
+#-- sync_replica: copy the axafocat tables into a new replica file                --
+#------------------------------------------------------------------------------------
+
+def sync_replica(rfile, fetch=gvs.get_value_from_sybase):
+    """
+    copy the axafocat tables into a new replica file. the new file is built
+    next to the old one and moved over it only when all tables are copied,
+    so readers never see a partial replica.
+    input:  rfile   --- replica file path
+            fetch   --- a function running a select command; default: sybase
+    output: rfile   --- updated replica
+            n_dict  --- a dict of <table> <--> <# of rows copied>
+    """
+    tfile  = rfile + '.tmp'
+    if os.path.isfile(tfile):
+        os.remove(tfile)
+
+    n_dict = {}
+    with closing(sq.connect(tfile)) as conn:
+        with conn:
+            for table, c_list, i_list in table_list():
+#
+#--- target lists 'tooid' twice; keep each column once
+#
+                c_list = list(dict.fromkeys(c_list))
+                out    = fetch('select ' + ','.join(c_list) + ' from ' + table)
+#
+#--- [[]] is the error return of get_value_from_sybase; do not replace a good replica
+#
+                if len(out) > 0 and len(out[0]) == 0:
+                    raise RuntimeError(f'Failed to read {table} from axafocat')
+
+                conn.execute(f"CREATE TABLE {table} ({', '.join(c_list)})")
+                conn.executemany(f"INSERT INTO {table} VALUES ({', '.join(['?'] * len(c_list))})",\
+                                 [[convert_value(x) for x in row] for row in out])
+                for col in i_list:
+                    conn.execute(f"CREATE INDEX {table}_{col} ON {table} ({col})")
+
+                n_dict[table] = len(out)
+
+            conn.execute('CREATE TABLE replica_info (name TEXT PRIMARY KEY, value)')
+            conn.execute("INSERT INTO replica_info VALUES ('sync_time', ?)", (time.time(),))
+
+    os.chmod(tfile, 0o644)
+    os.replace(tfile, rfile)
+
+    return n_dict
+
+#------------------------------------------------------------------------------------
+
+def convert_value(val):
+    """
+    convert a value which sqlite cannot keep
+    input:  val --- a value from the database
+    output: val --- a value sqlite can store
+    """
+    if isinstance(val, decimal.Decimal):
+        return float(val)
+
+    return val
+
+#------------------------------------------------------------------------------------
+#-- get_value_from_replica: run a select command on the replica                   --
+#------------------------------------------------------------------------------------
+
+def get_value_from_replica(cmd, rfile):
+    """
+    run a select command on the replica; same output as get_value_from_sybase
+    input:  cmd     --- select command
+            rfile   --- replica file path
+    output: a list of tuples of row values; [[]] on error
+    """
+    try:
+        with closing(sq.connect(f'file:{rfile}?mode=ro', uri=True)) as conn:
+            return conn.execute(cmd).fetchall()
+    except Exception:
+        return [[]]
+
+#------------------------------------------------------------------------------------
+#-- replica_age: return seconds since the replica was synced                      --
+#------------------------------------------------------------------------------------
+
+def replica_age(rfile):
+    """
+    return seconds since the replica was synced
+    input:  rfile   --- replica file path
+    output: age in seconds; None if the replica cannot be read
+    """
+    out = get_value_from_replica("SELECT value FROM replica_info WHERE name = 'sync_time'", rfile)
+    try:
+        return time.time() - float(out[0][0])
+    except Exception:
+        return None
+
+#------------------------------------------------------------------------------------
+#-- usable_replica: return the replica path if read-only pages may use it        --
+#------------------------------------------------------------------------------------
+
+def usable_replica():
+    """
+    return the replica path if read-only pages may use it: OCAT_READ_BACKEND is
+    'replica' and the replica is not older than OCAT_REPLICA_MAX_AGE seconds
+    input:  none
+    output: rfile   --- replica file path; None if sybase must be used
+    """
+    if not has_app_context():
+        return None
+
+    if current_app.config.get('OCAT_READ_BACKEND', 'sybase') != 'replica':
+        return None
+
+    rfile = current_app.config['OCAT_REPLICA_FILE']
+    age   = replica_age(rfile)
+    if age is None or age > current_app.config.get('OCAT_REPLICA_MAX_AGE', 93600):
+        current_app.logger.warning(f"Ocat replica {rfile} is missing or stale (age: {age}); reading Sybase")
+        return None
+
+    return rfile
@@ -15,9 +15,31 @@ import string
 import random
 import time
 import copy
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from flask              import current_app, has_app_context
 
 from . import ocat_common_functions     as ocf
 from . import get_value_from_sybase     as gvs
+from . import ocat_data_cache           as odc
+from . import ocat_replica              as orp
+from . import monitor_index             as mdx
+#
+#--- the function running the select commands; get_value_from_sybase when it is not set
+#
+_query_func = contextvars.ContextVar('ocat_query_func', default=None)
+#
+#--- the replica file which the select commands run on; None when they run on sybase
+#
+_replica_file = contextvars.ContextVar('ocat_replica_file', default=None)
+#
+#--- monitor chain/group index of this process, and [<replica file>, <index>] of the
+#--- index read from the replica; see get_monitor_index
+#
+_monitor_index = None
+_replica_index = None
+_monitor_lock  = threading.Lock()
 #
 #--- non data value list
 #
@@ -25,15 +47,76 @@ non_list = [None, 'N', 'NA','N/A', 'None', 'NONE', 'Null', 'null', 'none', '']
 na_list = []
 for k in range(0,10):
     na_list.append('NA')
+#
+#--- column lists of each table; shared by the section loaders and the batched loader
+#
+gen_list    = ['obsid', 'targid', 'seq_nbr', 'targname', 'obj_flag', 'object', 'si_mode', \
+      'photometry_flag', 'vmagnitude', 'ra', 'dec', 'est_cnt_rate', 'forder_cnt_rate',\
+      'y_det_offset', 'z_det_offset', 'raster_scan', 'dither_flag', 'approved_exposure_time', \
+      'pre_min_lead', 'pre_max_lead', 'pre_id', 'seg_max_num', 'aca_mode', \
+      'phase_constraint_flag', 'ocat_propid', 'acisid', 'hrcid', 'grating', 'instrument', \
+      'rem_exp_time', 'soe_st_sched_date', 'type', 'lts_lt_plan', 'mpcat_star_fidlight_file',\
+      'status', 'data_rights', 'tooid', 'description', 'total_fld_cnt_rate', 'extended_src',\
+      'uninterrupt', 'multitelescope', 'observatories', 'tooid', 'constr_in_remarks', \
+      'group_id', 'obs_ao_str', 'roll_flag', 'window_flag', 'spwindow_flag', \
+      'multitelescope_interval', 'pointing_constraint']
+
+rem_list    = ['remarks', 'mp_remarks']
+
+roll_list   = ['roll_constraint', 'roll_180', 'roll', 'roll_tolerance']
+
+time_list   = ['window_constraint', 'tstart', 'tstop']
+
+too_list    = ['type','start','stop','followup', 'trig', 'remarks']
+
+hrc_list    = ['hrc_zero_block','timing_mode','si_mode']
+
+acis_list   = ['exp_mode', 'ccdi0_on', 'ccdi1_on', 'ccdi2_on', 'ccdi3_on', 'ccds0_on', 'ccds1_on', \
+        'ccds2_on', 'ccds3_on', 'ccds4_on', 'ccds5_on', 'bep_pack', 'onchip_sum', \
+        'onchip_row_count', 'onchip_column_count', 'frame_time', 'subarray', 'subarray_start_row', \
+        'subarray_row_count', 'duty_cycle', 'secondary_exp_count', 'primary_exp_time',\
+        'eventfilter', 'eventfilter_lower', 'eventfilter_higher', 'most_efficient', \
+        'dropped_chip_count', 'multiple_spectral_lines', 'spectra_max_count']
+
+awin_list   = ['ordr', 'aciswin_id', 'start_row', 'start_column', 'width', 'height',\
+              'lower_threshold', 'pha_range', 'sample', 'chip', 'include_flag']
+
+phase_list  = ['phase_period', 'phase_epoch', 'phase_start', 'phase_end',\
+              'phase_start_margin', 'phase_end_margin']
+
+dither_list = ['y_amp','y_freq','y_phase','z_amp','z_freq', 'z_phase']
+
+sim_list    = ['trans_offset', 'focus_offset']
+
+prop_list   = ['prop_num', 'title', 'joint', 'ao_str']
+#
+#--- tables joined to target in the batched loader:
+#--- [section, alias, table, join condition, key column, column list]
+#--- the key column is NULL when the joined table has no row for the obsid
+#
+join_list   = [
+    ['too',    'o',  'too',       'o.tooid = t.tooid',            'tooid',       too_list],
+    ['hrc',    'h',  'hrcparam',  'h.hrcid = t.hrcid',            'hrcid',       hrc_list],
+    ['acis',   'a',  'acisparam', 'a.acisid = t.acisid',          'acisid',      acis_list],
+    ['phase',  'ph', 'phasereq',  'ph.obsid = t.obsid',           'obsid',       phase_list],
+    ['dither', 'd',  'dither',    'd.obsid = t.obsid',            'obsid',       dither_list],
+    ['sim',    's',  'sim',       's.obsid = t.obsid',            'obsid',       sim_list],
+    ['soe',    'so', 'soe',       "so.obsid = t.obsid and so.unscheduled = 'N'", 'obsid', ['soe_roll']],
+    ['prop',   'p',  'prop_info', 'p.ocat_propid = t.ocat_propid', 'ocat_propid', prop_list],
+    ['pi',     'pi', 'view_pi',   'pi.ocat_propid = t.ocat_propid','ocat_propid', ['last']],
+    ['coi',    'c',  'view_coi',  'c.ocat_propid = t.ocat_propid', 'ocat_propid', ['last']],
+    ]
 
 #--------------------------------------------------------------------------
 #-- read_ocat_data: extract parameter values for a given obsid          ---
 #--------------------------------------------------------------------------
 
-def read_ocat_data(obsid):
+def read_ocat_data(obsid, readonly=False):
     """
     extract parameter values for a given obsid
     input:  obsid   --- obsid
+            readonly--- True if the values are only displayed; such a read can
+                        come from the local replica (see ocat_replica.py)
     output: p_dict  --- a dictionary of <param name> <--> <param value>
 
     Note: there are severl parameter names  different from those in the database:
@@ -43,6 +126,102 @@ def read_ocat_data(obsid):
                 Joint Prop: 'prop_num', 'title', 'joint' will be:
                             'proposal_number', 'proposal_titile', 'proposal_joint'
                             see prop_params for others.
+
+          how the database is read is set by OCAT_READ_MODE in the configuration:
+                'batched'       --- a few joined queries (default)
+                'section'       --- each section loader runs its own queries
+                'concurrent'    --- section loaders run on up to OCAT_READ_MAX_WORKERS threads
+          an obsid is read from the database only once during one http request, and
+          a read is shared with other requests and workers for OCAT_CACHE_TTL seconds.
+          only a readonly read takes a value from the shared cache; the others (e.g.
+          approving or submitting an obsid) always read the database, as the cache
+          is not told about changes made in the database outside of this application.
+          a readonly read which is not in the caches comes from the replica when
+          OCAT_READ_BACKEND is 'replica' and the replica is fresh; it is not cached.
+    """
+    p_dict = odc.request_get('read_ocat_data', obsid)
+    if p_dict is not None:
+        return p_dict
+
+    if readonly:
+#
+#--- not kept in the request cache, so that a later read of this request which is not
+#--- readonly does not get it
+#
+        p_dict = odc.shared_get(obsid)
+        if p_dict is not None:
+            return p_dict
+
+        rfile = orp.usable_replica()
+        if rfile is not None:
+            return read_ocat_data_from_replica(obsid, rfile)
+
+    mode        = 'batched'
+    max_workers = 4
+    if has_app_context():
+        mode        = current_app.config.get('OCAT_READ_MODE', mode)
+        max_workers = current_app.config.get('OCAT_READ_MAX_WORKERS', max_workers)
+
+    if mode == 'concurrent':
+        p_dict = read_ocat_data_concurrent(obsid, max_workers)
+
+    elif mode == 'section':
+        p_dict = read_ocat_data_by_section(obsid)
+
+    else:
+        p_dict = read_ocat_data_batched(obsid)
+
+    odc.request_set('read_ocat_data', obsid, p_dict)
+    odc.shared_set(obsid, p_dict)
+
+    return p_dict
+
+#--------------------------------------------------------------------------
+#-- read_ocat_data_from_replica: extract parameter values from the replica
+#--------------------------------------------------------------------------
+
+def read_ocat_data_from_replica(obsid, rfile):
+    """
+    extract parameter values for a given obsid from the local replica
+    input:  obsid   --- obsid
+            rfile   --- replica file path
+    output: p_dict  --- a dictionary of <param name> <--> <param value>
+    """
+    token  = _query_func.set(lambda cmd: orp.get_value_from_replica(cmd, rfile))
+    rtoken = _replica_file.set(rfile)
+    try:
+        p_dict = read_ocat_data_batched(obsid)
+    finally:
+        _replica_file.reset(rtoken)
+        _query_func.reset(token)
+
+    return p_dict
+
+#--------------------------------------------------------------------------
+#-- run_query: run a select command on the current backend              ---
+#--------------------------------------------------------------------------
+
+def run_query(cmd):
+    """
+    run a select command on the current backend
+    input:  cmd     --- select command
+    output: a list of tuples of row values; [[]] on error
+    """
+    func = _query_func.get()
+    if func is None:
+        return gvs.get_value_from_sybase(cmd)
+
+    return func(cmd)
+
+#--------------------------------------------------------------------------
+#-- read_ocat_data_by_section: extract parameter values one section at a time
+#--------------------------------------------------------------------------
+
+def read_ocat_data_by_section(obsid):
+    """
+    extract parameter values for a given obsid; each section loader runs its own queries
+    input:  obsid   --- obsid
+    output: p_dict  --- a dictionary of <param name> <--> <param value>
     """
 #
 #--- extract general parameter data
@@ -117,48 +296,222 @@ def read_ocat_data(obsid):
 
     return p_dict
 
+#--------------------------------------------------------------------------
+#-- read_ocat_data_concurrent: run the section loaders on a thread pool   --
+#--------------------------------------------------------------------------
+
+def read_ocat_data_concurrent(obsid, max_workers=4):
+    """
+    extract parameter values for a given obsid, running the section loaders
+    concurrently. general_params runs first, as it gives the ids which other
+    loaders need; the results are merged in the same order as
+    read_ocat_data_by_section regardless of which loader finished first.
+    input:  obsid       --- obsid
+            max_workers --- the maximum number of loaders running at the same time
+    output: p_dict      --- a dictionary of <param name> <--> <param value>
+    """
+    p_dict = general_params(obsid)
+#
+#--- [loader, arguments] in the merging order
+#
+    l_list = [
+        [monitor_params,         (obsid, p_dict['pre_id'], p_dict['group_id'])],
+        [roll_params,            (obsid,)],
+        [time_constraint_params, (obsid,)],
+        [too_ddt_params,         (p_dict['tooid'],)],
+        [hrc_params,             (p_dict['hrcid'],)],
+        [acis_params,            (p_dict['acisid'],)],
+        [aciswin_params,         (obsid,)],
+        [phase_params,           (obsid,)],
+        [dither_params,          (obsid,)],
+        [sim_params,             (obsid,)],
+        [soe_params,             (obsid,)],
+        [ao_params,              (p_dict['ocat_propid'],)],
+        [prop_params,            (p_dict['ocat_propid'],)],
+        ]
+
+    with ThreadPoolExecutor(max_workers=max(int(max_workers), 1)) as executor:
+        f_list = []
+        for func, args in l_list:
+#
+#--- each loader runs in a copy of this context, so that it reads the same backend
+#
+            ctx = contextvars.copy_context()
+            f_list.append(executor.submit(ctx.run, func, *args))
+#
+#--- result() re-raises an exception of the loader, like the sequential version would
+#
+        for k in range(0, len(l_list)):
+            out = f_list[k].result()
+            if l_list[k][0] is ao_params:
+                if out != '':
+                    p_dict['obs_ao_str'] = out
+            else:
+                p_dict.update(out)
+
+    return p_dict
+
+#--------------------------------------------------------------------------
+#-- read_ocat_data_batched: extract parameter values with a few joined queries
+#--------------------------------------------------------------------------
+
+def read_ocat_data_batched(obsid):
+    """
+    extract parameter values for a given obsid with a few joined queries.
+    target and all one-row-per-obsid tables are read in one joined query;
+    rollreq, timereq and aciswin ranks are read in one query per table.
+    the rows are handed to the section loaders so that p_dict is same as
+    that of read_ocat_data_by_section.
+    input:  obsid   --- obsid
+    output: p_dict  --- a dictionary of <param name> <--> <param value>
+    """
+    cmd = create_joined_query(obsid)
+    out = run_query(cmd)
+#
+#--- split the joined row into per-table rows
+#
+    s_out = split_joined_row(out)
+
+    p_dict = general_params(obsid, s_out['target'])
+
+    s_dict = monitor_params(obsid, p_dict['pre_id'], p_dict['group_id'])
+    p_dict.update(s_dict)
+
+    s_dict = roll_params(obsid)
+    p_dict.update(s_dict)
+
+    s_dict = time_constraint_params(obsid)
+    p_dict.update(s_dict)
+
+    s_dict = too_ddt_params(p_dict['tooid'], s_out['too'])
+    p_dict.update(s_dict)
+
+    s_dict = hrc_params(p_dict['hrcid'], s_out['hrc'])
+    p_dict.update(s_dict)
+
+    s_dict = acis_params(p_dict['acisid'], s_out['acis'])
+    p_dict.update(s_dict)
+
+    s_dict = aciswin_params(obsid)
+    p_dict.update(s_dict)
+
+    s_dict = phase_params(obsid, s_out['phase'])
+    p_dict.update(s_dict)
+
+    s_dict = dither_params(obsid, s_out['dither'])
+    p_dict.update(s_dict)
+
+    s_dict = sim_params(obsid, s_out['sim'])
+    p_dict.update(s_dict)
+
+    s_dict = soe_params(obsid, s_out['soe'])
+    p_dict.update(s_dict)
+
+    val = ao_params(p_dict['ocat_propid'], s_out['prop'])
+    if val != '':
+        p_dict['obs_ao_str'] = val
+
+    s_dict = prop_params(p_dict['ocat_propid'], s_out['prop'], s_out['pi'], s_out['coi'])
+    p_dict.update(s_dict)
+
+    return p_dict
+
+#--------------------------------------------------------------------------
+#-- create_joined_query: create a query joining target and one-row-per-obsid tables
+#--------------------------------------------------------------------------
+
+def create_joined_query(obsid):
+    """
+    create a query joining target and one-row-per-obsid tables
+    input:  obsid   --- obsid
+    output: cmd     --- sql command
+    """
+    c_list = []
+    for col in gen_list + rem_list:
+        c_list.append('t.' + col)
+
+    joins  = ''
+    for section, alias, table, cond, key, p_list in join_list:
+        c_list.append(alias + '.' + key)
+        for col in p_list:
+            c_list.append(alias + '.' + col)
+
+        joins = joins + ' left outer join ' + table + ' ' + alias + ' on ' + cond
+
+    cmd = 'select ' + convert_list_to_line(c_list) + ' from target t' + joins
+    cmd = cmd + ' where t.obsid=' + str(obsid)
+
+    return cmd
+
+#--------------------------------------------------------------------------
+#-- split_joined_row: split the output of the joined query into per-table rows
+#--------------------------------------------------------------------------
+
+def split_joined_row(out):
+    """
+    split the output of the joined query into per-table rows. a table without
+    a matching row gets an empty list, just as a direct query would return.
+    input:  out     --- output of the joined query
+    output: s_out   --- a dictionary of <section> <--> <list of a row>
+    """
+    s_out = {}
+    if len(out) == 0 or len(out[0]) == 0:
+        s_out['target'] = out
+        for ent in join_list:
+            s_out[ent[0]] = []
+        return s_out
+
+#
+#--- view_coi can have more than one row per proposal; use the first one like prop_params
+#
+    row   = out[0]
+    pos   = len(gen_list) + len(rem_list)
+    s_out['target'] = [row[:pos]]
+
+    for section, alias, table, cond, key, p_list in join_list:
+        if row[pos] is None:
+            s_out[section] = []
+        else:
+            s_out[section] = [row[pos+1:pos+1+len(p_list)]]
+
+        pos += len(p_list) + 1
+
+    return s_out
+
 #--------------------------------------------------------------------------
 #-- general_params: extract general parameter data                       --
 #--------------------------------------------------------------------------
 
-def general_params(obsid):
+def general_params(obsid, out=None):
     """
     extract general parameter data 
     input:  obsid   --- obsid
+            out     --- already fetched target row (optional)
     output: p_dict  --- a dictionary of <param name> <--> <param value>
     """
-    p_list = ['obsid', 'targid', 'seq_nbr', 'targname', 'obj_flag', 'object', 'si_mode', \
-      'photometry_flag', 'vmagnitude', 'ra', 'dec', 'est_cnt_rate', 'forder_cnt_rate',\
-      'y_det_offset', 'z_det_offset', 'raster_scan', 'dither_flag', 'approved_exposure_time', \
-      'pre_min_lead', 'pre_max_lead', 'pre_id', 'seg_max_num', 'aca_mode', \
-      'phase_constraint_flag', 'ocat_propid', 'acisid', 'hrcid', 'grating', 'instrument', \
-      'rem_exp_time', 'soe_st_sched_date', 'type', 'lts_lt_plan', 'mpcat_star_fidlight_file',\
-      'status', 'data_rights', 'tooid', 'description', 'total_fld_cnt_rate', 'extended_src',\
-      'uninterrupt', 'multitelescope', 'observatories', 'tooid', 'constr_in_remarks', \
-      'group_id', 'obs_ao_str', 'roll_flag', 'window_flag', 'spwindow_flag', \
-      'multitelescope_interval', 'pointing_constraint']
+    p_list = gen_list
     plen   = len(p_list)
     p_dict = {}
-
-    cmd    = 'select ' + convert_list_to_line(p_list) +  ' from target where obsid=' + str(obsid)
-    out    = gvs.get_value_from_sybase(cmd)
+#
+#--- remarks and comments (mp_remarks) are read with the other columns
+#
+    if out is None:
+        cmd    = 'select ' + convert_list_to_line(p_list + rem_list)
+        cmd    = cmd +  ' from target where obsid=' + str(obsid)
+        out    = run_query(cmd)
 
     for k in range(0, plen):
         p_dict[p_list[k]] = out[0][k]
 #
 #--- read remarks
 #
-    cmd   = 'select remarks from target where obsid=' + str(obsid)
-    out   = gvs.get_value_from_sybase(cmd)
-    line  = cleanup_remarks(out)
+    line  = cleanup_remarks([[out[0][plen]]])
 
     p_dict['remarks'] = line
 #
 #--- read comments
 #
-    cmd   = 'select mp_remarks  from target where obsid=' + str(obsid)
-    out   = gvs.get_value_from_sybase(cmd)
-    line  = cleanup_remarks(out)
+    line  = cleanup_remarks([[out[0][plen+1]]])
 
     p_dict['comments'] = line
 
@@ -175,6 +528,101 @@ def monitor_params(obsid, pre_id, group_id):
             pre_id      --- pre id
             group_id    --- group id
     output: p_dict      --- a dictionary of <param name> <--> <param value>
+
+    the monitor chain and the group members are found in the monitor index;
+    if the index cannot be read, the database is searched hop by hop.
+    """
+    try:
+        m_index = get_monitor_index()
+#
+#--- an obsid with pre_id/group_id but not in the index is newer than the index
+#
+        if (pre_id not in non_list or group_id not in non_list) and not m_index.knows(obsid):
+            if time.time() - m_index.loaded > 60:
+                m_index.refresh()
+
+    except Exception as e:
+        if has_app_context():
+            current_app.logger.warning(f'Monitor index is not available ({e}); searching target by query')
+
+        return monitor_params_by_query(obsid, pre_id, group_id)
+
+    p_dict = {}
+#
+#--- setting monitor_flag is tricky; keep the order of checking
+#
+    if pre_id in non_list:
+        p_dict['monitor_flag'] = 'N'
+    else:
+        p_dict['monitor_flag'] = 'Y'
+
+    if m_index.is_pre_id(obsid):
+        p_dict['monitor_flag'] = 'Y'
+#
+#--- if group_id is not NULL, monitor_flag is N
+#
+    if not group_id in non_list:
+        p_dict['monitor_flag'] = 'N'
+        p_dict['group_obsid']  = m_index.unobserved_group_members(group_id)
+    else:
+        p_dict['group_obsid']  = []
+#
+#--- if monitoring flag is Y, find which obsids are in the monitoring list
+#
+    if p_dict['monitor_flag'] == 'Y':
+        c_list = m_index.series_rev(obsid) + m_index.series_fwd(obsid)
+        c_list = sorted(list(set(c_list)))
+        p_dict['monitor_series'] = m_index.select_unobserved(c_list)
+    else:
+        p_dict['monitor_series'] = []
+
+    return p_dict
+
+#--------------------------------------------------------------------------
+#-- get_monitor_index: return the monitor chain/group index of this process
+#--------------------------------------------------------------------------
+
+def get_monitor_index():
+    """
+    return the monitor chain/group index of this process. it is read from
+    sybase, and read again after OCAT_MONITOR_INDEX_TTL seconds. while an
+    obsid is read from the replica, the index read from the replica is used.
+    input:  none
+    output: m_index --- monitor_index.MonitorIndex
+    """
+    global _monitor_index, _replica_index
+
+    ttl = 600
+    if has_app_context():
+        ttl = current_app.config.get('OCAT_MONITOR_INDEX_TTL', ttl)
+
+    rfile = _replica_file.get()
+    with _monitor_lock:
+        if rfile is not None:
+            if _replica_index is None or _replica_index[0] != rfile:
+                fetch          = lambda cmd: orp.get_value_from_replica(cmd, rfile)
+                _replica_index = [rfile, mdx.MonitorIndex(fetch, ttl)]
+            m_index = _replica_index[1]
+        else:
+            if _monitor_index is None:
+                _monitor_index = mdx.MonitorIndex(gvs.get_value_from_sybase, ttl)
+            m_index = _monitor_index
+
+        m_index.ttl = ttl
+
+    return m_index
+
+#--------------------------------------------------------------------------
+#-- monitor_params_by_query: extract monitor flag related parameter data by query
+#--------------------------------------------------------------------------
+
+def monitor_params_by_query(obsid, pre_id, group_id):
+    """
+    extract monitor flag related parameter data, searching target hop by hop
+    input:  obsid       --- obsid
+            pre_id      --- pre id
+            group_id    --- group id
+    output: p_dict      --- a dictionary of <param name> <--> <param value>
     """
     p_dict = {}
 #
@@ -186,7 +634,7 @@ def monitor_params(obsid, pre_id, group_id):
         p_dict['monitor_flag'] = 'Y'
 
     cmd = 'select distinct pre_id from target where pre_id=' + str(obsid)
-    out = gvs.get_value_from_sybase(cmd)
+    out = run_query(cmd)
 
     if len(out) != 0 and  len(out[0]) > 0:
         p_dict['monitor_flag'] = 'Y'
@@ -196,10 +644,10 @@ def monitor_params(obsid, pre_id, group_id):
     if not group_id in non_list:
         p_dict['monitor_flag'] = 'N'
 #
-#--- group_id needs extra "" around it to work with the sybase extraction
-# 
-        cmd = 'select obsid from target where group_id ="' + str(group_id) + '"'
-        out = gvs.get_value_from_sybase(cmd)
+#--- group_id needs extra '' around it to work with the sybase extraction (and the replica)
+#
+        cmd = "select obsid from target where group_id ='" + str(group_id) + "'"
+        out = run_query(cmd)
         o_list = []
         try:
             for ent in out:
@@ -238,16 +686,81 @@ def select_unobserved(o_list):
     input:  o_list  --- a list of obsids
     output: u_list  --- a list of obsids which are not obvered yet
     """
+    s_dict = get_status_many(o_list)
+
     u_list = []
     for obsid in o_list:
-        cmd    = 'select status from target where obsid=' + str(obsid)
-        out    = gvs.get_value_from_sybase(cmd)
-        status = out[0][0]
+        try:
+            ent = s_dict[int(obsid)]
+        except:
+            continue
+#
+#--- the query of the chunk failed; read the status of this obsid alone
+#
+        if ent is None:
+            out = run_query('select status from target where obsid=' + str(int(obsid)))
+            try:
+                status = out[0][0]
+            except IndexError:
+                if has_app_context():
+                    current_app.logger.error(f'Failed to read status of obsid: {obsid}')
+                continue
+        else:
+            status = ent['status']
+
         if status in ['unobserved', 'scheduled', 'untriggered']:
             u_list.append(obsid)
 
     return u_list
 
+#--------------------------------------------------------------------------
+#-- get_status_many: find status etc of many obsids at once             ---
+#--------------------------------------------------------------------------
+
+def get_status_many(obsids, with_proposal=False, chunk_size=250):
+    """
+    find status, type, instrument, si_mode and seq_nbr of many obsids with
+    one 'in (...)' query per <chunk_size> obsids
+    input:  obsids          --- a list of obsids (int or string)
+            with_proposal   --- if True, also find targname, proposal_number,
+                                proposal_title and pi_name
+            chunk_size      --- the number of obsids in one query
+    output: s_dict          --- a dict of <obsid (int)> <--> <a dict of <param> <--> <value>>
+                                an obsid not in the database is not in s_dict; an obsid
+                                whose query failed is <obsid> <--> None
+    """
+    p_list = ['status', 'type', 'instrument', 'si_mode', 'seq_nbr']
+    c_list = ['t.obsid'] + ['t.' + col for col in p_list]
+    joins  = ''
+    if with_proposal:
+        p_list = p_list + ['targname', 'proposal_number', 'proposal_title', 'pi_name']
+        c_list = c_list + ['t.targname', 'p.prop_num', 'p.title', 'pi.last']
+        joins  = ' left outer join prop_info p on p.ocat_propid = t.ocat_propid'
+        joins  = joins + ' left outer join view_pi pi on pi.ocat_propid = t.ocat_propid'
+
+    o_list = sorted(set(int(float(obsid)) for obsid in obsids if ocf.is_neumeric(obsid)))
+
+    s_dict = {}
+    for c_obsids in ocf.chunk_list(o_list, chunk_size):
+        cmd = 'select ' + convert_list_to_line(c_list) + ' from target t' + joins
+        cmd = cmd + ' where t.obsid in (' + convert_list_to_line([str(obsid) for obsid in c_obsids]) + ')'
+        out = run_query(cmd)
+#
+#--- [[]] is the error return of get_value_from_sybase; these obsids are marked
+#--- as failed, so that the callers can tell them from those not in the database
+#
+        if len(out) > 0 and len(out[0]) == 0:
+            if has_app_context():
+                current_app.logger.error(f'Failed to read status of obsids: {c_obsids[0]} - {c_obsids[-1]}')
+            for obsid in c_obsids:
+                s_dict[obsid] = None
+            continue
+
+        for ent in out:
+            s_dict[int(ent[0])] = dict(zip(p_list, ent[1:]))
+
+    return s_dict
+
 #--------------------------------------------------------------------------
 #-- roll_params: extract roll related parameter data                    --
 #--------------------------------------------------------------------------
@@ -258,7 +771,7 @@ def roll_params(obsid):
     input:  obsid       --- obsid
     output: p_dict      --- a dictionary of <param name> <--> <param value>
     """
-    p_list = ['roll_constraint', 'roll_180', 'roll', 'roll_tolerance']
+    p_list = roll_list
     plen   = len(p_list)
 
     p_dict = {}
@@ -271,17 +784,18 @@ def roll_params(obsid):
     for k in range(0, plen):
         r_list.append(copy.deepcopy(na_list))
 #
-#--- check order 1 to 10 in order
+#--- read all ranks at once; only order 1 to 9 are used
 #
-    for k in range(1, 10):
-        cmd = 'select ' + convert_list_to_line(p_list) 
-        cmd = cmd + ' from rollreq where ordr = ' + str(k) + ' and obsid=' + str(obsid)
-        out = gvs.get_value_from_sybase(cmd)
-   
-        if len(out) > 0 and len(out[0]) > 0:
-            roll_ordr = k
+    cmd = 'select ordr,' + convert_list_to_line(p_list) 
+    cmd = cmd + ' from rollreq where obsid=' + str(obsid) + ' order by ordr'
+    out = run_query(cmd)
+
+    for ent in out:
+        k = select_rank(ent)
+        if k > 0:
+            roll_ordr = max(roll_ordr, k)
             for j in range(0, plen):
-                r_list[j][k-1] = out[0][j]
+                r_list[j][k-1] = ent[j+1]
 
     p_dict['roll_ordr'] = roll_ordr
 
@@ -303,7 +817,7 @@ def time_constraint_params(obsid):
 # 
 #--- handling of the time condstraint data are similar to those of roll order case
 #
-    p_list = ['window_constraint', 'tstart', 'tstop']
+    p_list = time_list
     plen   = len(p_list)
     p_dict = {}
 
@@ -312,15 +826,16 @@ def time_constraint_params(obsid):
     for k in range(0, plen):
         r_list.append(copy.deepcopy(na_list))
     
-    for k in range(1, 10):
-        cmd = 'select ' + convert_list_to_line(p_list) + ' from timereq where ordr =' + str(k)
-        cmd = cmd + ' and obsid=' + str(obsid)    
-        out = gvs.get_value_from_sybase(cmd)
-     
-        if len(out) > 0  and len(out[0]) > 0:
-            time_ordr = k
+    cmd = 'select ordr,' + convert_list_to_line(p_list) + ' from timereq where obsid=' + str(obsid)
+    cmd = cmd + ' order by ordr'
+    out = run_query(cmd)
+
+    for ent in out:
+        k = select_rank(ent)
+        if k > 0:
+            time_ordr = max(time_ordr, k)
             for j in range(0, plen):
-                r_list[j][k-1] = out[0][j]
+                r_list[j][k-1] = ent[j+1]
 
     p_dict['time_ordr'] = time_ordr
 
@@ -329,17 +844,38 @@ def time_constraint_params(obsid):
 
     return p_dict
 
+#--------------------------------------------------------------------------
+#-- select_rank: return the rank of a rollreq/timereq row if it is in 1 to 9
+#--------------------------------------------------------------------------
+
+def select_rank(ent):
+    """
+    return the rank of a rollreq/timereq row if it is in 1 to 9
+    input:  ent     --- a row; the first entry is ordr
+    output: k       --- rank; 0 if the row is not usable
+    """
+    try:
+        k = int(ent[0])
+    except:
+        return 0
+
+    if k < 1 or k > 9:
+        return 0
+
+    return k
+
 #--------------------------------------------------------------------------
 #-- too_ddt_params: extract TOO/DDT related parameter data              --
 #--------------------------------------------------------------------------
 
-def too_ddt_params(tooid):
+def too_ddt_params(tooid, out=None):
     """
     extract TOO/DDT related parameter data
     input:  tooid       --- too id
+            out         --- already fetched too row (optional)
     output: p_dict      --- a dictionary of <param name> <--> <param value>
     """
-    p_list = ['type','start','stop','followup']
+    p_list = too_list[:4]
     plen   = len(p_list)
     p_dict = {}
 #
@@ -352,10 +888,14 @@ def too_ddt_params(tooid):
             p_dict[name]  = 'NA'
             if name == 'too_followup':
                 p_dict[name]  = ''
-
+        out = []
+#
+#--- trig and remarks are read with the other columns
+#
     else:
-        cmd = 'select '+  convert_list_to_line(p_list) + ' from too where tooid=' + str(tooid)
-        out = gvs.get_value_from_sybase(cmd)
+        if out is None:
+            cmd = 'select '+  convert_list_to_line(too_list) + ' from too where tooid=' + str(tooid)
+            out = run_query(cmd)
 
         if len(out) > 0  and len(out[0]) > 0:
             for k in range(0, plen):
@@ -364,17 +904,19 @@ def too_ddt_params(tooid):
 #
 #--- read trig (trigger condition) 
 #
-    cmd   = 'select trig from too where tooid=' + str(tooid)
-    out   = gvs.get_value_from_sybase(cmd)
-    line  = cleanup_remarks(out)
+    try:
+        line  = cleanup_remarks([[out[0][plen]]])
+    except:
+        line  = ''
 
     p_dict['too_trig'] = line
 #
 #--- read remarks
 #
-    cmd   = 'select remarks from too where tooid=' + str(tooid)
-    out   = gvs.get_value_from_sybase(cmd)
-    line  = cleanup_remarks(out)
+    try:
+        line  = cleanup_remarks([[out[0][plen+1]]])
+    except:
+        line  = ''
 
     p_dict['too_remarks'] = line
 
@@ -384,13 +926,14 @@ def too_ddt_params(tooid):
 #-- hrc_params: extract hrc related parameter data                      --
 #--------------------------------------------------------------------------
 
-def hrc_params(hrcid):
+def hrc_params(hrcid, out=None):
     """
     extract hrc related parameter data
     input:  hrcid       --- hrc id
+            out         --- already fetched hrcparam row (optional)
     output: p_dict      --- a dictionary of <param name> <--> <param value>
     """
-    p_list = ['hrc_zero_block','timing_mode','si_mode']
+    p_list = hrc_list
     plen   = len(p_list)
     p_dict = {}
 
@@ -402,8 +945,9 @@ def hrc_params(hrcid):
 #
         p_dict['hrc_si_mode']     = 'NA'
     else:
-        cmd = 'select ' +  convert_list_to_line(p_list) + ' from hrcparam where hrcid=' + str(hrcid) 
-        out = gvs.get_value_from_sybase(cmd)
+        if out is None:
+            cmd = 'select ' +  convert_list_to_line(p_list) + ' from hrcparam where hrcid=' + str(hrcid) 
+            out = run_query(cmd)
 
         if len(out) > 0 and  len(out[0]) > 0:
             p_dict['hrc_zero_block']  = out[0][0]
@@ -416,18 +960,14 @@ def hrc_params(hrcid):
 #-- acis_params: extract acis related parameter data                    --
 #--------------------------------------------------------------------------
 
-def acis_params(acisid):
+def acis_params(acisid, out=None):
     """
     extract acis related parameter data
     input:  acisid      --- acis id
+            out         --- already fetched acisparam row (optional)
     output: p_dict      --- a dictionary of <param name> <--> <param value>
     """
-    p_list = ['exp_mode', 'ccdi0_on', 'ccdi1_on', 'ccdi2_on', 'ccdi3_on', 'ccds0_on', 'ccds1_on', \
-        'ccds2_on', 'ccds3_on', 'ccds4_on', 'ccds5_on', 'bep_pack', 'onchip_sum', \
-        'onchip_row_count', 'onchip_column_count', 'frame_time', 'subarray', 'subarray_start_row', \
-        'subarray_row_count', 'duty_cycle', 'secondary_exp_count', 'primary_exp_time',\
-        'eventfilter', 'eventfilter_lower', 'eventfilter_higher', 'most_efficient', \
-        'dropped_chip_count', 'multiple_spectral_lines', 'spectra_max_count']
+    p_list = acis_list
     plen   = len(p_list)
     p_dict = {}
 
@@ -437,9 +977,10 @@ def acis_params(acisid):
             if ent == 'primary_exp_time':
                 p_dict[ent] = 'NA'
     else:
-        cmd   = 'select ' + convert_list_to_line(p_list) 
-        cmd   = cmd  +  ' from acisparam where acisid=' + str(acisid)
-        out   = gvs.get_value_from_sybase(cmd)
+        if out is None:
+            cmd   = 'select ' + convert_list_to_line(p_list) 
+            cmd   = cmd  +  ' from acisparam where acisid=' + str(acisid)
+            out   = run_query(cmd)
 
         for k in range(0, plen):
             p_dict[p_list[k]] = out[0][k]
@@ -456,8 +997,7 @@ def aciswin_params(obsid):
     input:  obsid       --- obsid
     output: p_dict      --- a dictionary of <param name> <--> <param value>
     """
-    p_list = ['ordr', 'aciswin_id', 'start_row', 'start_column', 'width', 'height',\
-              'lower_threshold', 'pha_range', 'sample', 'chip', 'include_flag']
+    p_list = awin_list
     plen   = len(p_list)
     p_dict = {}
 #
@@ -496,7 +1036,8 @@ def aciswin_params(obsid):
 #--- check whether there is acis window data
 #
     cmd = 'select ' +  convert_list_to_line(p_list) + ' from aciswin where obsid=' + str(obsid)
-    out = gvs.get_value_from_sybase(cmd)
+    cmd = cmd + ' order by ordr'
+    out = run_query(cmd)
 #
 #--- extracted data are not ordered by rank; sorting data with rank 
 #--- (the first entry of each data list)
@@ -545,19 +1086,20 @@ def set_default_list(val):
 #-- phase_params: extract phase related parameter data                  --
 #--------------------------------------------------------------------------
 
-def phase_params(obsid):
+def phase_params(obsid, out=None):
     """
     extract phase related parameter data
     input:  obsid       --- obsid
+            out         --- already fetched phasereq row (optional)
     output: p_dict      --- a dictionary of <param name> <--> <param value>
     """
-    p_list = ['phase_period', 'phase_epoch', 'phase_start', 'phase_end',\
-              'phase_start_margin', 'phase_end_margin']
+    p_list = phase_list
     plen   = len(p_list)
     p_dict = {}
 
-    cmd = 'select ' +  convert_list_to_line(p_list) + ' from phasereq where obsid=' + str(obsid)
-    out = gvs.get_value_from_sybase(cmd)
+    if out is None:
+        cmd = 'select ' +  convert_list_to_line(p_list) + ' from phasereq where obsid=' + str(obsid)
+        out = run_query(cmd)
 
     if len(out) > 0 and len(out[0]) > 0:
         for k in range(0, plen):
@@ -572,18 +1114,20 @@ def phase_params(obsid):
 #-- dither_params: extract dither related parameter data                --
 #--------------------------------------------------------------------------
 
-def dither_params(obsid):
+def dither_params(obsid, out=None):
     """
     extract dether related parameter data
     input:  obsid       --- obsid
+            out         --- already fetched dither row (optional)
     output: p_dict      --- a dictionary of <param name> <--> <param value>
     """
-    p_list = ['y_amp','y_freq','y_phase','z_amp','z_freq', 'z_phase']
+    p_list = dither_list
     plen   = len(p_list)
     p_dict = {}
 
-    cmd    = 'select ' + convert_list_to_line(p_list) + ' from dither where obsid=' + str(obsid)
-    out    = gvs.get_value_from_sybase(cmd)
+    if out is None:
+        cmd    = 'select ' + convert_list_to_line(p_list) + ' from dither where obsid=' + str(obsid)
+        out    = run_query(cmd)
 
     if len(out) > 0 and len(out[0]) > 0:
         for k in range(0, plen):
@@ -598,18 +1142,20 @@ def dither_params(obsid):
 #-- sim_params: extract sim related parameter data                     ---
 #--------------------------------------------------------------------------
 
-def sim_params(obsid):
+def sim_params(obsid, out=None):
     """
     extract sim related parameter data
     input:  obsid       --- obsid
+            out         --- already fetched sim row (optional)
     output: p_dict      --- a dictionary of <param name> <--> <param value>
     """
-    p_list = ['trans_offset', 'focus_offset']
+    p_list = sim_list
     plen   = len(p_list)
     p_dict = {}
 
-    cmd = 'select trans_offset,focus_offset from sim where obsid=' + str(obsid)
-    out = gvs.get_value_from_sybase(cmd)
+    if out is None:
+        cmd = 'select trans_offset,focus_offset from sim where obsid=' + str(obsid)
+        out = run_query(cmd)
 
     if len(out) > 0 and len(out[0]) > 0:
         for k in range(0, plen):
@@ -624,15 +1170,17 @@ def sim_params(obsid):
 #-- soe_params: extract soe data                                         --
 #--------------------------------------------------------------------------
 
-def soe_params(obsid):
+def soe_params(obsid, out=None):
     """
     extract soe data
     input:  obsid       --- obsid
+            out         --- already fetched soe row (optional)
     output: p_dict      --- a dictionary of <param name> <--> <param value>
     """
-    cmd = 'select soe_roll from soe where obsid=' + str(obsid) 
-    cmd = cmd + " and unscheduled='N'"
-    out = gvs.get_value_from_sybase(cmd)
+    if out is None:
+        cmd = 'select soe_roll from soe where obsid=' + str(obsid) 
+        cmd = cmd + " and unscheduled='N'"
+        out = run_query(cmd)
 
     p_dict = {}
     try:
@@ -646,17 +1194,21 @@ def soe_params(obsid):
 #-- ao_params: extract current ao  data                                  --
 #--------------------------------------------------------------------------
 
-def ao_params(ocat_prpid):
+def ao_params(ocat_prpid, out=None):
     """
     extract current ao  data
     it could be ''; so just return the value and if not '', replace the value
     in p_dict['obs_ao_str']
     input:  ocat_prpid  --- proposal id
+            out         --- already fetched prop_info row of prop_list (optional)
     output: val         --- current ao status; could be ''
     """
-    cmd = 'select ao_str from prop_info where ocat_propid=' + str(ocat_prpid)
-    out = gvs.get_value_from_sybase(cmd)
-    val = out[0][0]
+    if out is None:
+        cmd = 'select ao_str from prop_info where ocat_propid=' + str(ocat_prpid)
+        out = run_query(cmd)
+        val = out[0][0]
+    else:
+        val = out[0][3]
 
     return val
 
@@ -664,18 +1216,24 @@ def ao_params(ocat_prpid):
 #-- prop_params: extract proposal related parameter data                 --
 #--------------------------------------------------------------------------
 
-def prop_params(ocat_prpid):
+def prop_params(ocat_prpid, out=None, pi_out=None, coi_out=None):
     """
     extract proposal related parameter data
     input:  ocat_prpid  --- proposal id
+            out         --- already fetched prop_info row of prop_list (optional)
+            pi_out      --- already fetched view_pi row (optional)
+            coi_out     --- already fetched view_coi row (optional)
     output: p_dict      --- a dictionary of <param name> <--> <param value>
     """
     p_dict = {}
 #
 #--- Proposal Related Data
 #
-    cmd = 'select prop_num,title,joint  from prop_info where ocat_propid=' + str(ocat_prpid)
-    out = gvs.get_value_from_sybase(cmd)
+    if out is None:
+        cmd = 'select prop_num,title,joint  from prop_info where ocat_propid=' + str(ocat_prpid)
+        out = run_query(cmd)
+    else:
+        out = [out[0][:3]]
 
     p_dict['proposal_number'] = out[0][0]
     p_dict['proposal_title']  = out[0][1]
@@ -703,12 +1261,16 @@ def prop_params(ocat_prpid):
 #
 #--- Proposer's Info
 #
-    cmd = 'select last  from view_pi where ocat_propid=' + str(ocat_prpid)
-    out = gvs.get_value_from_sybase(cmd)
+    out = pi_out
+    if out is None:
+        cmd = 'select last  from view_pi where ocat_propid=' + str(ocat_prpid)
+        out = run_query(cmd)
     p_dict['pi_name'] = out[0][0]
 
-    cmd = 'select last from view_coi where ocat_propid=' + str(ocat_prpid)
-    out = gvs.get_value_from_sybase(cmd)
+    out = coi_out
+    if out is None:
+        cmd = 'select last from view_coi where ocat_propid=' + str(ocat_prpid)
+        out = run_query(cmd)
     try:
         p_dict['observer'] = out[0][0]
 #
@@ -753,7 +1315,7 @@ def series_rev(obsid):
     a_list = []
 
     cmd = 'select pre_id from target where obsid =' + str(obsid)
-    out = gvs.get_value_from_sybase(cmd)
+    out = run_query(cmd)
     try:
         val = out[0][0]
     except:
@@ -762,7 +1324,7 @@ def series_rev(obsid):
     while not val in non_list:
         a_list.append(str(val))
         cmd = 'select pre_id from target where obsid =' + str(val)
-        out = gvs.get_value_from_sybase(cmd)
+        out = run_query(cmd)
         try:
             val = out[0][0] 
         except:
@@ -785,7 +1347,7 @@ def series_fwd(obsid):
     a_list = []
 
     cmd = 'select obsid from target where pre_id =' + str(obsid)
-    out = gvs.get_value_from_sybase(cmd)
+    out = run_query(cmd)
     try:
         val = out[0][0]
     except:
@@ -794,7 +1356,7 @@ def series_fwd(obsid):
     while not val in non_list:
         a_list.append(str(val))
         cmd = 'select obsid from target where pre_id =' + str(val)
-        out = gvs.get_value_from_sybase(cmd)
+        out = run_query(cmd)
         try:
             val = out[0][0]
         except:
@@ -805,23 +1367,22 @@ def series_fwd(obsid):
     return a_list
 
 #--------------------------------------------------------------------------
-#--------------------------------------------------------------------------
+#-- cleanup_remarks: make a remarks type text into a one line string     --
 #--------------------------------------------------------------------------
 
 def cleanup_remarks(out):
-
+    """
+    make a remarks type text into a one line string
+    input:  out     --- [[<text>]]; the text is already a decoded string
+    output: line    --- a string; '' if there is no text
+    """
     try:
-        line  = (out[0][0])
-        if type(line) == 'bytes':
-            line = line.decode('UTF-8')
-
-        line  = line.replace("bytearray(b'", '')
-        line  = line.replace('bytearray(b"', '')
-        line  = line.replace("')", "")
-        line  = line.replace('")', "")
-        line  = line.replace('\\n', ' ' )
-        line  = line.replace('\'', '\"')
-        line  = line.replace('\\"', "'")
+        line  = out[0][0]
+        if isinstance(line, (bytes, bytearray)):
+            line = line.decode('UTF-8', 'replace')
+
+        line  = line.replace('\r\n', ' ')
+        line  = line.replace('\n',   ' ')
     except:
         line  = ''
 
@@ -0,0 +1,478 @@
+#########################################################################################
+#                                                                                       #
+#   revision_store.py: locate, allocate and list <obsid>.<rev#> revision files          #
+#                                                                                       #
+#           last update: Oct 18, 2026                                                   #
+#                                                                                       #
+#   revision files are kept either flat in <ocat_dir>/updates/<obsid>.<rev#>, or,       #
+#   when UPDATES_SHARDED is set, in <ocat_dir>/updates/<obsid // 1000>/<obsid>.<rev#>.  #
+#   all readers and writers find the file through revision_path/write_path; a file     #
+#   is looked for in the other layout too, so that both can be used during migration.  #
+#                                                                                       #
+#   old revision files may be packed into <ocat_dir>/updates/archive/<yyyy-mm>.zip by   #
+#   archive_revisions.py; archive/index.db tells which zip holds <obsid>.<rev#>, and    #
+#   read_revision opens only that member.                                               #
+#                                                                                       #
+#   revision numbers are kept in the revision_counter table of updates_table.db and     #
+#   a new one is allocated in a single write transaction, so that two submissions of    #
+#   the same obsid never get the same number.                                           #
+#                                                                                       #
+#########################################################################################
+
+import os
+import re
+import zipfile
+import threading
+import sqlite3 as sq
+from contextlib import closing
+
+from flask  import current_app
+
+from . import updates_db as udb
+
+counter_cmd = 'CREATE TABLE IF NOT EXISTS revision_counter '\
+              + '(obsid INTEGER PRIMARY KEY, rev INTEGER NOT NULL)'
+#
+#--- <obsid>.<rev#> file name
+#
+name_pattern = re.compile(r'^(\d+)\.(\d{3,})$')
+#
+#--- archived revision files: <updates>/archive/<yyyy-mm>.zip and their index
+#
+archive_dir_name = 'archive'
+archive_index    = 'index.db'
+archive_cmd      = 'CREATE TABLE IF NOT EXISTS archived (obsid INTEGER NOT NULL, '\
+                   + 'rev INTEGER NOT NULL, archive TEXT NOT NULL, mtime REAL, '\
+                   + 'size INTEGER, PRIMARY KEY (obsid, rev))'
+#
+#--- opened zip files: <path> <--> [<mtime>, ZipFile]; a zip replaced by the archiver is opened again
+#
+_zip_cache = {}
+_zip_lock  = threading.Lock()
+
+#---------------------------------------------------------------------------------------
+#-- get_updates_dir: path to the updates directory                                    --
+#---------------------------------------------------------------------------------------
+
+def get_updates_dir():
+    """
+    path to the updates directory
+    input:  none
+    output: <ocat_dir>/updates
+    """
+    return os.path.join(current_app.config['OCAT_DIR'], 'updates')
+
+#---------------------------------------------------------------------------------------
+#-- split_obsidrev: separate obsid and rev # of <obsid>.<rev#>                        --
+#---------------------------------------------------------------------------------------
+
+def split_obsidrev(obsidrev):
+    """
+    separate obsid and rev # of <obsid>.<rev#>
+    input:  obsidrev    --- <obsid>.<rev#> either as a file name or as the number
+                            in the obsidrev column (12345.01 is rev 10)
+    output: [obsid, rev] in int; ValueError is raised if it is not <obsid>.<rev#>
+    """
+    mc = name_pattern.search(str(obsidrev).strip())
+    if mc:
+        return [int(mc.group(1)), int(mc.group(2))]
+
+    val   = float(obsidrev)
+    obsid = int(val)
+    return [obsid, int(round((val - obsid) * 1000))]
+
+#---------------------------------------------------------------------------------------
+#-- revision_name: <obsid>.<rev#> of obsid and rev                                    --
+#---------------------------------------------------------------------------------------
+
+def revision_name(obsid, rev):
+    """
+    <obsid>.<rev#> of obsid and rev
+    input:  obsid   --- obsid
+            rev     --- rev #
+    output: <obsid>.<rev#> with three digit (or longer) rev #
+    """
+    return str(int(obsid)) + '.' + '%03d' % int(rev)
+
+#---------------------------------------------------------------------------------------
+#-- shard_name: name of the sub directory holding the revision files of obsid         --
+#---------------------------------------------------------------------------------------
+
+def shard_name(obsid):
+    """
+    name of the sub directory holding the revision files of obsid
+    input:  obsid   --- obsid
+    output: <obsid // 1000>
+    """
+    return str(int(obsid) // 1000)
+
+#---------------------------------------------------------------------------------------
+#-- layout_paths: paths of a revision file in the flat and the sharded layouts        --
+#---------------------------------------------------------------------------------------
+
+def layout_paths(obsidrev, updates_dir=None, sharded=None):
+    """
+    paths of a revision file in the flat and the sharded layouts
+    input:  obsidrev    --- <obsid>.<rev#>
+            updates_dir --- the updates directory; if None, <ocat_dir>/updates
+            sharded     --- whether the sharded layout is used; if None, UPDATES_SHARDED
+    output: a list of paths, the one of the layout in use first. if obsidrev is not
+            <obsid>.<rev#>, only the flat path (of the name as given) is returned
+    """
+    if updates_dir is None:
+        updates_dir = get_updates_dir()
+    if sharded is None:
+        sharded = current_app.config.get('UPDATES_SHARDED', False)
+
+    try:
+        [obsid, rev] = split_obsidrev(obsidrev)
+    except ValueError:
+        return [os.path.join(updates_dir, str(obsidrev))]
+
+    name  = revision_name(obsid, rev)
+    flat  = os.path.join(updates_dir, name)
+    shard = os.path.join(updates_dir, shard_name(obsid), name)
+    if sharded:
+        return [shard, flat]
+    else:
+        return [flat, shard]
+
+#---------------------------------------------------------------------------------------
+#-- revision_path: path to read a revision file                                       --
+#---------------------------------------------------------------------------------------
+
+def revision_path(obsidrev):
+    """
+    path to read a revision file
+    input:  obsidrev    --- <obsid>.<rev#>
+    output: the path where the file exists; if it does not exist in either layout,
+            the path of the layout in use
+    """
+    p_list = layout_paths(obsidrev)
+    for path in p_list:
+        if os.path.isfile(path):
+            return path
+
+    return p_list[0]
+
+#---------------------------------------------------------------------------------------
+#-- write_path: path to write a new revision file                                     --
+#---------------------------------------------------------------------------------------
+
+def write_path(obsidrev):
+    """
+    path to write a new revision file; the sub directory is created if needed
+    input:  obsidrev    --- <obsid>.<rev#>
+    output: the path of the layout in use
+    """
+    path = layout_paths(obsidrev)[0]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    return path
+
+#---------------------------------------------------------------------------------------
+#-- file_exists: check whether the revision file exists in either layout              --
+#---------------------------------------------------------------------------------------
+
+def file_exists(obsid, rev):
+    """
+    check whether the revision file exists in either layout
+    input:  obsid   --- obsid
+            rev     --- rev #
+    output: True/False
+    """
+    for path in layout_paths(revision_name(obsid, rev)):
+        if os.path.isfile(path):
+            return True
+
+    return False
+
+#---------------------------------------------------------------------------------------
+#-- revision_exists: check whether the revision exists as a file or in an archive     --
+#---------------------------------------------------------------------------------------
+
+def revision_exists(obsid, rev):
+    """
+    check whether the revision exists as a file or in an archive
+    input:  obsid   --- obsid
+            rev     --- rev #
+    output: True/False
+    """
+    if file_exists(obsid, rev):
+        return True
+
+    return int(rev) in archived_revisions(obsid)
+
+#---------------------------------------------------------------------------------------
+#-- get_archive_dir: path to the directory of archived revision files                 --
+#---------------------------------------------------------------------------------------
+
+def get_archive_dir(updates_dir=None):
+    """
+    path to the directory of archived revision files
+    input:  updates_dir --- the updates directory; if None, <ocat_dir>/updates
+    output: <updates_dir>/archive
+    """
+    if updates_dir is None:
+        updates_dir = get_updates_dir()
+
+    return os.path.join(updates_dir, archive_dir_name)
+
+#---------------------------------------------------------------------------------------
+#-- archived_revisions: find archived revisions of obsid                              --
+#---------------------------------------------------------------------------------------
+
+def archived_revisions(obsid, updates_dir=None):
+    """
+    find archived revisions of obsid
+    input:  obsid       --- obsid
+            updates_dir --- the updates directory; if None, <ocat_dir>/updates
+    output: a dict of <rev #> <--> [<archive file name>, <mtime>]; empty if nothing
+            is archived
+    """
+    ifile = os.path.join(get_archive_dir(updates_dir), archive_index)
+    if not os.path.isfile(ifile):
+        return {}
+
+    a_dict = {}
+    try:
+        with closing(sq.connect(f'file:{ifile}?mode=ro', uri=True, timeout=30)) as conn:
+            with closing(conn.cursor()) as cur:
+                cmd = 'SELECT rev, archive, mtime FROM archived WHERE obsid = ?'
+                for rev, archive, mtime in cur.execute(cmd, (int(obsid),)).fetchall():
+                    a_dict[int(rev)] = [archive, mtime]
+    except sq.OperationalError:
+        current_app.logger.error(f'Cannot read the revision archive index {ifile}')
+
+    return a_dict
+
+#---------------------------------------------------------------------------------------
+#-- open_archive: open an archive zip, reusing an opened one                          --
+#---------------------------------------------------------------------------------------
+
+def open_archive(path):
+    """
+    open an archive zip, reusing an opened one; the member list is read from the
+    central directory only, and is kept until the zip is replaced
+    input:  path    --- path to the zip file
+    output: ZipFile
+    """
+    mtime = os.stat(path).st_mtime
+    with _zip_lock:
+        ent = _zip_cache.get(path)
+        if ent is None or ent[0] != mtime:
+            if ent is not None:
+                ent[1].close()
+            ent = [mtime, zipfile.ZipFile(path)]
+            _zip_cache[path] = ent
+
+        return ent[1]
+
+#---------------------------------------------------------------------------------------
+#-- read_archived: read an archived revision                                          --
+#---------------------------------------------------------------------------------------
+
+def read_archived(obsid, rev):
+    """
+    read an archived revision
+    input:  obsid   --- obsid
+            rev     --- rev #
+    output: the content in bytes; None if the revision is not archived
+    """
+    ent = archived_revisions(obsid).get(int(rev))
+    if ent is None:
+        return None
+
+    zfile = open_archive(os.path.join(get_archive_dir(), ent[0]))
+    with _zip_lock:
+        return zfile.read(revision_name(obsid, rev))
+
+#---------------------------------------------------------------------------------------
+#-- read_revision: read a revision file or its archived copy                          --
+#---------------------------------------------------------------------------------------
+
+def read_revision(obsidrev):
+    """
+    read a revision file or its archived copy
+    input:  obsidrev    --- <obsid>.<rev#>
+    output: data        --- a list of lines (stripped), as ocf.read_data_file;
+                            empty if the revision does not exist
+    """
+    path = revision_path(obsidrev)
+    if os.path.isfile(path):
+        try:
+            with open(path, 'rb') as f:
+                text = f.read()
+        except OSError:
+            return []
+    else:
+        try:
+            [obsid, rev] = split_obsidrev(obsidrev)
+            text = read_archived(obsid, rev)
+        except (ValueError, KeyError, OSError, zipfile.BadZipFile):
+            text = None
+        if text is None:
+            return []
+
+    return [line.strip() for line in text.decode('utf-8', errors='ignore').splitlines()]
+
+#---------------------------------------------------------------------------------------
+#-- revision_mtime: time when the revision file was written                           --
+#---------------------------------------------------------------------------------------
+
+def revision_mtime(obsidrev):
+    """
+    time when the revision file was written
+    input:  obsidrev    --- <obsid>.<rev#>
+    output: mtime in seconds from epoch; None if the revision does not exist
+    """
+    path = revision_path(obsidrev)
+    if os.path.isfile(path):
+        return os.path.getmtime(path)
+
+    try:
+        [obsid, rev] = split_obsidrev(obsidrev)
+    except ValueError:
+        return None
+
+    ent = archived_revisions(obsid).get(rev)
+    if ent is None:
+        return None
+
+    return ent[1]
+
+#---------------------------------------------------------------------------------------
+#-- find_note_flags: find the orupdate note flags of revisions from their files       --
+#---------------------------------------------------------------------------------------
+
+def find_note_flags(f_list):
+    """
+    find the orupdate note flags of revisions written before the flags were kept in
+    updates_table.db, from the revision files and <ocat_dir>/cdo_warning_list
+    input:  f_list  --- a list of [<obsidrev>, <new comment?>, <a large coordinate shift?>];
+                        only the flags given as None are looked for
+    output: a list of [<new comment?>, <a large coordinate shift?>] in the order of f_list;
+            new comment stays None if the revision is not found
+    """
+    ifile = os.path.join(current_app.config['OCAT_DIR'], 'cdo_warning_list')
+    try:
+        with open(ifile,'r') as f:
+            coord_shift = set([line.strip() for line in f.readlines()])
+    except OSError:
+        coord_shift = set()
+
+    n_list = []
+    for [obsidrev, comment, shift] in f_list:
+        try:
+            obsidrev = revision_name(*split_obsidrev(obsidrev))
+        except ValueError:
+            obsidrev = str(obsidrev)
+
+        if comment is None:
+            data = read_revision(obsidrev)
+            if len(data) > 0:
+                comment = 1 if any(['NEW COMMENTS' in line for line in data]) else 0
+
+        if shift is None:
+            shift = 1 if obsidrev in coord_shift else 0
+
+        n_list.append([comment, shift])
+
+    return n_list
+
+#---------------------------------------------------------------------------------------
+#-- find_last_rev: the largest rev # recorded in the database                         --
+#---------------------------------------------------------------------------------------
+
+def find_last_rev(cur, obsid):
+    """
+    the largest rev # recorded in the database
+    input:  cur     --- cursor of updates_table.db
+            obsid   --- obsid
+    output: rev     --- the larger of the counter and the revisions table; 0 if none
+    """
+    obsid = int(obsid)
+    rev   = 0
+    try:
+        cmd = 'SELECT rev FROM revision_counter WHERE obsid = ?'
+        out = cur.execute(cmd, (obsid,)).fetchone()
+        if out is not None:
+            rev = int(out[0])
+    except sq.OperationalError:
+        pass
+#
+#--- obsid/rev columns are added by udb.migrate_schema
+#
+    try:
+        out = cur.execute('SELECT MAX(rev) FROM revisions WHERE obsid = ?', (obsid,)).fetchone()
+        if out is not None and out[0] is not None:
+            rev = max(rev, int(out[0]))
+    except sq.OperationalError:
+        pass
+
+    return rev
+
+#---------------------------------------------------------------------------------------
+#-- skip_existing: step the rev # past data files which already exist                 --
+#---------------------------------------------------------------------------------------
+
+def skip_existing(obsid, rev):
+    """
+    step the rev # past data files which already exist; the data files are also
+    written for observations which are not listed in the revisions table
+    input:  obsid   --- obsid
+            rev     --- the last known rev #
+    output: rev     --- the last rev # whose data file exists (or the given one)
+    """
+    while revision_exists(obsid, rev + 1):
+        rev += 1
+
+    return rev
+
+#---------------------------------------------------------------------------------------
+#-- allocate_revision: allocate a new rev # of obsid                                  --
+#---------------------------------------------------------------------------------------
+
+def allocate_revision(obsid):
+    """
+    allocate a new rev # of obsid
+    input:  obsid   --- obsid
+    output: rev     --- a new rev # (int); it is recorded in revision_counter
+                        before this function returns
+    """
+    obsid = int(obsid)
+#
+#--- the transaction takes the write lock first; other allocations wait for it
+#
+    with udb.transaction() as cur:
+        cur.execute(counter_cmd)
+        rev = skip_existing(obsid, find_last_rev(cur, obsid)) + 1
+        cur.execute('INSERT OR REPLACE INTO revision_counter (obsid, rev) VALUES (?, ?)',\
+                    (obsid, rev))
+
+    return rev
+
+#---------------------------------------------------------------------------------------
+#-- list_revisions: list rev #s of obsid whose data files exist or are archived       --
+#---------------------------------------------------------------------------------------
+
+def list_revisions(obsid):
+    """
+    list rev #s of obsid whose data files exist or are archived
+    input:  obsid   --- obsid
+    output: a sorted list of rev #s (int)
+    """
+    obsid = int(obsid)
+    try:
+        with closing(udb.get_connection(readonly=True).cursor()) as cur:
+            last = find_last_rev(cur, obsid)
+    except sq.OperationalError:
+        last = 0
+
+    a_dict = archived_revisions(obsid)
+    if len(a_dict) > 0:
+        last = max(last, max(a_dict))
+
+    last = skip_existing(obsid, last)
+
+    return [rev for rev in range(1, last + 1) if rev in a_dict or file_exists(obsid, rev)]
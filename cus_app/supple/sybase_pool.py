@@ -0,0 +1,271 @@
+#####################################################################################
+#                                                                                   #
+#   sybase_pool.py: a per-process pool of persistent sybase connections            #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#   Note: the pool does not import sybpydb itself; it is handed a connect function #
+#         so that it can be exercised with fake_sybpydb without the Sybase client. #
+#                                                                                   #
+#####################################################################################
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+#------------------------------------------------------------------------------------
+#-- PooledConnection: a driver connection and the database it is currently using   --
+#------------------------------------------------------------------------------------
+
+class PooledConnection(object):
+    """
+    a driver connection and the database it is currently using
+    input:  conn    --- a DB-API connection returned by the driver
+            gen     --- the generation of the pool when it was opened (see close_all)
+    """
+    def __init__(self, conn, gen=0):
+        self.conn      = conn
+        self.database  = None
+        self.last_used = time.time()
+        self.gen       = gen
+
+    def use(self, database):
+        """
+        switch the connection to <database> only if it is not already there
+        input:  database    --- database name
+        output: none
+        """
+        if self.database == database:
+            return
+
+        cur = self.conn.cursor()
+        try:
+            cur.execute('use ' + database)
+        finally:
+            cur.close()
+
+        self.database = database
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+#------------------------------------------------------------------------------------
+#-- ConnectionPool: a thread safe pool of persistent connections                   --
+#------------------------------------------------------------------------------------
+
+class ConnectionPool(object):
+    """
+    a thread safe pool of persistent connections
+    input:  connect         --- a function returning a new DB-API connection
+            size            --- the maximum number of open connections
+            timeout         --- seconds to wait for a free connection
+            ping_interval   --- an idle connection older than this (in sec) is
+                                checked with <ping_cmd> before it is handed out
+            ping_cmd        --- a cheap statement used for health checks
+    """
+    def __init__(self, connect, size=4, timeout=30, ping_interval=60, ping_cmd='select 1'):
+        self.connect       = connect
+        self.size          = max(int(size), 1)
+        self.timeout       = timeout
+        self.ping_interval = ping_interval
+        self.ping_cmd      = ping_cmd
+        self.pid           = os.getpid()
+
+        self._idle         = []
+        self._opened       = 0
+        self._gen          = 0
+        self._cond         = threading.Condition()
+
+    #--------------------------------------------------------------------------------
+
+    def acquire(self, database):
+        """
+        hand out a connection already set to <database>
+        input:  database    --- database name
+        output: pconn       --- PooledConnection
+        """
+        deadline = time.time() + self.timeout
+        with self._cond:
+            while True:
+#
+#--- prefer an idle connection which is already using the database
+#
+                pconn = None
+                for k in range(len(self._idle) - 1, -1, -1):
+                    if self._idle[k].database == database:
+                        pconn = self._idle.pop(k)
+                        break
+
+                if pconn is None and len(self._idle) > 0:
+                    pconn = self._idle.pop()
+
+                if pconn is not None:
+                    break
+#
+#--- open a new one if there is room in the pool
+#
+                if self._opened < self.size:
+                    self._opened += 1
+                    pconn = None
+                    break
+
+                remain = deadline - time.time()
+                if remain <= 0:
+                    raise RuntimeError('sybase connection pool exhausted')
+
+                self._cond.wait(remain)
+
+        try:
+            if pconn is None:
+                pconn = PooledConnection(self.connect(), self._gen)
+
+            elif time.time() - pconn.last_used > self.ping_interval:
+                if not self.is_alive(pconn):
+                    pconn.close()
+                    pconn = PooledConnection(self.connect(), self._gen)
+
+            pconn.use(database)
+
+        except Exception:
+            if pconn is not None:
+                pconn.close()
+            self._forget()
+            raise
+
+        return pconn
+
+    #--------------------------------------------------------------------------------
+
+    def release(self, pconn):
+        """
+        put a connection back to the pool; a connection which was checked out
+        when close_all was called is closed instead
+        input:  pconn   --- PooledConnection
+        output: none
+        """
+        pconn.last_used = time.time()
+        with self._cond:
+            if pconn.gen == self._gen:
+                self._idle.append(pconn)
+                self._cond.notify()
+                return
+
+        self.discard(pconn)
+
+    #--------------------------------------------------------------------------------
+
+    def discard(self, pconn):
+        """
+        close a broken connection and free its slot in the pool
+        input:  pconn   --- PooledConnection
+        output: none
+        """
+        pconn.close()
+        self._forget()
+
+    #--------------------------------------------------------------------------------
+
+    def _forget(self):
+        with self._cond:
+            self._opened -= 1
+            self._cond.notify()
+
+    #--------------------------------------------------------------------------------
+
+    def is_alive(self, pconn):
+        """
+        check whether the connection still answers a trivial statement
+        input:  pconn   --- PooledConnection
+        output: True/False
+        """
+        try:
+            cur = pconn.conn.cursor()
+            try:
+                cur.execute(self.ping_cmd)
+                cur.fetchall()
+            finally:
+                cur.close()
+            return True
+
+        except Exception:
+            return False
+
+    #--------------------------------------------------------------------------------
+
+    @contextmanager
+    def connection(self, database):
+        """
+        context manager version of acquire/release; a connection which fails
+        and no longer answers a health check is discarded instead of returned
+        input:  database    --- database name
+        output: pconn       --- PooledConnection
+        """
+        pconn = self.acquire(database)
+        try:
+            yield pconn
+
+        except Exception:
+            if self.is_alive(pconn):
+                self.release(pconn)
+            else:
+                self.discard(pconn)
+            raise
+
+        else:
+            self.release(pconn)
+
+    #--------------------------------------------------------------------------------
+
+    def run(self, database, func):
+        """
+        run func(cursor) on a pooled connection; if the connection turns out to
+        be dead, reconnect and try once more
+        input:  database    --- database name
+                func        --- a function which takes a cursor
+        output: the output of func
+        """
+        for attempt in range(0, 2):
+            pconn = self.acquire(database)
+            try:
+                cur = pconn.conn.cursor()
+                try:
+                    out = func(cur)
+                finally:
+                    cur.close()
+
+            except Exception:
+#
+#--- a statement error leaves the connection usable; a dropped one does not
+#
+                if self.is_alive(pconn):
+                    self.release(pconn)
+                    raise
+
+                self.discard(pconn)
+                if attempt > 0:
+                    raise
+                continue
+
+            self.release(pconn)
+            return out
+
+    #--------------------------------------------------------------------------------
+
+    def close_all(self):
+        """
+        close all idle connections; the connections checked out now are closed
+        when they are released. the pool can still be used afterwards
+        """
+        with self._cond:
+            idle       = self._idle
+            self._idle = []
+            self._opened -= len(idle)
+            self._gen    += 1
+            self._cond.notify_all()
+
+        for pconn in idle:
+            pconn.close()
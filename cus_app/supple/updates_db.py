@@ -0,0 +1,449 @@
+#####################################################################################
+#                                                                                   #
+#   updates_db.py: shared access to <ocat_dir>/updates_table.db                    #
+#                                                                                   #
+#           last update: Oct 18, 2026                                               #
+#                                                                                   #
+#   each thread keeps one read-write and one read-only connection, opened with     #
+#   a busy timeout and (UPDATES_DB_WAL) in WAL journal mode, so that page reads    #
+#   do not block a signoff write. a write runs in BEGIN IMMEDIATE, which is        #
+#   retried with backoff while the database stays locked.                          #
+#                                                                                   #
+#   the revisions table is keyed by obsidrev (<obsid>.<rev#> as a number);         #
+#   migrate_schema adds integer obsid and rev columns, and <name>_epoch columns    #
+#   holding the signoff time of each <name>_date ('%m/%d/%y') in seconds from      #
+#   epoch, all kept filled by triggers, and indexes for the pages' lookups.        #
+#   new_comment and coord_shift hold the note flags of orupdate, set when the      #
+#   revision is written (NULL for older rows until backfill_note_flags.py fills    #
+#   them). the migration is run at deploy time by migrate_updates_db.py; a         #
+#   connection only checks the schema version and raises SchemaError if it is old. #
+#                                                                                   #
+#   change_stamp counts the changes of revisions (kept by triggers in db_stamp);   #
+#   with WAL the mtime of the database file does not move until a checkpoint,      #
+#   so the pages use the counter to see whether someone else wrote meanwhile.      #
+#                                                                                   #
+#####################################################################################
+
+import os
+import time
+import random
+import threading
+import sqlite3 as sq
+from datetime       import datetime, date, timedelta
+from contextlib     import closing, contextmanager
+from flask          import current_app
+#
+#--- per thread: (<path>, <readonly>) <--> [<pid>, <inode>, connection]
+#
+_local = threading.local()
+#
+#--- the schema version (PRAGMA user_version) set by migrate_schema; see migrate_updates_db.py
+#
+schema_version = 1
+#
+#--- (<path>, <inode>) of databases whose schema has been checked in this process
+#
+_checked     = set()
+_schema_lock = threading.Lock()
+#
+#--- obsid and rev # computed from obsidrev (12345.001 or '12345.001')
+#
+obsid_expr = 'CAST({0} AS INTEGER)'
+rev_expr   = 'CAST(ROUND(({0} - CAST({0} AS INTEGER)) * 1000) AS INTEGER)'
+#
+#--- signoff columns: <name>_signoff (usint_verification), <name>_date and <name>_epoch
+#
+signoff_names = ['general', 'acis', 'acis_si_mode', 'hrc_si_mode', 'usint']
+#
+#--- the original 14 columns, followed by the epoch columns (14 - 18) in the order of signoff_names
+#
+revision_columns = 'obsidrev, general_signoff, general_date, acis_signoff, acis_date, '\
+                   + 'acis_si_mode_signoff, acis_si_mode_date, hrc_si_mode_signoff, '\
+                   + 'hrc_si_mode_date, usint_verification, usint_date, sequence, submitter, '\
+                   + 'rev_time, ' + ', '.join([f'{name}_epoch' for name in signoff_names])
+
+#
+#--- an entry is open while any of its signoff columns is 'NA'; the open entries are
+#--- kept in a partial index, used by a query with the same condition
+#
+open_expr = "'NA' IN (general_signoff, acis_signoff, acis_si_mode_signoff, hrc_si_mode_signoff, usint_verification)"
+
+added_columns = ['obsid', 'rev'] + [f'{name}_epoch' for name in signoff_names]\
+              + ['new_comment', 'coord_shift']
+#
+#--- the signoff time is now; dates written before the epoch columns existed are
+#--- taken as the local midnight of the date
+#
+now_expr  = "CAST(strftime('%s', 'now') AS INTEGER)"
+date_expr = "CAST(strftime('%s', '20' || substr({0}, 7, 2) || '-' || substr({0}, 1, 2) "\
+            + "|| '-' || substr({0}, 4, 2), 'utc') AS INTEGER)"
+epoch_expr = "CASE WHEN NEW.{0}_date LIKE '__/__/__' THEN " + now_expr + ' ELSE NULL END'
+
+backfill_cmds = ['UPDATE revisions SET obsid = ' + obsid_expr.format('obsidrev')
+                 + ', rev = ' + rev_expr.format('obsidrev')
+                 + ' WHERE obsid IS NULL OR rev IS NULL']\
+              + [f'UPDATE revisions SET {name}_epoch = ' + date_expr.format(f'{name}_date')
+                 + f" WHERE {name}_epoch IS NULL AND {name}_date LIKE '__/__/__'"
+                 for name in signoff_names]
+
+schema_cmds = [
+    'CREATE INDEX IF NOT EXISTS revisions_obsidrev ON revisions (obsidrev)',
+    'CREATE INDEX IF NOT EXISTS revisions_obsid_rev ON revisions (obsid, rev)',
+    'CREATE INDEX IF NOT EXISTS revisions_rev_time ON revisions (rev_time)',
+    'CREATE INDEX IF NOT EXISTS revisions_submitter ON revisions (submitter)',
+    'CREATE INDEX IF NOT EXISTS revisions_usint_verification ON revisions (usint_verification)',
+    'CREATE INDEX IF NOT EXISTS revisions_open ON revisions (rev_time) WHERE ' + open_expr,
+    'CREATE TRIGGER IF NOT EXISTS revisions_set_obsid_rev AFTER INSERT ON revisions '
+    + 'BEGIN UPDATE revisions SET obsid = ' + obsid_expr.format('NEW.obsidrev')
+    + ', rev = ' + rev_expr.format('NEW.obsidrev') + ', '
+    + ', '.join([f'{name}_epoch = ' + epoch_expr.format(name) for name in signoff_names])
+    + ' WHERE rowid = NEW.rowid; END',
+    'CREATE TRIGGER IF NOT EXISTS revisions_update_obsid_rev AFTER UPDATE OF obsidrev ON revisions '
+    + 'BEGIN UPDATE revisions SET obsid = ' + obsid_expr.format('NEW.obsidrev')
+    + ', rev = ' + rev_expr.format('NEW.obsidrev') + ' WHERE rowid = NEW.rowid; END',
+]\
+  + [f'CREATE INDEX IF NOT EXISTS revisions_{name}_epoch ON revisions ({name}_epoch)'
+     for name in signoff_names]\
+  + [f'CREATE TRIGGER IF NOT EXISTS revisions_update_{name}_epoch AFTER UPDATE OF {name}_date '
+     + f'ON revisions WHEN NEW.{name}_date IS NOT OLD.{name}_date BEGIN UPDATE revisions SET '
+     + f'{name}_epoch = ' + epoch_expr.format(name) + ' WHERE rowid = NEW.rowid; END'
+     for name in signoff_names]\
+  + ['CREATE TABLE IF NOT EXISTS db_stamp (id INTEGER PRIMARY KEY CHECK (id = 0), '
+     + 'changes INTEGER NOT NULL, mtime INTEGER)',
+     'INSERT OR IGNORE INTO db_stamp (id, changes, mtime) VALUES (0, 0, ' + now_expr + ')']\
+  + [f'CREATE TRIGGER IF NOT EXISTS revisions_stamp_{event.lower()} AFTER {event} ON revisions '
+     + 'BEGIN UPDATE db_stamp SET changes = changes + 1, mtime = ' + now_expr + ' WHERE id = 0; END'
+     for event in ['INSERT', 'UPDATE', 'DELETE']]
+
+#------------------------------------------------------------------------------------
+#-- get_updates_db: path to updates_table.db                                      --
+#------------------------------------------------------------------------------------
+
+def get_updates_db():
+    """
+    path to updates_table.db
+    input:  none
+    output: <ocat_dir>/updates_table.db
+    """
+    return os.path.join(current_app.config['OCAT_DIR'], 'updates_table.db')
+
+#------------------------------------------------------------------------------------
+#-- open_connection: open a new connection to updates_table.db                    --
+#------------------------------------------------------------------------------------
+
+def open_connection(path, readonly=False):
+    """
+    open a new connection to updates_table.db
+    input:  path        --- path to updates_table.db
+            readonly    --- if True, open it read-only
+    output: conn        --- sqlite3 connection in autocommit mode; transactions
+                            are started explicitly by transaction()
+    """
+    timeout = current_app.config.get('UPDATES_DB_TIMEOUT', 10)
+    if readonly:
+        conn = sq.connect(f'file:{path}?mode=ro', uri=True, timeout=timeout,\
+                          isolation_level=None)
+    else:
+        conn = sq.connect(path, timeout=timeout, isolation_level=None)
+#
+#--- journal mode is kept in the database file; it is set by the first writer
+#
+        if current_app.config.get('UPDATES_DB_WAL', True):
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+
+    conn.execute(f'PRAGMA busy_timeout = {int(timeout * 1000)}')
+
+    return conn
+
+#------------------------------------------------------------------------------------
+#-- SchemaError: updates_table.db has not been migrated to schema_version         --
+#------------------------------------------------------------------------------------
+
+class SchemaError(sq.DatabaseError):
+    """
+    updates_table.db has not been migrated to schema_version; run migrate_updates_db.py.
+    it is not an OperationalError, so that the callers which go on without the database
+    when it is busy or missing do not hide it.
+    """
+    pass
+
+#------------------------------------------------------------------------------------
+#-- read_schema_version: the schema version of updates_table.db                   --
+#------------------------------------------------------------------------------------
+
+def read_schema_version(conn):
+    """
+    the schema version of updates_table.db
+    input:  conn    --- sqlite3 connection
+    output: version --- PRAGMA user_version; 0 before the first migration
+    """
+    return int(conn.execute('PRAGMA user_version').fetchone()[0])
+
+#------------------------------------------------------------------------------------
+#-- migrate_schema: add obsid/rev/epoch columns, triggers and indexes to revisions --
+#------------------------------------------------------------------------------------
+
+def migrate_schema(path):
+    """
+    add obsid/rev/epoch columns, their triggers and indexes to the revisions table,
+    fill them for existing rows and set the schema version; what already exists is
+    not changed, so this can be run again. run by migrate_updates_db.py, never by
+    the pages
+    input:  path    --- path to updates_table.db
+    output: [<version before>, <version after>]
+            updated updates_table.db; SchemaError is raised if there is no revisions table
+    """
+    with _schema_lock:
+        conn = open_connection(path)
+        try:
+            c_list = [ent[1] for ent in conn.execute('PRAGMA table_info(revisions)').fetchall()]
+            if len(c_list) == 0:
+                raise SchemaError(f'{path} has no revisions table')
+
+            retry_busy(conn.execute, 'BEGIN IMMEDIATE')
+            try:
+                version = read_schema_version(conn)
+                for col in added_columns:
+                    if col not in c_list:
+                        conn.execute(f'ALTER TABLE revisions ADD COLUMN {col} INTEGER')
+#
+#--- the insert trigger of an older schema does not fill the epoch columns
+#
+                if 'general_epoch' not in c_list:
+                    conn.execute('DROP TRIGGER IF EXISTS revisions_set_obsid_rev')
+                for cmd in backfill_cmds + schema_cmds:
+                    conn.execute(cmd)
+                conn.execute(f'PRAGMA user_version = {max(version, schema_version)}')
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.rollback()
+                raise
+        finally:
+            conn.close()
+
+    return [version, max(version, schema_version)]
+
+#------------------------------------------------------------------------------------
+#-- check_schema: make sure that updates_table.db has been migrated               --
+#------------------------------------------------------------------------------------
+
+def check_schema(path):
+    """
+    make sure that updates_table.db has been migrated to schema_version; it is
+    checked once per process and database file, and never changed here
+    input:  path    --- path to updates_table.db
+    output: none; SchemaError is raised if the schema is older than schema_version
+    """
+    try:
+        key = (path, os.stat(path).st_ino)
+    except OSError:
+        return
+
+    if key in _checked:
+        return
+
+    with closing(open_connection(path, readonly=True)) as conn:
+        version = read_schema_version(conn)
+
+    if version < schema_version:
+        line = f'{path} is at schema version {version}, but {schema_version} is needed; '\
+               + 'run migrate_updates_db.py'
+        current_app.logger.error(line)
+        raise SchemaError(line)
+
+    _checked.add(key)
+
+#------------------------------------------------------------------------------------
+#-- get_connection: the connection of this thread                                 --
+#------------------------------------------------------------------------------------
+
+def get_connection(readonly=False):
+    """
+    the connection of this thread; it is opened again after a fork or when
+    updates_table.db is replaced by another file
+    input:  readonly    --- if True, the read-only connection
+    output: conn        --- sqlite3 connection
+    """
+    path  = get_updates_db()
+    key   = (path, readonly)
+    conns = getattr(_local, 'conns', None)
+    if conns is None:
+        conns = _local.conns = {}
+
+    try:
+        inode = os.stat(path).st_ino
+    except OSError:
+        inode = None
+
+    ent = conns.get(key)
+    if ent is not None:
+        if ent[0] == os.getpid() and ent[1] == inode:
+            return ent[2]
+        if ent[0] == os.getpid():
+            ent[2].close()
+
+    if (path, inode) not in _checked:
+        check_schema(path)
+
+    conn = open_connection(path, readonly)
+    conns[key] = [os.getpid(), inode, conn]
+
+    return conn
+
+#------------------------------------------------------------------------------------
+#-- close_connections: close the connections of this thread                       --
+#------------------------------------------------------------------------------------
+
+def close_connections():
+    """
+    close the connections of this thread
+    input:  none
+    output: none
+    """
+    conns = getattr(_local, 'conns', {})
+    for pid, inode, conn in conns.values():
+        if pid == os.getpid():
+            conn.close()
+    conns.clear()
+
+#------------------------------------------------------------------------------------
+#-- is_busy: check whether the error is SQLITE_BUSY/SQLITE_LOCKED                 --
+#------------------------------------------------------------------------------------
+
+def is_busy(err):
+    """
+    check whether the error is SQLITE_BUSY/SQLITE_LOCKED
+    input:  err     --- sqlite3.OperationalError
+    output: True/False
+    """
+    text = str(err).lower()
+
+    return ('locked' in text) or ('busy' in text)
+
+#------------------------------------------------------------------------------------
+#-- retry_busy: run a function, retrying with backoff while the database is busy  --
+#------------------------------------------------------------------------------------
+
+def retry_busy(func, *args):
+    """
+    run a function, retrying with backoff while the database is busy
+    input:  func    --- function to run
+            args    --- its arguments
+    output: the return value of func; the last OperationalError is raised
+            when UPDATES_DB_RETRIES retries have failed
+    """
+    retries = current_app.config.get('UPDATES_DB_RETRIES', 5)
+    k = 0
+    while True:
+        try:
+            return func(*args)
+        except sq.OperationalError as err:
+            if not is_busy(err) or k >= retries:
+                raise
+
+            wait = 0.1 * 2**k * (1 + random.random())
+            current_app.logger.warning(f'updates_table.db is busy ({err}); retry in {wait:.2f} sec')
+            time.sleep(wait)
+            k += 1
+
+#------------------------------------------------------------------------------------
+#-- transaction: write transaction on updates_table.db                            --
+#------------------------------------------------------------------------------------
+
+@contextmanager
+def transaction():
+    """
+    write transaction on updates_table.db; committed at the end of the with
+    block, and rolled back if an exception is raised in it
+    usage:  with udb.transaction() as cur:
+                cur.execute(...)
+    output: cur     --- cursor
+    """
+    conn = get_connection()
+#
+#--- the write lock is taken first; the statements in the block do not wait for it
+#
+    retry_busy(conn.execute, 'BEGIN IMMEDIATE')
+    try:
+        with closing(conn.cursor()) as cur:
+            yield cur
+        conn.execute('COMMIT')
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+
+#------------------------------------------------------------------------------------
+#-- fetch_all: run a select command on the read-only connection                   --
+#------------------------------------------------------------------------------------
+
+def fetch_all(cmd, params=()):
+    """
+    run a select command on the read-only connection
+    input:  cmd     --- sql select command
+            params  --- parameters of the command
+    output: a list of rows
+    """
+    def run_select():
+        with closing(get_connection(readonly=True).cursor()) as cur:
+            return cur.execute(cmd, params).fetchall()
+
+    return retry_busy(run_select)
+
+#------------------------------------------------------------------------------------
+#-- change_stamp: the number of changes of revisions and the time of the last one --
+#------------------------------------------------------------------------------------
+
+def change_stamp():
+    """
+    the number of changes of revisions and the time of the last one; unlike the
+    mtime of updates_table.db, it moves with every commit, also in WAL mode
+    input:  none
+    output: [<changes>, <the last change time in seconds from epoch>]; if db_stamp
+            is not there (the schema could not be updated), both are the later
+            mtime of updates_table.db and its -wal file
+    """
+    try:
+        out = fetch_all('SELECT changes, mtime FROM db_stamp WHERE id = 0')
+        if len(out) > 0:
+            return [out[0][0], out[0][1]]
+    except sq.OperationalError:
+        pass
+
+    path  = get_updates_db()
+    mtime = 0
+    for ifile in [path, path + '-wal']:
+        try:
+            mtime = max(mtime, int(os.stat(ifile).st_mtime))
+        except OSError:
+            pass
+
+    return [mtime, mtime]
+
+#------------------------------------------------------------------------------------
+#-- today_string: today's date in the form of the signoff date columns            --
+#------------------------------------------------------------------------------------
+
+def today_string():
+    """
+    today's date in the form of the signoff date columns
+    input:  none
+    output: <mm>/<dd>/<yy> (local time)
+    """
+    return datetime.now().strftime('%m/%d/%y')
+
+#------------------------------------------------------------------------------------
+#-- recent_cutoff: start of the period of recent signoffs                         --
+#------------------------------------------------------------------------------------
+
+def recent_cutoff(days=2):
+    """
+    start of the period of recent signoffs; a signoff is recent if it was
+    made today or on the previous days - 1 days (local time)
+    input:  days    --- the number of days
+    output: the local midnight of the first day in seconds from epoch
+    """
+    start = date.today() - timedelta(days=days - 1)
+
+    return int(datetime.combine(start, datetime.min.time()).timestamp())
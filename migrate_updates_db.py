@@ -0,0 +1,79 @@
+#!/proj/sot/ska3/flight/bin/python
+
+"""
+**migrate_updates_db.py**: Migrate <ocat_dir>/updates_table.db to the schema the application needs
+
+Adds the integer obsid/rev columns, the <name>_epoch signoff time columns and the
+new_comment/coord_shift note flag columns to the revisions table, fills them for the
+existing rows, creates their triggers and indexes and the db_stamp change counter, and
+sets the schema version (PRAGMA user_version). Run it at deploy time, before the
+application is started; the application only checks the version and refuses to use an
+older database. It can be run again: what already exists is not changed.
+
+Run backfill_note_flags.py afterwards to fill the note flags of the older rows.
+
+:Last Updated: Oct 18, 2026
+
+"""
+
+import argparse
+from contextlib import closing
+
+from flask import Flask
+
+from config import _CONFIG_DICT
+from cus_app.supple import updates_db as udb
+
+
+def main(check=False):
+    """Migrate updates_table.db, or only report its schema version."""
+    path = udb.get_updates_db()
+    if check:
+        with closing(udb.open_connection(path, readonly=True)) as conn:
+            version = udb.read_schema_version(conn)
+        print(f"{path}: schema version {version} (needed: {udb.schema_version})")
+        return version >= udb.schema_version
+
+    [before, after] = udb.migrate_schema(path)
+    if before == after:
+        print(f"{path}: schema version {after}; checked")
+    else:
+        print(f"{path}: migrated from schema version {before} to {after}")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-m",
+        "--mode",
+        choices=["flight", "test"],
+        required=True,
+        help="Determine running mode.",
+    )
+    parser.add_argument(
+        "-d",
+        "--dir",
+        required=False,
+        help="Determine path to the ocat directory holding updates_table.db.",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only report the schema version; exit with 1 if it is older than needed.",
+    )
+    args = parser.parse_args()
+    #
+    # --- Determine if running in test mode and change pathing if so
+    #
+    app = Flask(__name__)
+    if args.mode == "test":
+        app.config.from_object(_CONFIG_DICT["cxctest"])
+        if args.dir:
+            app.config["OCAT_DIR"] = args.dir
+    else:
+        app.config.from_object(_CONFIG_DICT["cxcweb"])
+
+    with app.app_context():
+        ok = main(check=args.check)
+    raise SystemExit(0 if ok else 1)
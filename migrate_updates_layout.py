@@ -0,0 +1,154 @@
+#!/proj/sot/ska3/flight/bin/python
+
+"""
+**migrate_updates_layout.py**: Move the <obsid>.<rev#> revision files between the flat and the sharded layouts
+
+Flat:    <ocat_dir>/updates/<obsid>.<rev#>
+Sharded: <ocat_dir>/updates/<obsid // 1000>/<obsid>.<rev#>
+
+The application looks for a revision file in both layouts, so this can be run while
+the application is live, before or after UPDATES_SHARDED is changed in config.py.
+Each file is hard linked into its new place before the old name is removed; a file
+written by the application during the run is moved by running this again.
+
+:Last Updated: Oct 18, 2026
+
+"""
+
+import os
+import shutil
+import filecmp
+import argparse
+
+from cus_app.supple import revision_store as rvs
+
+OCAT_DIR = "/data/mta4/CUS/www/Usint/ocat"
+
+
+def find_revision_files(updates_dir, sharded):
+    """
+    List the revision files in one layout.
+    input:  updates_dir --- the updates directory
+            sharded     --- True: list <obsid // 1000>/<obsid>.<rev#>, False: list <obsid>.<rev#>
+    output: a list of [<path>, <obsid>.<rev#>]
+    """
+    f_list = []
+    with os.scandir(updates_dir) as it:
+        for ent in it:
+            if sharded and ent.is_dir(follow_symlinks=False) and ent.name.isdigit():
+                with os.scandir(ent.path) as sit:
+                    for sent in sit:
+                        if sent.is_file(follow_symlinks=False) and rvs.name_pattern.search(sent.name):
+                            f_list.append([sent.path, sent.name])
+
+            elif not sharded and ent.is_file(follow_symlinks=False) and rvs.name_pattern.search(ent.name):
+                f_list.append([ent.path, ent.name])
+
+    return f_list
+
+
+def move_file(src, dst, symlink=False):
+    """
+    Move one revision file without a moment where it exists in neither place.
+    input:  src     --- current path
+            dst     --- new path
+            symlink --- leave a symbolic link to dst at src
+    output: "moved", "same" (dst already held the same file), or "conflict"
+    """
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    if os.path.exists(dst) and not os.path.islink(dst):
+        if not filecmp.cmp(src, dst, shallow=False):
+            return "conflict"
+        status = "same"
+    else:
+        #
+        # --- A link left by an earlier run with --symlink is replaced in one step
+        #
+        tmp = dst + ".tmp"
+        try:
+            os.link(src, tmp)
+        except OSError:
+            shutil.copy2(src, tmp)
+        os.replace(tmp, dst)
+        status = "moved"
+
+    if symlink:
+        tmp = src + ".lnk"
+        os.symlink(os.path.relpath(dst, os.path.dirname(src)), tmp)
+        os.replace(tmp, src)
+    else:
+        os.unlink(src)
+
+    return status
+
+
+def main(updates_dir, to_sharded, dry_run=False, symlink=False):
+    """Move all revision files of the other layout into the requested one."""
+    f_list = find_revision_files(updates_dir, not to_sharded)
+    count = {"moved": 0, "same": 0, "conflict": 0}
+    for src, name in f_list:
+        dst = rvs.layout_paths(name, updates_dir=updates_dir, sharded=to_sharded)[0]
+        if dry_run:
+            print(f"{src} -> {dst}")
+            continue
+
+        status = move_file(src, dst, symlink=symlink)
+        count[status] += 1
+        if status == "conflict":
+            print(f"Skipped {src}: {dst} exists with different content")
+
+    if dry_run:
+        print(f"{len(f_list)} files would be moved")
+    else:
+        print(
+            f"Moved {count['moved']} files, removed {count['same']} duplicates, "
+            f"skipped {count['conflict']} conflicts"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-m",
+        "--mode",
+        choices=["flight", "test"],
+        required=True,
+        help="Determine running mode.",
+    )
+    parser.add_argument(
+        "-d",
+        "--dir",
+        required=False,
+        help="Determine path to the ocat directory holding updates/.",
+    )
+    parser.add_argument(
+        "--flat",
+        action="store_true",
+        help="Move files back from the sharded to the flat layout.",
+    )
+    parser.add_argument(
+        "--symlink",
+        action="store_true",
+        help="Leave a symbolic link at the old path of each moved file.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only list the files which would be moved.",
+    )
+    args = parser.parse_args()
+    #
+    # --- Determine if running in test mode and change pathing if so
+    #
+    if args.mode == "test":
+        if args.dir:
+            OCAT_DIR = args.dir
+        else:
+            OCAT_DIR = "/proj/web-cxc/cgi-gen/mta/Obscat/ocat"
+
+    main(
+        os.path.join(OCAT_DIR, "updates"),
+        not args.flat,
+        dry_run=args.dry_run,
+        symlink=args.symlink,
+    )
@@ -36,16 +36,38 @@ else:
 changed_in_test = set_test - set_live
 recent_live_revisions = set_live - set_test
 
+
+def revision_paths(base_dir, obsidrev):
+    """
+    Paths of a revision file in the flat (updates/<obsid>.<rev>) and the
+    sharded (updates/<obsid // 1000>/<obsid>.<rev>) layouts.
+    """
+    obsid = int(float(obsidrev))
+    rev = int(round((float(obsidrev) - obsid) * 1000))
+    name = f"{obsid}.{rev:03}"
+    return [f"{base_dir}/updates/{name}", f"{base_dir}/updates/{obsid // 1000}/{name}"]
+
+
 #
 # --- Remove individual parameter revision files located only in the test database
 #
 for entry in changed_in_test:
-    os.system(f"rm -rf {COPY_DIR}/updates/{entry[0]}")
+    for path in revision_paths(COPY_DIR, entry[0]):
+        os.system(f"rm -rf {path}")
 #
-# --- Copy over new individual parameter revision files
+# --- Copy over new individual parameter revision files, keeping the layout of the live file
 #
 for entry in recent_live_revisions:
-    os.system(f"cp -f --preserve=all {OCAT_DIR}/updates/{entry[0]} {COPY_DIR}/updates/")
+    for src, dst in zip(revision_paths(OCAT_DIR, entry[0]), revision_paths(COPY_DIR, entry[0])):
+        if os.path.isfile(src):
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            os.system(f"cp -f --preserve=all {src} {dst}")
+            break
+#
+# --- Copy the archived revision files and their index
+#
+if os.path.isdir(f"{OCAT_DIR}/updates/archive"):
+    os.system(f"cp -rf --preserve=all {OCAT_DIR}/updates/archive {COPY_DIR}/updates/")
 #
 # --- Copy the real database, approved list, TOO Schedule
 #
@@ -11,7 +11,6 @@ import sys
 sys.path.append("/data/mta4/Script/Python3.11/lib/python3.11/site-packages")
 import os
 from dotenv import dotenv_values
-import glob
 from datetime import datetime
 import sqlite3 as sq
 from contextlib import closing
@@ -122,6 +121,41 @@ def send_mail(subject, text, address_dict):
         print(message)
 
 
+# --------------------------------------------------------------------------------------
+# -- list_revision_files: list revision files in the flat and the sharded layouts    --
+# --------------------------------------------------------------------------------------
+def list_revision_files(updates_dir):
+    """
+    list revision files in the flat and the sharded layouts
+    input:  updates_dir --- OCAT_DIR/updates; files are either <obsid>.<rev> or
+                            <obsid // 1000>/<obsid>.<rev>
+    output: a list of (<file name>, <mtime>); symbolic links are not listed.
+            revision files moved into updates/archive/ by archive_revisions.py
+            are listed from updates/archive/index.db
+    """
+    f_list = []
+    ifile = f"{updates_dir}/archive/index.db"
+    if os.path.isfile(ifile):
+        with closing(sq.connect(f"file:{ifile}?mode=ro", uri=True)) as conn:
+            with closing(conn.cursor()) as cur:
+                for obsid, rev, mtime in cur.execute(
+                    "SELECT obsid, rev, mtime FROM archived"
+                ).fetchall():
+                    f_list.append((f"{obsid}.{rev:03}", mtime))
+    with os.scandir(updates_dir) as it:
+        for ent in it:
+            if ent.is_file(follow_symlinks=False):
+                f_list.append((ent.name, ent.stat(follow_symlinks=False).st_mtime))
+            elif ent.is_dir(follow_symlinks=False) and ent.name.isdigit():
+                with os.scandir(ent.path) as sit:
+                    for sent in sit:
+                        if sent.is_file(follow_symlinks=False):
+                            f_list.append(
+                                (sent.name, sent.stat(follow_symlinks=False).st_mtime)
+                            )
+    return f_list
+
+
 # --------------------------------------------------------------------------------------
 # -- check_mismatch: check for discrepancy between revision files and updates_table.db--
 # --------------------------------------------------------------------------------------
@@ -135,9 +169,9 @@ def check_mismatch():
     #
     # --- Work only with checking revision files in proper format
     #
-    rev_list = glob.glob(f"{OCAT_DIR}/updates/*")
-    rev_list.sort(key=os.path.getmtime)
-    rev_list = [os.path.basename(x) for x in rev_list if os.path.getmtime(x) > cutoff]
+    rev_list = [
+        name for name, mtime in list_revision_files(f"{OCAT_DIR}/updates") if mtime > cutoff
+    ]
     rev_set = set()
     for x in rev_list:
         #
@@ -46,6 +46,13 @@ sys.path.append(mta_dir)
 
 import convertTimeFormat as tcnv
 #
+#--- monitor chain index shared with the flask app (cus_app/supple/monitor_index.py)
+#
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '../../cus_app/supple'))
+
+import monitor_index
+m_index = None
+#
 #--- sybase module
 #
 
@@ -172,101 +179,32 @@ def find_monitor_obs(obsid):
 
     """
     for a given obsid, check all other obsid on the same monitor list. return monitor_list.
+    the chains are read once into monitor_index and kept for the rest of the run.
 
     """
-    database = 'axafocat'
+    global m_index
 
-#    db_user = 'browser'
-#    server  = 'ocatsqlsrv'
-#
-#    line      = pass_dir + '.targpass'
-#    f         = open(line, 'r')
-#    db_passwd = f.readline().strip()
-#    f.close()
-#    database  = 'axafocat'
-#
-#    db = DBI(dbi='sybase', server=server, user=db_user, passwd=db_passwd, database=database)
+    if m_index is None:
+        database = 'axafocat'
+        db_user  = 'mtaops_internal_web'
+        server   = 'ocatsqlsrv'
 
-    db_user = 'mtaops_internal_web'
-    server  = 'ocatsqlsrv'
+        line      = pass_dir + '.targpass_internal'
+        f         = open(line, 'r')
+        db_passwd = f.readline().strip()
+        f.close()
 
-    line      = pass_dir + '.targpass_internal'
-    f         = open(line, 'r')
-    db_passwd = f.readline().strip()
-    f.close()
-
-    db = DBI(dbi='sybase', server=server, user=db_user, passwd=db_passwd, database=database)
-
-    #outdata = db.fetchone(cmd)
+        db = DBI(dbi='sybase', server=server, user=db_user, passwd=db_passwd, database=database)
 
-    monitor_list = [obsid]
-    series_rev(obsid, db, monitor_list)
-    series_fwd(obsid, db, monitor_list)
+        def fetch(cmd):
+            return [(row['obsid'], row['pre_id'], row['group_id'], row['status']) for row in db.fetch(cmd)]
 
-    monitor_list = removeDuplicate(monitor_list, sorted="Yes")
+        m_index = monitor_index.MonitorIndex(fetch)
 
+    monitor_list = m_index.chain(obsid)
 
     return monitor_list
     
-#----------------------------------------------------------------------------------------------------------------
-#---  series_rev: extract a series of pre-id for a given obsid                                                ---
-#----------------------------------------------------------------------------------------------------------------
-
-def series_rev(obsid, db, monitor):
-
-    """
-    for given obsid, database, and monitor list, exract series of pre-id realated to obsid. return monitor_list
-    this one checks obsid in decreasing manner.
-
-    """
-    chk = 0
-    cmd =  'select obsid from target where pre_id=' + str(obsid)
-    try:
-        for row in db.fetch(cmd):
-            obs = row['obsid']
-            if obs == '':
-                chk = 1
-            else:
-                if str(obs).isdigit():
-                    monitor.append(obs)
-                    if chk == 0:
-                        series_rev(obs, db, monitor)
-                else:
-                    break
-    except:
-        pass
-
-#----------------------------------------------------------------------------------------------------------------
-#--- series_fwd: extract a series of pre-id for a given obsid. this one look forward.                         ---
-#----------------------------------------------------------------------------------------------------------------
-
-def series_fwd(obsid, db, monitor):
-
-    """
-    for given obsid, database, and monitor list, exract series of pre-id realated to obsid. return monitor_list
-    this one checks obsid in increase manner.
-    
-    """
-
-    monitor = []
-    chk = 0
-    cmd =  'select pre_id from target where obsid=' + str(obsid)
-    try:
-        for row in db.fetch(cmd):
-            obs = row['pre_id']
-            if obs == '':
-                chk = 1
-            else:
-                if str(obs).isdigit():
-                    monitor.append(obs)
-                    if chk == 0:
-                        series_fwd(obs, db, monitor)
-                else:
-                    break
-
-    except:
-        pass
-
 #---------------------------------------------------------------------------------------------
 #--- removeDuplicate: remove duplicated entries from a list                                ---
 #---------------------------------------------------------------------------------------------
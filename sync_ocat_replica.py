@@ -0,0 +1,58 @@
+#!/proj/sot/ska3/flight/bin/python
+
+"""
+**sync_ocat_replica.py**: Copy the axafocat tables read by the application into a local SQLite replica
+
+The replica is used by the read-only pages when OCAT_READ_BACKEND is "replica".
+Run nightly from cron, in the same Sybase environment as the application.
+
+:Last Updated: Oct 18, 2026
+
+"""
+
+import os
+import time
+import argparse
+
+from cus_app.supple import ocat_replica as orp
+
+OFILE = "/data/mta4/CUS/Data/Ocat/ocat_replica.db"
+
+
+def main():
+    """Build a new replica and move it over the current one."""
+    os.makedirs(os.path.dirname(OFILE), exist_ok=True)
+    stime = time.time()
+    n_dict = orp.sync_replica(OFILE)
+    for table, nrow in n_dict.items():
+        print(f"{table}: {nrow} rows")
+    print(f"Wrote {OFILE} in {time.time() - stime:.1f} sec")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-m",
+        "--mode",
+        choices=["flight", "test"],
+        required=True,
+        help="Determine running mode.",
+    )
+    parser.add_argument(
+        "-f",
+        "--file",
+        required=False,
+        help="Determine path to the replica file.",
+    )
+    args = parser.parse_args()
+    #
+    # --- Determine if running in test mode and change pathing if so
+    #
+    if args.mode == "test":
+        if args.file:
+            OFILE = args.file
+        else:
+            OFILE = f"{os.getcwd()}/ocat_replica.db"
+        main()
+    else:
+        main()
@@ -0,0 +1,138 @@
+#!/proj/sot/ska3/flight/bin/python
+
+"""
+**bench_refresh_session.py**: Measure the per-request overhead of the session hook
+
+Prints the time which the before-request hooks take per request, and the time of a
+whole test-client request, for a static file and for the top page, with:
+
+    * before --- the six per-blueprint hooks which were replaced by models.refresh_session;
+                 each marked the session modified with a Chandra.Time.DateTime stamp,
+                 static files included
+    * after  --- models.refresh_session, registered once in create_app
+
+The user database is a temporary sqlite file holding one user, logged in through
+REMOTE_USER. It is not a test; pytest does not collect it. Run it from the top
+directory:
+
+    python tests/bench_refresh_session.py [-n <# of requests>]
+
+:Last Updated: Oct 18, 2026
+
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import Chandra.Time
+from flask import session
+from flask_login import current_user
+
+#
+# --- Path Settings, as in usint
+#
+_TOP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _TOP_DIR)
+sys.path.insert(1, f"{_TOP_DIR}/cus_app")
+
+from config import _CONFIG_DICT, LocalHostConfig
+from cus_app import create_app, db
+from cus_app import models
+
+URLS = ["/static/ocat_style.css", "/"]
+
+
+def old_session_hook():
+    """The hook each of the six blueprints registered with before_app_request."""
+    if current_user.is_authenticated:
+        session["session_start"] = int(Chandra.Time.DateTime().secs)
+        session.permanent = True
+        session.modified = True
+    else:
+        models.register_user()
+
+
+def make_app(tmp_dir, old_hooks=False):
+    """Create the app on a temporary user database; with old_hooks, use the six old hooks."""
+
+    class BenchConfig(LocalHostConfig):
+        SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(tmp_dir, "app.db")
+        LOG_DIR = tmp_dir
+
+    _CONFIG_DICT["bench"] = BenchConfig
+    app = create_app("bench")
+    app.logger.disabled = True
+    if old_hooks:
+        app.before_request_funcs[None].remove(models.refresh_session)
+        app.before_request_funcs[None].extend([old_session_hook] * 6)
+
+    with app.app_context():
+        db.create_all()
+        if models.User.query.filter_by(username="benchuser").first() is None:
+            db.session.add(models.User(username="benchuser", email="bench@local", groups_string="bench"))
+            db.session.commit()
+
+    return app
+
+
+def hook_time(app, nreq):
+    """Return the time (usec) which the before-request hooks take per request of each url."""
+    out = {}
+    for url in URLS:
+        with app.test_request_context(url):
+            #
+            # --- The first call logs the user in
+            #
+            app.preprocess_request()
+            start = time.perf_counter()
+            for k in range(nreq):
+                app.preprocess_request()
+            out[url] = (time.perf_counter() - start) / nreq * 1e6
+
+    return out
+
+
+def request_time(app, nreq):
+    """Return the time per request (usec) of each url."""
+    client = app.test_client()
+    #
+    # --- The first request logs the user in
+    #
+    client.get(URLS[0])
+    client.get(URLS[1])
+    out = {}
+    for url in URLS:
+        start = time.perf_counter()
+        for k in range(nreq):
+            client.get(url)
+        out[url] = (time.perf_counter() - start) / nreq * 1e6
+
+    return out
+
+
+def main(nreq):
+    os.environ["REMOTE_USER"] = "benchuser"
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        apps = [make_app(tmp_dir, old_hooks=True), make_app(tmp_dir)]
+        for title, func in [("session hooks", hook_time), ("whole request", request_time)]:
+            before, after = [func(app, nreq) for app in apps]
+            print(f"{title}: usec per request ({nreq} requests each)")
+            print(f"    {'url':30s}{'before':>12s}{'after':>12s}")
+            for url in URLS:
+                print(f"    {url:30s}{before[url]:12.1f}{after[url]:12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-n",
+        "--nreq",
+        type=int,
+        default=500,
+        help="Number of requests to each url.",
+    )
+    args = parser.parse_args()
+    main(args.nreq)
@@ -0,0 +1,78 @@
+"""
+Shared fixtures: a Flask application reading the synthetic observations of
+cus_app/supple/fake_sybpydb.py (SYBASE_DRIVER = 'fake') instead of Sybase, and
+one with a temporary OCAT_DIR holding an updates_table.db of the original schema.
+
+:Last Updated: Oct 18, 2026
+
+"""
+
+import os
+import sqlite3
+
+import pytest
+from flask import Flask
+
+from cus_app.supple import get_value_from_sybase as gvs
+from cus_app.supple import fake_sybpydb as fsd
+from cus_app.supple import read_ocat_data as rod
+from cus_app.supple import updates_db as udb
+
+
+@pytest.fixture(scope="session")
+def fake_app(tmp_path_factory):
+    """Application on a fake Sybase database, seeded once for the session."""
+    dbfile = str(tmp_path_factory.mktemp("fake_sybase") / "fake_ocat.db")
+    app = Flask(__name__)
+    app.config.update(
+        TESTING=True,
+        SYBASE_DRIVER="fake",
+        FAKE_SYBASE_FILE=dbfile,
+        FAKE_SYBASE_LATENCY=0.0,
+        OCAT_CACHE_ENABLED=False,
+        OCAT_READ_BACKEND="sybase",
+    )
+    gvs.init_app(app)
+    #
+    # --- Pooled connections and the monitor index of an earlier driver are not reused
+    #
+    gvs.configure_pool()
+    rod._monitor_index = None
+    rod._replica_index = None
+    fsd.reset()
+    yield app
+    gvs.configure_pool()
+    rod._monitor_index = None
+    rod._replica_index = None
+
+
+@pytest.fixture(scope="session")
+def fake_obsids(fake_app):
+    """All obsids of the fake database, in order."""
+    with sqlite3.connect(fake_app.config["FAKE_SYBASE_FILE"]) as conn:
+        return [ent[0] for ent in conn.execute("SELECT obsid FROM target ORDER BY obsid")]
+
+
+#
+# --- The revisions table as it was before migrate_updates_db.py
+#
+REVISIONS_CMD = (
+    "CREATE TABLE revisions (obsidrev REAL, general_signoff TEXT, general_date TEXT, "
+    "acis_signoff TEXT, acis_date TEXT, acis_si_mode_signoff TEXT, acis_si_mode_date TEXT, "
+    "hrc_si_mode_signoff TEXT, hrc_si_mode_date TEXT, usint_verification TEXT, usint_date TEXT, "
+    "sequence INTEGER, submitter TEXT, rev_time INTEGER)"
+)
+
+
+@pytest.fixture
+def updates_app(tmp_path):
+    """Application on a temporary OCAT_DIR with updates/ and an unmigrated updates_table.db."""
+    os.makedirs(tmp_path / "updates")
+    with sqlite3.connect(str(tmp_path / "updates_table.db")) as conn:
+        conn.execute(REVISIONS_CMD)
+    conn.close()
+
+    app = Flask(__name__)
+    app.config.update(TESTING=True, OCAT_DIR=str(tmp_path), UPDATES_DB_TIMEOUT=10)
+    yield app
+    udb.close_connections()
@@ -0,0 +1,119 @@
+"""
+Tests of cus_app/ocatdatapage/check_value_range.py: the single value and the rank
+value bounds, the not_numeric warning, the tstart/tstop warning text, and the
+rules compiled again when a rule file is modified.
+
+:Last Updated: Oct 18, 2026
+
+"""
+
+import os
+import shutil
+import time
+
+import pytest
+
+from cus_app.ocatdatapage import check_value_range as cvr
+from cus_app.ocatdatapage import create_selection_dict as csd
+
+
+@pytest.fixture
+def ct_dict(fake_app, fake_obsids, tmp_path, monkeypatch):
+    """The dict of the first obsid of the fake database, as the parameter page makes it."""
+    open(tmp_path / "approved", "w").close()
+    open(tmp_path / "mp_long_term", "w").close()
+    monkeypatch.setitem(fake_app.config, "OCAT_DIR", str(tmp_path))
+    monkeypatch.setitem(fake_app.config, "OBS_SS", str(tmp_path))
+    with fake_app.app_context():
+        return csd.create_selection_dict(fake_obsids[0])
+
+
+def warnings_of(ct_dict, param):
+    return [ent for ent in cvr.find_value_warnings(ct_dict) if ent.param == param]
+
+
+def test_value_bounds(ct_dict):
+    ct_dict["primary_exp_time"][-1] = 20
+    [warning] = warnings_of(ct_dict, "primary_exp_time")
+    assert (warning.rank, warning.code) == (None, "out_of_range")
+    assert warning.text == "primary_exp_time (=20.0) should be between 0.1 and 10.0\n"
+    assert warning.text in cvr.check_value_range(ct_dict)
+
+    for val in ["5", 0.1, 10, "NA", None]:
+        ct_dict["primary_exp_time"][-1] = val
+        assert warnings_of(ct_dict, "primary_exp_time") == []
+
+
+def test_not_numeric(ct_dict):
+    ct_dict["est_cnt_rate"][-1] = "abc"
+    [warning] = warnings_of(ct_dict, "est_cnt_rate")
+    assert (warning.rank, warning.code) == (None, "not_numeric")
+    assert warning.text == "est_cnt_rate (=abc) should be a numeric value between 0.0 and 10000.0\n"
+
+
+def test_rank_bounds(ct_dict):
+    roll = ["NA"] * 10
+    roll[:4] = [10, "400", -1, "abc"]
+    ct_dict["roll"][-1] = roll
+    w_list = warnings_of(ct_dict, "roll")
+    out = [ent for ent in w_list if ent.code == "out_of_range"]
+    assert [ent.rank for ent in out] == [2, 3]
+    assert out[0].text == ct_dict["roll"][0] + " (rank: 2) (=400.0) should be between 0.0 and 360.0\n"
+
+
+def test_tstart_tstop_note(ct_dict):
+    ct_dict["tstart"][-1] = [5.0, "NA", 9.0, 2.0] + ["NA"] * 6
+    ct_dict["tstop"][-1] = [7.0, 7.0, 7.0, "NA"] + ["NA"] * 6
+    note = "Tstart is not defined (rank=2)\n"
+    note = note + "Tstart and Tstop on rank 3 are not properly set.\n"
+    note = note + "Tstop is not defined (rank=4)\n"
+    #
+    # --- One text for all ranks as before, then a warning for each rank
+    #
+    t_list = [ent for ent in cvr.check_value_range(ct_dict) if ent.startswith("Tst")]
+    assert t_list == [note]
+
+    w_list = [ent for ent in cvr.find_value_warnings(ct_dict) if ent.param in ["tstart", "tstop", ("tstart", "tstop")]]
+    assert [(ent.param, ent.rank, ent.code) for ent in w_list[-4:]] == [
+        (("tstart", "tstop"), None, "time_constraint"),
+        ("tstart", 2, "missing_value"),
+        (("tstart", "tstop"), 3, "tstart_after_tstop"),
+        ("tstop", 4, "missing_value"),
+    ]
+    assert w_list[-4].text == note
+
+
+def test_rules_reload(fake_app, tmp_path, monkeypatch):
+    files = []
+    for ifile in cvr.rule_files:
+        shutil.copy(ifile, tmp_path)
+        files.append(str(tmp_path / os.path.basename(ifile)))
+    monkeypatch.setattr(cvr, "rule_files", tuple(files))
+    monkeypatch.setattr(cvr, "rule_set", None)
+
+    rules = cvr.get_rules()
+    assert cvr.get_rules() is rules
+    with pytest.raises(AttributeError):
+        rules.mtime = 0
+    with pytest.raises(ValueError):
+        rules.rank_bound[0, 0] = 1
+    #
+    # --- A modified file is read again
+    #
+    with open(files[0]) as f:
+        data = f.read()
+    with open(files[0], "w") as f:
+        f.write(data.replace("roll                :\t   0.0 :    360.0", "roll                :\t   0.0 :    100.0"))
+    os.utime(files[0], (time.time() + 5, time.time() + 5))
+
+    reloaded = cvr.get_rules()
+    assert reloaded is not rules
+    assert list(reloaded.rank_bound[reloaded.rank_params.index("roll")]) == [0.0, 100.0]
+    #
+    # --- A file which cannot be read keeps the last rules
+    #
+    with open(files[0], "w") as f:
+        f.write("bad line\n")
+    os.utime(files[0], (time.time() + 10, time.time() + 10))
+    with fake_app.app_context():
+        assert cvr.get_rules() is reloaded
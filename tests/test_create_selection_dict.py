@@ -0,0 +1,90 @@
+"""
+Golden test of cus_app/ocatdatapage/create_selection_dict.py: the dict built from the
+parameter registry (static/ocatdatapage/param_spec) is compared with the dict which
+create_selection_dict made before the registry, for a corpus of obsids of the fake
+Sybase database covering ACIS/HRC, TOO/DDT, monitor chains, group ids and ranked
+constraints.
+
+data/create_selection_dict_golden.json holds the expected dict:
+    approved        --- obsids written to <OCAT_DIR>/approved
+    mp_long_term    --- lines written to <OBS_SS>/mp_long_term
+    specs           --- <p_id> <--> [<label>, <choices>, <selection type>, <group>]
+    values          --- <obsid> <--> <p_id> <--> [<org value>, <value>]
+the p_ids are in the order of the dict. It was written from the previous
+create_selection_dict, with two normalisations:
+    * the choices of the year lists change with the current year; they are 'year'
+    * rass, rosat, dss, hrc_open, acis_open and approved were 5-element lists
+      [<label>, '', 'n', <org value>, <value>]; they now read as 6 items with the
+      group '' like all other entries, so '' is inserted at position 3
+
+:Last Updated: Oct 18, 2026
+
+"""
+
+import os
+import json
+
+import pytest
+
+from cus_app.ocatdatapage import create_selection_dict as csd
+
+GOLDEN = os.path.join(os.path.dirname(__file__), "data", "create_selection_dict_golden.json")
+
+
+@pytest.fixture(scope="module")
+def golden():
+    with open(GOLDEN) as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def data_dir(fake_app, golden, tmp_path, monkeypatch):
+    """OCAT_DIR and OBS_SS holding the approved and mp_long_term files of the golden data."""
+    with open(tmp_path / "approved", "w") as f:
+        for obsid in golden["approved"]:
+            f.write(f"{obsid}\t00000{obsid}\tmtadude\t10/01/26\n")
+    with open(tmp_path / "mp_long_term", "w") as f:
+        f.write("\n".join(golden["mp_long_term"]) + "\n")
+
+    monkeypatch.setitem(fake_app.config, "OCAT_DIR", str(tmp_path))
+    monkeypatch.setitem(fake_app.config, "OBS_SS", str(tmp_path))
+    return tmp_path
+
+
+def normalise(p_dict):
+    """Split a dict into specs and values as kept in the golden data."""
+    year = csd.year_choices()
+    specs = {}
+    values = {}
+    for p_id, entry in p_dict.items():
+        entry = list(entry)
+        if entry[1] == year:
+            entry[1] = "year"
+        specs[p_id] = entry[:4]
+        values[p_id] = entry[4:]
+
+    return json.loads(json.dumps([specs, values]))
+
+
+def test_matches_golden(fake_app, golden, data_dir):
+    assert len(golden["values"]) > 0
+    for obsid, e_values in golden["values"].items():
+        with fake_app.app_context():
+            p_dict = csd.create_selection_dict(int(obsid))
+
+        specs, values = normalise(p_dict)
+        assert list(specs) == list(golden["specs"]), f"{obsid}: parameters differ"
+        for p_id, spec in specs.items():
+            assert spec == golden["specs"][p_id], f"{obsid}: {p_id} spec differs"
+            assert values[p_id] == e_values[p_id], f"{obsid}: {p_id} value differs"
+
+
+def test_entries_read_as_six_items(fake_app, golden, data_dir):
+    obsid = golden["approved"][0]
+    with fake_app.app_context():
+        p_dict = csd.create_selection_dict(obsid)
+
+    for p_id, entry in p_dict.items():
+        assert len(list(entry)) == 6, p_id
+    assert p_dict["approved"][-1] == 1
+    assert p_dict["approved"][3] == ""
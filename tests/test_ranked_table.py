@@ -0,0 +1,141 @@
+"""
+Tests of cus_app/ocatdatapage/ranked_table.py: compact with gaps, insert_rank in
+the middle and on a full table, match_mask, and out_of_range against the loop
+over the ranks which check_value_range used before RankedTable.
+
+:Last Updated: Oct 18, 2026
+
+"""
+
+import random
+
+import numpy
+
+from cus_app.ocatdatapage import ranked_table as rtb
+from cus_app.ocatdatapage.create_selection_dict import adjust_value_for_test
+from cus_app.supple import ocat_common_functions as ocf
+
+NULL_LIST = ["", "N", "NO", "NULL", "NA", "NONE", "n", "No", "Null", "null", "Na", "None", None]
+
+P_LIST = ["roll_constraint", "roll", "roll_tolerance"]
+
+
+def make_ct_dict(rows, org=None):
+    """A ct_dict of the roll parameters; rows is a list of [<opener>, <roll>, <tolerance>] ranks."""
+    rows = rows + [["NA", "NA", "NA"]] * (rtb.nrank - len(rows))
+    if org is None:
+        org = rows
+    ct_dict = {}
+    for i, param in enumerate(P_LIST):
+        ct_dict[param] = [param, [row[i] for row in org], [row[i] for row in rows]]
+
+    return ct_dict
+
+
+def test_compact_with_gaps():
+    rows = [["Y", 10, 1], ["NA", 20, 2], ["Y", 30, 3], [None, 40, 4], ["N", 50, 5], ["P", 60, 6]]
+    ct_dict = make_ct_dict(rows)
+    table = rtb.RankedTable(ct_dict, P_LIST)
+
+    assert table.count(NULL_LIST) == 3
+    assert table.compact(NULL_LIST) == 3
+    table.save()
+    assert ct_dict["roll_constraint"][-1] == ["Y", "Y", "P"] + ["NA"] * 7
+    assert ct_dict["roll"][-1] == [10, 30, 60] + ["NA"] * 7
+    assert ct_dict["roll_tolerance"][-1] == [1, 3, 6] + ["NA"] * 7
+    #
+    # --- The original values are not touched
+    #
+    assert ct_dict["roll"][-2] == [10, 20, 30, 40, 50, 60] + ["NA"] * 4
+
+
+def test_compact_all_closed():
+    table = rtb.RankedTable(make_ct_dict([["N", 10, 1]]), P_LIST)
+    assert table.compact(NULL_LIST) == 0
+    assert (table.new == "NA").all()
+
+
+def test_insert_rank_middle():
+    ct_dict = make_ct_dict([["Y", 10, 1], ["Y", 20, 2], ["Y", 30, 3]])
+    table = rtb.RankedTable(ct_dict, P_LIST)
+
+    assert table.insert_rank(1, "Y", NULL_LIST)
+    table.save()
+    assert ct_dict["roll_constraint"][-1] == ["Y"] * 4 + ["NA"] * 6
+    assert ct_dict["roll"][-1] == [10, "NA", 20, 30] + ["NA"] * 6
+    assert ct_dict["roll_tolerance"][-1] == [1, "NA", 2, 3] + ["NA"] * 6
+
+
+def test_insert_rank_full():
+    rows = [["Y", 10 * k, k] for k in range(rtb.nrank)]
+    ct_dict = make_ct_dict(rows)
+    table = rtb.RankedTable(ct_dict, P_LIST)
+
+    assert not table.insert_rank(2, "Y", NULL_LIST)
+    assert table.new.tolist() == table.org.tolist()
+    #
+    # --- With the last rank closed there is room again; that rank is dropped
+    #
+    rows[-1] = ["N", 90, 9]
+    table = rtb.RankedTable(make_ct_dict(rows), P_LIST)
+    assert table.insert_rank(2, "Y", NULL_LIST)
+    assert table.new[1].tolist() == [0, 10, "NA", 20, 30, 40, 50, 60, 70, 80]
+
+    assert not table.insert_rank(-1, "Y", NULL_LIST)
+    assert not table.insert_rank(rtb.nrank, "Y", NULL_LIST)
+
+
+def test_match_mask():
+    org = [["Y", "10", 1], ["Y", 20.00001, " 2"], ["N", None, "NA"]]
+    new = [["Y", 10.0, 1], ["Y", 20.0, "3"], ["NA", "", "None"]]
+    table = rtb.RankedTable(make_ct_dict(new, org), P_LIST)
+
+    mask = table.match_mask(adjust_value_for_test)
+    assert mask.shape == (len(P_LIST), rtb.nrank)
+    assert mask[:, 0].all()
+    assert mask[:2, 1].all() and not mask[2, 1]
+    #
+    # --- 'N' and 'NA' are both null
+    #
+    assert mask[:, 2].all()
+    assert mask[:, 3:].all()
+    #
+    # --- Two given arrays
+    #
+    other = table.new.copy()
+    other[1, 0] = 11
+    mask = table.match_mask(adjust_value_for_test, table.new, other)
+    assert numpy.count_nonzero(~mask) == 1 and not mask[1, 0]
+
+
+def loop_out_of_range(ct_dict, rank_dict):
+    """The rank value check of check_value_range before RankedTable."""
+    out = []
+    for param in rank_dict.keys():
+        for k in range(0, 10):
+            val = ct_dict[param][-1][k]
+            if val in NULL_LIST:
+                continue
+            else:
+                if ocf.is_neumeric(val):
+                    val = float(val)
+                else:
+                    continue
+
+            if val < rank_dict[param][0] or val > rank_dict[param][1]:
+                out.append([param, k, val])
+
+    return out
+
+
+def test_out_of_range_matches_loop():
+    rank_dict = {"roll_constraint": [0, 1], "roll": [0, 360], "roll_tolerance": [0, 10]}
+    bound = numpy.array([rank_dict[param] for param in P_LIST], dtype=float)
+    choices = ["Y", "N", "NA", "", None, "abc", "nan", "-0.5", "12", "360", "360.01", "1e3", -1, 0, 5.5, 11, 400]
+
+    rand = random.Random(1)
+    for trial in range(200):
+        rows = [[rand.choice(choices) for param in P_LIST] for k in range(rtb.nrank)]
+        ct_dict = make_ct_dict(rows)
+        table = rtb.RankedTable(ct_dict, P_LIST)
+        assert table.out_of_range(bound) == loop_out_of_range(ct_dict, rank_dict), rows
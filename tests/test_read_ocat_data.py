@@ -0,0 +1,96 @@
+"""
+Regression tests of cus_app/supple/read_ocat_data.py on the fake Sybase database:
+the number of statements of one read, the same p_dict from every OCAT_READ_MODE,
+readonly reads served from the replica without Sybase, and the shared cache
+used only by readonly reads.
+
+:Last Updated: Oct 18, 2026
+
+"""
+
+import pytest
+
+from cus_app.supple import fake_sybpydb as fsd
+from cus_app.supple import ocat_data_cache as odc
+from cus_app.supple import ocat_replica as orp
+from cus_app.supple import read_ocat_data as rod
+
+#
+# --- Statements of one batched read: the joined query, then one query each
+# --- for the rollreq, timereq and aciswin ranks
+#
+BATCHED_STATEMENTS = 4
+#
+# --- Statements of one read by section; each section loader runs its own
+#
+SECTION_STATEMENTS = 14
+
+MODES = ["batched", "section", "concurrent"]
+
+
+def read_in_mode(app, obsid, mode):
+    """Read an obsid with OCAT_READ_MODE set to mode; return p_dict and the statement count."""
+    app.config["OCAT_READ_MODE"] = mode
+    with app.app_context():
+        #
+        # --- The monitor index is read once per process; keep it out of the count
+        #
+        rod.get_monitor_index().check()
+        fsd.stats["execute"] = 0
+        p_dict = rod.read_ocat_data(obsid)
+        count = fsd.stats["execute"]
+
+    return p_dict, count
+
+
+@pytest.mark.parametrize("mode, limit", [("batched", BATCHED_STATEMENTS), ("section", SECTION_STATEMENTS)])
+def test_statement_count(fake_app, fake_obsids, mode, limit):
+    counts = [read_in_mode(fake_app, obsid, mode)[1] for obsid in fake_obsids[:50]]
+    assert max(counts) <= limit
+
+
+def test_modes_give_same_p_dict(fake_app, fake_obsids):
+    for obsid in fake_obsids:
+        p_list = [read_in_mode(fake_app, obsid, mode)[0] for mode in MODES]
+        assert p_list[0]["obsid"] is not None
+        for mode, p_dict in zip(MODES[1:], p_list[1:]):
+            assert p_dict == p_list[0], f"{obsid}: {mode} differs from batched"
+
+
+def test_replica_read_uses_no_sybase(fake_app, fake_obsids, tmp_path, monkeypatch):
+    rfile = str(tmp_path / "ocat_replica.db")
+    with fake_app.app_context():
+        orp.sync_replica(rfile)
+
+    expected = {obsid: read_in_mode(fake_app, obsid, "batched")[0] for obsid in fake_obsids[:50]}
+    #
+    # --- The monitor series and group members must come from the replica too, not from
+    # --- a monitor index read from Sybase
+    #
+    monkeypatch.setattr(rod, "_monitor_index", None)
+    monkeypatch.setitem(fake_app.config, "OCAT_READ_BACKEND", "replica")
+    monkeypatch.setitem(fake_app.config, "OCAT_REPLICA_FILE", rfile)
+    for obsid, e_dict in expected.items():
+        with fake_app.app_context():
+            fsd.stats["execute"] = 0
+            p_dict = rod.read_ocat_data(obsid, readonly=True)
+            assert fsd.stats["execute"] == 0, f"{obsid}: Sybase was read"
+        assert p_dict == e_dict
+
+
+def test_shared_cache_only_for_readonly(fake_app, fake_obsids, tmp_path, monkeypatch):
+    obsid = fake_obsids[0]
+    monkeypatch.setitem(fake_app.config, "OCAT_CACHE_ENABLED", True)
+    monkeypatch.setitem(fake_app.config, "LOG_DIR", str(tmp_path))
+    with fake_app.app_context():
+        odc.shared_set(obsid, {"obsid": obsid, "status": "stale"})
+
+    with fake_app.app_context():
+        assert rod.read_ocat_data(obsid, readonly=True)["status"] == "stale"
+        #
+        # --- A read for approving or submitting goes to the database, even in the same request
+        #
+        fsd.stats["execute"] = 0
+        p_dict = rod.read_ocat_data(obsid)
+        assert fsd.stats["execute"] > 0
+        assert p_dict["status"] != "stale"
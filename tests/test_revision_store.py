@@ -0,0 +1,74 @@
+"""
+Tests of the rev # allocation of cus_app/supple/revision_store.py: concurrent
+submitters never get the same rev #, and a new rev # steps past the rows of the
+revisions table and the <obsid>.<rev#> files which already exist.
+
+:Last Updated: Oct 18, 2026
+
+"""
+
+import threading
+
+from cus_app.supple import revision_store as rvs
+from cus_app.supple import updates_db as udb
+
+NTHREAD = 5
+NALLOC = 20
+#
+# --- 12345 has data files up to rev 3, 23456 has a row of rev 7, 34567 has nothing
+#
+OBSIDS = [12345, 23456, 34567]
+
+
+def write_file(obsid, rev):
+    with open(rvs.write_path(rvs.revision_name(obsid, rev)), "w") as f:
+        f.write("")
+
+
+def test_concurrent_allocation(updates_app):
+    with updates_app.app_context():
+        udb.migrate_schema(udb.get_updates_db())
+        for rev in [1, 2, 3]:
+            write_file(12345, rev)
+        with udb.transaction() as cur:
+            cur.execute(
+                "INSERT INTO revisions (obsidrev, general_signoff, submitter, rev_time) "
+                "VALUES (23456.007, 'NA', 'me', 1)"
+            )
+
+    barrier = threading.Barrier(NTHREAD)
+    results = []
+    errors = []
+
+    def submitter(k):
+        try:
+            with updates_app.app_context():
+                barrier.wait()
+                for i in range(NALLOC):
+                    obsid = OBSIDS[(k + i) % len(OBSIDS)]
+                    results.append((obsid, rvs.allocate_revision(obsid)))
+                udb.close_connections()
+        except Exception as err:
+            errors.append(err)
+
+    t_list = [threading.Thread(target=submitter, args=(k,)) for k in range(NTHREAD)]
+    for thread in t_list:
+        thread.start()
+    for thread in t_list:
+        thread.join(60)
+
+    assert errors == []
+    assert len(results) == NTHREAD * NALLOC
+    first = {12345: 4, 23456: 8, 34567: 1}
+    for obsid in OBSIDS:
+        r_list = sorted(rev for o, rev in results if o == obsid)
+        assert r_list == list(range(first[obsid], first[obsid] + len(r_list))), obsid
+    #
+    # --- Files written past the counter by another process are stepped over
+    #
+    with updates_app.app_context():
+        last = max(rev for o, rev in results if o == 12345)
+        write_file(12345, last + 1)
+        write_file(12345, last + 2)
+        assert rvs.allocate_revision(12345) == last + 3
+        assert rvs.allocate_revision(12345) == last + 4
@@ -0,0 +1,126 @@
+"""
+Tests of cus_app/supple/sybase_pool.py on fake_sybpydb: connections reused with
+one 'use <db>' each, the size limit and waiting for a free connection, run()
+reconnecting after a dropped connection, and close_all with checked-out
+connections.
+
+:Last Updated: Oct 18, 2026
+
+"""
+
+import threading
+import time
+
+import pytest
+
+from cus_app.supple import fake_sybpydb as fsd
+from cus_app.supple import sybase_pool as sbp
+
+
+def select_one(cur):
+    cur.execute("select 1")
+    return cur.fetchall()
+
+
+@pytest.fixture
+def pool():
+    """A pool of two connections to fake_sybpydb, with fresh statistics."""
+    fsd.reset()
+    pool = sbp.ConnectionPool(lambda: fsd.connect(servername="fake", user="test"), size=2, timeout=0.2)
+    yield pool
+    pool.close_all()
+
+
+def test_connection_reused(pool):
+    for k in range(10):
+        assert pool.run("axafocat", select_one) == [(1,)]
+
+    assert fsd.stats["connect"] == 1
+    assert fsd.stats["use"] == 1
+    #
+    # --- Another database switches the same connection once
+    #
+    pool.run("axafusers", select_one)
+    pool.run("axafusers", select_one)
+    assert fsd.stats["connect"] == 1
+    assert fsd.stats["use"] == 2
+
+
+def test_size_limit(pool):
+    held = [pool.acquire("axafocat"), pool.acquire("axafocat")]
+    start = time.time()
+    with pytest.raises(RuntimeError, match="exhausted"):
+        pool.acquire("axafocat")
+    assert time.time() - start >= 0.2
+    assert fsd.stats["connect"] == 2
+
+    for pconn in held:
+        pool.release(pconn)
+
+
+def test_waits_for_release(pool):
+    pool.timeout = 5
+    held = [pool.acquire("axafocat"), pool.acquire("axafocat")]
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire("axafocat")))
+    waiter.start()
+    time.sleep(0.2)
+    assert waiter.is_alive()
+
+    pool.release(held[0])
+    waiter.join(5)
+    assert got == [held[0]]
+    assert fsd.stats["connect"] == 2
+
+    pool.release(held[1])
+    pool.release(got[0])
+
+
+def test_run_reconnects(pool):
+    pool.run("axafocat", select_one)
+    pconn = pool.acquire("axafocat")
+    pool.release(pconn)
+    #
+    # --- Drop the idle connection; the next run finds out and reconnects
+    #
+    pconn.conn.close()
+    assert pool.run("axafocat", select_one) == [(1,)]
+    assert fsd.stats["connect"] == 2
+    assert pool._opened == 1
+    #
+    # --- A statement error on a live connection is raised without a reconnect
+    #
+    with pytest.raises(fsd.Error):
+        pool.run("axafocat", lambda cur: cur.execute("select nothing from nowhere"))
+    assert fsd.stats["connect"] == 2
+    assert pool._opened == 1
+
+
+def test_close_all_with_checked_out(pool):
+    out = pool.acquire("axafocat")
+    idle = pool.acquire("axafocat")
+    pool.release(idle)
+
+    pool.close_all()
+    assert idle.conn.closed
+    assert not out.conn.closed
+    assert pool._opened == 1
+    #
+    # --- The checked-out connection still holds its place in the pool
+    #
+    other = pool.acquire("axafocat")
+    with pytest.raises(RuntimeError):
+        pool.acquire("axafocat")
+    pool.release(other)
+    #
+    # --- It still works, and is closed when it comes back
+    #
+    assert select_one(out.conn.cursor()) == [(1,)]
+    pool.release(out)
+    assert out.conn.closed
+    assert pool._opened == 1
+    assert pool._idle == [other]
+    #
+    # --- The pool can still be used
+    #
+    assert pool.run("axafocat", select_one) == [(1,)]
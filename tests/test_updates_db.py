@@ -0,0 +1,65 @@
+"""
+Tests of the updates_table.db schema migration of cus_app/supple/updates_db.py:
+a connection refuses an unmigrated database without changing it, and migrate_schema
+(run by migrate_updates_db.py) fills the new columns and can be run again.
+
+:Last Updated: Oct 18, 2026
+
+"""
+
+import sqlite3
+
+import pytest
+
+from cus_app.supple import updates_db as udb
+
+
+def add_rows(app):
+    with sqlite3.connect(udb.get_updates_db()) as conn:
+        conn.execute(
+            "INSERT INTO revisions (obsidrev, general_signoff, general_date, usint_verification, "
+            "submitter, rev_time) VALUES (12345.002, 'me', '10/01/26', 'NA', 'me', 1)"
+        )
+    conn.close()
+
+
+def column_names(path):
+    with sqlite3.connect(path) as conn:
+        c_list = [ent[1] for ent in conn.execute("PRAGMA table_info(revisions)")]
+    conn.close()
+    return c_list
+
+
+def test_unmigrated_database_is_refused(updates_app):
+    with updates_app.app_context():
+        add_rows(updates_app)
+        path = udb.get_updates_db()
+        for readonly in [True, False]:
+            with pytest.raises(udb.SchemaError, match="migrate_updates_db.py"):
+                udb.get_connection(readonly=readonly)
+        #
+        # --- The schema is not changed by a connection
+        #
+        assert "obsid" not in column_names(path)
+
+
+def test_migrate_schema(updates_app):
+    with updates_app.app_context():
+        add_rows(updates_app)
+        path = udb.get_updates_db()
+        assert udb.migrate_schema(path) == [0, udb.schema_version]
+        assert udb.migrate_schema(path) == [udb.schema_version, udb.schema_version]
+        for col in udb.added_columns:
+            assert col in column_names(path)
+
+        out = udb.fetch_all("SELECT obsid, rev, general_epoch, acis_epoch FROM revisions")
+        assert out[0][:2] == (12345, 2)
+        assert out[0][2] is not None and out[0][3] is None
+        #
+        # --- New rows are filled by the triggers, which also count the change
+        #
+        stamp = udb.change_stamp()[0]
+        with udb.transaction() as cur:
+            cur.execute("INSERT INTO revisions (obsidrev, general_signoff) VALUES (12345.003, 'NA')")
+        assert udb.fetch_all("SELECT rev FROM revisions WHERE obsid = 12345 ORDER BY rev") == [(2,), (3,)]
+        assert udb.change_stamp()[0] > stamp